@@ -1,3 +1,6 @@
 """Nipoppy."""
 
-from nipoppy._data_retriever import NipoppyDataRetriever
+from nipoppy._data_retriever import (
+    NipoppyDataRetriever,
+    NipoppyFederatedDataRetriever,
+)
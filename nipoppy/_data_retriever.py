@@ -1,13 +1,31 @@
 """Nipoppy data API."""
 
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import pandas as pd
 
-from nipoppy.env import StrOrPathLike
+from nipoppy.env import BIDS_SESSION_PREFIX, BIDS_SUBJECT_PREFIX, StrOrPathLike
 from nipoppy.layout import DatasetLayout
+from nipoppy.logger import get_logger
 from nipoppy.study import Study
 from nipoppy.tabular.manifest import Manifest
 from nipoppy.utils.bids import check_participant_id, check_session_id
@@ -16,6 +34,18 @@ from nipoppy.utils.bids import check_participant_id, check_session_id
 TERMURL_PARTICIPANT_ID = "nb:ParticipantID"
 TERMURL_SESSION_ID = "nb:SessionID"
 
+# Parquet mirrors of loaded TSV files
+DNAME_PARQUET_CACHE = "data_retriever_cache"
+EXT_PARQUET = ".parquet"
+
+# number of rows to parse at a time when filtering rows of a TSV file
+TSV_CHUNK_SIZE = 10000
+
+# needed to read/write Parquet files
+PYARROW_INSTALLED = importlib.util.find_spec("pyarrow") is not None
+
+logger = get_logger()
+
 
 def _check_phenotypes_arg(phenotypes: List[str]) -> None:
     if not isinstance(phenotypes, List):
@@ -49,57 +79,396 @@ def _check_derivatives_arg(derivatives: List[Tuple[str, str, str]]) -> None:
             )
 
 
+def _strip_bids_prefixes(index: pd.MultiIndex) -> pd.MultiIndex:
+    """Remove BIDS prefixes from a (participant ID, session ID) index.
+
+    This is a vectorized version of :func:`nipoppy.utils.bids.check_participant_id`
+    and :func:`nipoppy.utils.bids.check_session_id`, and raises the same errors.
+    """
+    levels = []
+    for level, prefix, check_func in (
+        (0, BIDS_SUBJECT_PREFIX, check_participant_id),
+        (1, BIDS_SESSION_PREFIX, check_session_id),
+    ):
+        values = index.get_level_values(level).str.removeprefix(prefix)
+        is_invalid = ~(values.isna() | values.str.isalnum())
+        if is_invalid.any():
+            # raise the same error as the non-vectorized check
+            check_func(values[is_invalid][0])
+        levels.append(values)
+    return pd.MultiIndex.from_arrays(levels)
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    """Convert a ``pathlib.Path.glob()`` pattern to a regex for relative paths."""
+    regex_parts = []
+    for part in Path(pattern).parts:
+        if part == "**":
+            # zero or more directories
+            regex_parts.append("(?:[^/]+/)*")
+            continue
+        part_regex = ""
+        i = 0
+        while i < len(part):
+            char = part[i]
+            if char == "*":
+                part_regex += "[^/]*"
+            elif char == "?":
+                part_regex += "[^/]"
+            elif char == "[" and "]" in part[i + 2 :]:
+                end = part.index("]", i + 2)
+                char_class = part[i + 1 : end]
+                if char_class.startswith("!"):
+                    char_class = "^" + char_class[1:]
+                part_regex += f"[{char_class}]"
+                i = end
+            else:
+                part_regex += re.escape(char)
+            i += 1
+        regex_parts.append(part_regex + "/")
+    return re.compile("".join(regex_parts).removesuffix("/"))
+
+
+def _copy(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy a cached dataframe so that changes to it do not affect the cache.
+
+    With copy-on-write (always enabled in pandas 3), a shallow copy is enough and
+    does not duplicate the data.
+    """
+    copy_on_write = (
+        int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+    )
+    return df.copy(deep=not copy_on_write)
+
+
+def _downcast_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert columns of a dataframe to smaller dtypes to reduce memory usage.
+
+    Floating-point columns are converted to float32, integer columns to the smallest
+    integer dtype that fits their values, and string columns where most values are
+    repeated to categoricals.
+    """
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float32"
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = pd.to_numeric(df[col], downcast="integer").dtype
+        elif pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+            if df[col].nunique() <= len(df) // 2:
+                dtypes[col] = "category"
+    return df.astype(dtypes)
+
+
+def _normalize_ids(ids: Optional[Collection[str]], check_func) -> Optional[Set[str]]:
+    """Strip BIDS prefixes from participant/session IDs used for filtering."""
+    if ids is None:
+        return None
+    if isinstance(ids, str):
+        raise TypeError(f"Expected a collection of IDs, got a string: {ids}")
+    return {check_func(id_) for id_ in ids}
+
+
+def _filter_rows(
+    df: pd.DataFrame,
+    participants: Optional[Set[str]] = None,
+    sessions: Optional[Set[str]] = None,
+) -> pd.DataFrame:
+    """Filter a dataframe by the participant and session IDs in its index."""
+    if participants is not None:
+        df = df.loc[df.index.get_level_values(0).isin(participants)]
+    if sessions is not None:
+        df = df.loc[df.index.get_level_values(1).isin(sessions)]
+    return df
+
+
+def _iter_row_groups(
+    df: pd.DataFrame, group_of_participant: Mapping[str, int], n_groups: int
+) -> Iterator[pd.DataFrame]:
+    """Iterate over groups of participants in a dataframe, keeping the row order.
+
+    Rows for participants not in ``group_of_participant`` are dropped. The rows of
+    each group are only copied when the group is reached, so that at most one group
+    is held in memory in addition to ``df``.
+    """
+    groups = (
+        pd.Series(df.index.get_level_values(0))
+        .map(group_of_participant)
+        .fillna(-1)
+        .astype(int)
+        .to_numpy()
+    )
+    # sort row positions by group once, so that each group is a contiguous slice
+    order = groups.argsort(kind="stable")
+    bounds = groups[order].searchsorted(range(n_groups + 1))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield df.iloc[order[start:end]]
+
+
 class NipoppyDataRetriever:
-    """API for getting data from a Nipoppy study."""
+    """API for getting data from a Nipoppy study.
+
+    Loaded tables are cached in memory, so repeated calls do not re-read files that
+    have not changed since they were last loaded. If ``pyarrow`` is installed,
+    loaded TSV files are also mirrored as Parquet files in
+    ``<NIPOPPY_ROOT>/.nipoppy/data_retriever_cache``, so that later reads (including
+    from other Python sessions) only load the requested columns.
+    """
 
     _index_cols_derivatives = [Manifest.col_participant_id, Manifest.col_session_id]
     _index_cols_phenotypes = [TERMURL_PARTICIPANT_ID, TERMURL_SESSION_ID]
     _index_cols_output = [Manifest.col_participant_id, Manifest.col_session_id]
 
-    def __init__(self, path: StrOrPathLike):
+    def __init__(self, path: StrOrPathLike, parquet_cache: bool = True):
         """Instantiate a NipoppyDataRetriever object.
 
         Parameters
         ----------
         path : StrOrPathLike
             The path to the Nipoppy study root directory.
+        parquet_cache : bool, optional
+            Whether to mirror loaded TSV files as Parquet files for faster loading,
+            by default True. Ignored if ``pyarrow`` is not installed.
         """
         self._path = Path(path)
+        self._parquet_cache = parquet_cache and PYARROW_INSTALLED
+
+        # index of files in IDP directories, invalidated when a directory changes
+        # key: IDP directory path
+        # value: (modification times of indexed directories, relative file paths)
+        self._idp_index: Dict[Path, Tuple[Dict[str, int], List[str]]] = {}
+
+        # in-memory cache of loaded tables, invalidated when the file changes
+        # key: (file path, index columns, requested columns or None for all)
+        # value: ((file modification time, file size), dataframe)
+        self._cache: Dict[tuple, Tuple[Tuple[int, int], pd.DataFrame]] = {}
 
     @cached_property
     def _study(self) -> Study:
         """Get the Nipoppy Study object for the study."""
         return Study(layout=DatasetLayout(dpath_root=self._path))
 
-    def _load_tsv(self, fpath: StrOrPathLike, index_cols: List[str]) -> pd.DataFrame:
-        df = pd.read_csv(
-            fpath,
+    def _load_tsv(
+        self,
+        fpath: StrOrPathLike,
+        index_cols: List[str],
+        columns: Optional[List[str]] = None,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+    ) -> pd.DataFrame:
+        """Load a TSV file, using the in-memory cache if it is up to date.
+
+        If ``columns`` is given, only these columns (and the index columns) are
+        parsed. Requested columns missing from the file are silently ignored.
+
+        If ``participants`` and/or ``sessions`` are given, only the matching rows are
+        loaded. Filtered tables are not added to the in-memory cache, so that loading
+        subsets of a large table one after the other uses bounded memory.
+        """
+        participants = _normalize_ids(participants, check_participant_id)
+        sessions = _normalize_ids(sessions, check_session_id)
+        is_filtered = participants is not None or sessions is not None
+
+        fpath = Path(fpath)
+        stat = os.stat(fpath)
+        file_info = (stat.st_mtime_ns, stat.st_size)
+
+        key_full = (str(fpath), tuple(index_cols), None)
+        key = key_full if columns is None else key_full[:2] + (tuple(columns),)
+        for key_cached in (key, key_full):
+            file_info_cached, df_cached = self._cache.get(key_cached, (None, None))
+            if file_info_cached == file_info:
+                if key_cached != key:
+                    # project a previously loaded full table
+                    df_cached = df_cached.loc[
+                        :, [col for col in columns if col in df_cached.columns]
+                    ]
+                return _copy(_filter_rows(df_cached, participants, sessions))
+
+        if self._parquet_cache:
+            df = self._load_parquet_mirror(
+                fpath, index_cols, columns, file_info, participants, sessions
+            )
+        else:
+            df = self._read_tsv(fpath, index_cols, columns, participants, sessions)
+
+        if is_filtered:
+            return df
+        self._cache[key] = (file_info, df)
+        return _copy(df)
+
+    def _read_tsv(
+        self,
+        fpath: Path,
+        index_cols: List[str],
+        columns: Optional[List[str]] = None,
+        participants: Optional[Set[str]] = None,
+        sessions: Optional[Set[str]] = None,
+    ) -> pd.DataFrame:
+        cols_to_read = set(index_cols).union(columns or [])
+        read_csv_kwargs = dict(
             sep="\t",
             index_col=index_cols,
+            usecols=None if columns is None else (lambda col: col in cols_to_read),
             dtype={col: str for col in index_cols},
         )
 
+        if participants is None and sessions is None:
+            return self._process_index(pd.read_csv(fpath, **read_csv_kwargs))
+
+        # stream the file and only keep matching rows
+        with pd.read_csv(fpath, chunksize=TSV_CHUNK_SIZE, **read_csv_kwargs) as reader:
+            dfs = [
+                _filter_rows(self._process_index(df_chunk), participants, sessions)
+                for df_chunk in reader
+            ]
+        return pd.concat(dfs)
+
+    def _process_index(self, df: pd.DataFrame) -> pd.DataFrame:
         # strip BIDS prefixes if they are present
-        df.index = df.index.map(
-            lambda idx: (check_participant_id(idx[0]), check_session_id(idx[1]))
-        )
+        df.index = _strip_bids_prefixes(df.index)
 
         # rename index columns
         df.index.names = self._index_cols_output
 
         return df
 
+    def _get_fpath_parquet_mirror(
+        self, fpath: Path, index_cols: List[str], file_info: Tuple[int, int]
+    ) -> Path:
+        """Get the path to the Parquet mirror of a TSV file.
+
+        The file name encodes the source file modification time and size, so a
+        mirror is only used if the source file has not changed since it was written.
+        """
+        source_hash = hashlib.md5(
+            "\t".join([str(fpath.resolve()), *index_cols]).encode()
+        ).hexdigest()
+        return (
+            self._study.layout.dpath_nipoppy
+            / DNAME_PARQUET_CACHE
+            / f"{source_hash}-{file_info[0]}-{file_info[1]}{EXT_PARQUET}"
+        )
+
+    def _load_parquet_mirror(
+        self,
+        fpath: Path,
+        index_cols: List[str],
+        columns: Optional[List[str]],
+        file_info: Tuple[int, int],
+        participants: Optional[Set[str]] = None,
+        sessions: Optional[Set[str]] = None,
+    ) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        fpath_mirror = self._get_fpath_parquet_mirror(fpath, index_cols, file_info)
+        is_filtered = participants is not None or sessions is not None
+
+        if not fpath_mirror.exists():
+            if is_filtered:
+                # do not load the full table just to build the mirror
+                return self._read_tsv(
+                    fpath, index_cols, columns, participants, sessions
+                )
+            df = self._read_tsv(fpath, index_cols)
+            try:
+                self._write_parquet_mirror(df, fpath_mirror)
+            except (OSError, ValueError, TypeError) as exception:
+                # e.g. columns with mixed types cannot be converted by pyarrow
+                # (ArrowInvalid/ArrowTypeError are subclasses of ValueError/TypeError)
+                logger.debug(f"Could not write Parquet mirror of {fpath}: {exception}")
+            if columns is None:
+                return df
+            return df.loc[:, [col for col in columns if col in df.columns]]
+
+        if columns is not None:
+            cols_available = set(pq.read_schema(fpath_mirror).names)
+            columns = [col for col in columns if col in cols_available]
+        # only read matching rows
+        filters = [
+            (col, "in", sorted(ids))
+            for col, ids in zip(self._index_cols_output, (participants, sessions))
+            if ids is not None
+        ]
+        # index columns are always read
+        return pd.read_parquet(fpath_mirror, columns=columns, filters=(filters or None))
+
+    def _write_parquet_mirror(self, df: pd.DataFrame, fpath_mirror: Path):
+        # do not create the study directory if it does not exist
+        self._study.layout.dpath_nipoppy.mkdir(exist_ok=True)
+        fpath_mirror.parent.mkdir(exist_ok=True)
+
+        # write to a temporary file first so that readers never see a partial file
+        # (unique for each process and thread, since mirrors are written in parallel)
+        fpath_tmp = fpath_mirror.with_name(
+            f".{fpath_mirror.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            df.to_parquet(fpath_tmp, index=True)
+            os.replace(fpath_tmp, fpath_mirror)
+        finally:
+            fpath_tmp.unlink(missing_ok=True)
+
+        # remove outdated mirrors of the same file
+        source_hash = fpath_mirror.name.split("-")[0]
+        for fpath_old in fpath_mirror.parent.glob(f"{source_hash}-*{EXT_PARQUET}"):
+            if fpath_old != fpath_mirror:
+                fpath_old.unlink(missing_ok=True)
+
+    def _get_idp_index(self, dpath_idp: Path) -> List[str]:
+        """Get paths of all files in an IDP directory, relative to that directory.
+
+        The index is rebuilt only if a directory inside the IDP directory has been
+        modified (i.e. files were added, removed or renamed) since the last call.
+        """
+        dir_mtimes_cached, fpaths = self._idp_index.get(dpath_idp, ({}, []))
+        try:
+            if dir_mtimes_cached and all(
+                os.stat(dpath_idp / dpath).st_mtime_ns == mtime
+                for dpath, mtime in dir_mtimes_cached.items()
+            ):
+                return fpaths
+        except FileNotFoundError:
+            pass
+
+        dir_mtimes = {}
+        fpaths = []
+        for dpath, _, fnames in os.walk(dpath_idp):
+            dpath_relative = os.path.relpath(dpath, dpath_idp)
+            dir_mtimes[dpath_relative] = os.stat(dpath).st_mtime_ns
+            prefix = "" if dpath_relative == "." else f"{dpath_relative}/"
+            fpaths.extend(f"{prefix}{fname}".replace(os.sep, "/") for fname in fnames)
+
+        self._idp_index[dpath_idp] = (dir_mtimes, fpaths)
+        return fpaths
+
     def _find_derivative_path(
         self,
         pipeline_name: str,
         pipeline_version: str,
         filepath_pattern: str,
     ) -> Path:
-        candidate_paths_list = list(
-            self._study.layout.get_dpath_pipeline(
-                pipeline_name=pipeline_name, pipeline_version=pipeline_version
-            ).glob(filepath_pattern)
+        dpath_pipeline = self._study.layout.get_dpath_pipeline(
+            pipeline_name=pipeline_name, pipeline_version=pipeline_version
         )
+        dpath_idp = self._study.layout.get_dpath_pipeline_idp(
+            pipeline_name=pipeline_name, pipeline_version=pipeline_version
+        )
+
+        # IDP files are expected to be in the IDP directory, so look there first
+        # without walking the rest of the (potentially very large) pipeline directory
+        regex = _glob_to_regex(filepath_pattern)
+        prefix = f"{dpath_idp.relative_to(dpath_pipeline).as_posix()}/"
+        candidate_paths_list = [
+            dpath_pipeline / fpath_relative
+            for fpath_relative in (
+                f"{prefix}{fpath}" for fpath in self._get_idp_index(dpath_idp)
+            )
+            if regex.fullmatch(fpath_relative)
+        ]
+        if len(candidate_paths_list) == 0:
+            candidate_paths_list = list(dpath_pipeline.glob(filepath_pattern))
+
         if len(candidate_paths_list) == 0:
             raise FileNotFoundError(
                 f"No file matching {filepath_pattern} for pipeline "
@@ -117,20 +486,52 @@ class NipoppyDataRetriever:
         pipeline_name: str,
         pipeline_version: str,
         filepath_pattern: str,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
     ) -> pd.DataFrame:
         return self._load_tsv(
             self._find_derivative_path(
                 pipeline_name, pipeline_version, filepath_pattern
             ),
             index_cols=self._index_cols_derivatives,
+            participants=participants,
+            sessions=sessions,
         )
 
     def _filter_with_manifest(self, df: pd.DataFrame) -> pd.DataFrame:
-        return df.loc[
-            df.index.isin(self._study.manifest.get_participants_sessions()), :
-        ]
+        manifest = self._study.manifest
+        # same as manifest.get_participants_sessions() but much faster than
+        # comparing with tuples for large manifests
+        index_manifest = pd.MultiIndex.from_frame(
+            manifest.loc[
+                manifest[manifest.col_session_id].notna(),
+                [manifest.col_participant_id, manifest.col_session_id],
+            ]
+        )
+        return df.loc[df.index.isin(index_manifest), :]
 
-    def get_all_phenotypes(self) -> pd.DataFrame:
+    def _get_phenotypes_table(
+        self,
+        columns: Optional[List[str]] = None,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+    ) -> pd.DataFrame:
+        df = self._load_tsv(
+            self._study.layout.fpath_harmonized,
+            index_cols=self._index_cols_phenotypes,
+            columns=columns,
+            participants=participants,
+            sessions=sessions,
+        )
+        df = self._filter_with_manifest(df)
+        return df
+
+    def get_all_phenotypes(
+        self,
+        *,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+    ) -> pd.DataFrame:
         """Get all harmonized phenotypic data from the Nipoppy study.
 
         This function loads the study's harmonized phenotypic TSV file
@@ -141,6 +542,15 @@ class NipoppyDataRetriever:
         ``"nb:ParticipantID"`` and ``"nb:SessionID"`` for participant and session
         identifiers.
 
+        Parameters
+        ----------
+        participants : Optional[Collection[str]]
+            Participant IDs (with or without the ``sub-`` prefix) to retrieve data
+            for. By default, data for all participants is retrieved.
+        sessions : Optional[Collection[str]]
+            Session IDs (with or without the ``ses-`` prefix) to retrieve data for.
+            By default, data for all sessions is retrieved.
+
         Returns
         -------
         pd.DataFrame
@@ -156,19 +566,21 @@ class NipoppyDataRetriever:
         participant_id session_id
         001            1             70.0  snomed:248153007      ncit:C94342           nb:available
         """  # noqa E501
-        df = self._load_tsv(
-            self._study.layout.fpath_harmonized, index_cols=self._index_cols_phenotypes
-        )
-        df = self._filter_with_manifest(df)
-        return df
+        return self._get_phenotypes_table(participants=participants, sessions=sessions)
 
-    def get_phenotypes(self, phenotypes: List[str]) -> pd.DataFrame:
+    def get_phenotypes(
+        self,
+        phenotypes: List[str],
+        *,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+    ) -> pd.DataFrame:
         """Get harmonized phenotypic data from the Nipoppy study.
 
-        This function loads the study's harmonized phenotypic TSV file
-        (``<NIPOPPY_ROOT>/tabular/harmonized.tsv``). It then subsets the data to include
-        only the requested phenotypic columns, and filters the rows to include only
-        participants and sessions that are present in the study's manifest.
+        This function loads the requested phenotypic columns from the study's
+        harmonized phenotypic TSV file (``<NIPOPPY_ROOT>/tabular/harmonized.tsv``).
+        It then filters the rows to include only participants and sessions that are
+        present in the study's manifest.
 
         The harmonized phenotypic TSV file is expected to have columns
         ``"nb:ParticipantID"`` and ``"nb:SessionID"`` for participant and session
@@ -179,6 +591,12 @@ class NipoppyDataRetriever:
         phenotypes : List[str]
             List of Neurobagel TermURLs corresponding to phenotypic (demographics,
             assessments, etc.) columns to retrieve.
+        participants : Optional[Collection[str]]
+            Participant IDs (with or without the ``sub-`` prefix) to retrieve data
+            for. By default, data for all participants is retrieved.
+        sessions : Optional[Collection[str]]
+            Session IDs (with or without the ``ses-`` prefix) to retrieve data for.
+            By default, data for all sessions is retrieved.
 
         Returns
         -------
@@ -202,15 +620,26 @@ class NipoppyDataRetriever:
         001            1             70.0  snomed:248153007             nb:available
         """  # noqa E501
         _check_phenotypes_arg(phenotypes)
-        df = self.get_all_phenotypes()
+        df = self._get_phenotypes_table(
+            columns=phenotypes, participants=participants, sessions=sessions
+        )
         return df.loc[:, phenotypes]
 
-    def get_derivatives(self, derivatives: List[Tuple[str, str, str]]) -> pd.DataFrame:
+    def get_derivatives(
+        self,
+        derivatives: List[Tuple[str, str, str]],
+        *,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+        downcast: bool = False,
+    ) -> pd.DataFrame:
         """Get derivative data from the Nipoppy study.
 
         This functions loads and combines derivative TSV files from specified pipelines
         and versions, based on the provided filepath patterns. It filters the rows to
         include only participants and sessions that are present in the study's manifest.
+        Files are loaded concurrently, and each table is filtered (and optionally
+        downcasted) before the tables are joined.
 
         The derivatives TSV files are expected to have columns ``"participant_id"`` and
         ``"session_id"`` for participant and session identifiers.
@@ -221,6 +650,17 @@ class NipoppyDataRetriever:
             List of (``pipeline_name``, ``pipeline_version``, ``filepath_pattern``)
             tuples, for specifying derivative data to retrieve. ``filepath_pattern`` may
             include wildcards as per ``pathlib.Path.glob()``.
+        participants : Optional[Collection[str]]
+            Participant IDs (with or without the ``sub-`` prefix) to retrieve data
+            for. By default, data for all participants is retrieved.
+        sessions : Optional[Collection[str]]
+            Session IDs (with or without the ``ses-`` prefix) to retrieve data for.
+            By default, data for all sessions is retrieved.
+        downcast : bool
+            Whether to convert derivative data to smaller dtypes to reduce memory
+            usage (float32 instead of float64, categoricals for repeated strings),
+            by default False. Note that float32 values have about 7 significant
+            digits.
 
         Returns
         -------
@@ -243,22 +683,47 @@ class NipoppyDataRetriever:
         001            1                          17025.9              593.8  ...                     2.40661                   0.000468
         """  # noqa E501
         _check_derivatives_arg(derivatives)
-        dfs = []
-        for pipeline_name, pipeline_version, filepath_pattern in derivatives:
-            dfs.append(
-                self._get_derivatives_table(
-                    pipeline_name, pipeline_version, filepath_pattern
-                )
+        dfs = self._get_derivatives_tables(
+            derivatives, participants=participants, sessions=sessions, downcast=downcast
+        )
+        return pd.concat(dfs, axis="columns", join="outer")
+
+    def _get_derivatives_tables(
+        self,
+        derivatives: List[Tuple[str, str, str]],
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+        downcast: bool = False,
+    ) -> List[pd.DataFrame]:
+        """Load derivative tables in parallel, without joining them."""
+
+        def _get_table(derivative_spec: Tuple[str, str, str]) -> pd.DataFrame:
+            df = self._get_derivatives_table(
+                *derivative_spec, participants=participants, sessions=sessions
             )
-        df = pd.concat(dfs, axis="columns", join="outer")
-        df = self._filter_with_manifest(df)
-        return df
+            # reduce the table size before joining
+            df = self._filter_with_manifest(df)
+            if downcast:
+                df = _downcast_dtypes(df)
+            return df
+
+        # make sure the study object is created before starting threads
+        self._study
+
+        # the pandas CSV/Parquet readers release the GIL so threads are enough
+        with ThreadPoolExecutor(
+            max_workers=min(len(derivatives), os.cpu_count() or 1)
+        ) as executor:
+            return list(executor.map(_get_table, derivatives))
 
     def get_tabular_data(
         self,
         *,
         phenotypes: Optional[List[str]] = None,
         derivatives: Optional[List[Tuple[str, str, str]]] = None,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+        downcast: bool = False,
     ) -> pd.DataFrame:
         """Get harmonized tabular data from the Nipoppy study.
 
@@ -278,7 +743,8 @@ class NipoppyDataRetriever:
         to correspond to each other, as are ``"nb:SessionID"`` and ``"session_id"``.
 
         The output dataframe will only contain participants and sessions that are
-        present in the study's manifest.
+        present in the study's manifest (and in ``participants``/``sessions``, if
+        specified).
 
         Parameters
         ----------
@@ -289,6 +755,17 @@ class NipoppyDataRetriever:
             List of (``pipeline_name``, ``pipeline_version``, ``filepath_pattern``)
             tuples, for specifying derivative data to retrieve. ``filepath_pattern`` may
             include wildcards as per ``pathlib.Path.glob()``.
+        participants : Optional[Collection[str]]
+            Participant IDs (with or without the ``sub-`` prefix) to retrieve data
+            for. By default, data for all participants is retrieved.
+        sessions : Optional[Collection[str]]
+            Session IDs (with or without the ``ses-`` prefix) to retrieve data for.
+            By default, data for all sessions is retrieved.
+        downcast : bool
+            Whether to convert derivative data to smaller dtypes to reduce memory
+            usage (float32 instead of float64, categoricals for repeated strings),
+            by default False. Note that float32 values have about 7 significant
+            digits.
 
         Returns
         -------
@@ -321,7 +798,317 @@ class NipoppyDataRetriever:
 
         dfs = []
         if phenotypes:
-            dfs.append(self.get_phenotypes(phenotypes))
+            dfs.append(
+                self.get_phenotypes(
+                    phenotypes, participants=participants, sessions=sessions
+                )
+            )
         if derivatives:
-            dfs.append(self.get_derivatives(derivatives))
+            dfs.append(
+                self.get_derivatives(
+                    derivatives,
+                    participants=participants,
+                    sessions=sessions,
+                    downcast=downcast,
+                )
+            )
         return pd.concat(dfs, axis="columns", join="outer")
+
+    def _get_participant_chunks(
+        self,
+        participants: Optional[Set[str]],
+        sessions: Optional[Set[str]],
+        chunk_size: int,
+    ) -> Tuple[Dict[str, int], int]:
+        """Split the participants in the manifest into chunks.
+
+        Return the chunk index of each participant and the number of chunks.
+        """
+        # number of sessions for each participant, in manifest order
+        n_sessions_per_participant: Dict[str, int] = {}
+        for (
+            participant_id,
+            session_id,
+        ) in self._study.manifest.get_participants_sessions():
+            if (participants is None or participant_id in participants) and (
+                sessions is None or session_id in sessions
+            ):
+                n_sessions_per_participant[participant_id] = (
+                    n_sessions_per_participant.get(participant_id, 0) + 1
+                )
+
+        # group index of each participant
+        chunk_of_participant: Dict[str, int] = {}
+        n_chunks = 0
+        n_rows_chunk = 0
+        for participant_id, n_sessions in n_sessions_per_participant.items():
+            if n_rows_chunk and n_rows_chunk + n_sessions > chunk_size:
+                n_chunks += 1
+                n_rows_chunk = 0
+            chunk_of_participant[participant_id] = n_chunks
+            n_rows_chunk += n_sessions
+        if n_rows_chunk:
+            n_chunks += 1
+        return chunk_of_participant, n_chunks
+
+    def iter_tabular_data(
+        self,
+        *,
+        phenotypes: Optional[List[str]] = None,
+        derivatives: Optional[List[Tuple[str, str, str]]] = None,
+        participants: Optional[Collection[str]] = None,
+        sessions: Optional[Collection[str]] = None,
+        downcast: bool = False,
+        chunk_size: int = 1000,
+        low_memory: bool = False,
+    ) -> Iterator[pd.DataFrame]:
+        """Iterate over harmonized tabular data from the Nipoppy study, in chunks.
+
+        This is an alternative to :meth:`get_tabular_data` for large studies.
+        Participants in the study's manifest are split into groups of at most
+        ``chunk_size`` participant-sessions (or a single participant if they have more
+        sessions than that), and the data for each group is returned separately.
+
+        By default, each file is read once and the requested columns are kept in
+        memory, but the joined table (which can be much larger than the loaded
+        columns) is only built for one group at a time. With ``low_memory``, the
+        files are instead read again for each group and only the rows of that group
+        are kept, so that memory usage is bounded by ``chunk_size``. This is faster
+        for tables with a Parquet mirror (see :class:`NipoppyDataRetriever`), which
+        can be read for a subset of rows; TSV files are streamed.
+
+        Parameters
+        ----------
+        phenotypes : Optional[List[str]]
+            List of Neurobagel TermURLs, for specifying phenotypic (demographics,
+            assessments, etc.) data to retrieve.
+        derivatives : Optional[List[Tuple[str, str, str]]]
+            List of (``pipeline_name``, ``pipeline_version``, ``filepath_pattern``)
+            tuples, for specifying derivative data to retrieve. ``filepath_pattern`` may
+            include wildcards as per ``pathlib.Path.glob()``.
+        participants : Optional[Collection[str]]
+            Participant IDs (with or without the ``sub-`` prefix) to retrieve data
+            for. By default, data for all participants is retrieved.
+        sessions : Optional[Collection[str]]
+            Session IDs (with or without the ``ses-`` prefix) to retrieve data for.
+            By default, data for all sessions is retrieved.
+        downcast : bool
+            Whether to convert derivative data to smaller dtypes to reduce memory
+            usage (float32 instead of float64, categoricals for repeated strings),
+            by default False. Note that float32 values have about 7 significant
+            digits.
+        chunk_size : int
+            Maximum number of participant-sessions per chunk, by default 1000.
+        low_memory : bool
+            Whether to load the files separately for each chunk instead of once,
+            by default False.
+
+        Yields
+        ------
+        pd.DataFrame
+            Dataframes containing the requested phenotypic and derivative data for
+            a group of participants, with a ``pd.MultiIndex`` of participant IDs and
+            session IDs.
+
+        Examples
+        --------
+        >>> from nipoppy import NipoppyDataRetriever
+        >>> api = NipoppyDataRetriever("/path/to/dataset")
+        >>> for df in api.iter_tabular_data(
+        ...     phenotypes=["nb:Age", "nb:Sex"], chunk_size=500
+        ... ):
+        ...     print(df.shape)
+        (500, 2)
+        (327, 2)
+        """
+        if not (phenotypes or derivatives):
+            raise ValueError("Must request at least one measure")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, got {chunk_size}")
+
+        participants = _normalize_ids(participants, check_participant_id)
+        sessions = _normalize_ids(sessions, check_session_id)
+
+        chunk_of_participant, n_chunks = self._get_participant_chunks(
+            participants, sessions, chunk_size
+        )
+        if derivatives:
+            _check_derivatives_arg(derivatives)
+
+        def _get_tables(
+            participants_to_load: Optional[Collection[str]],
+        ) -> List[pd.DataFrame]:
+            dfs = []
+            if phenotypes:
+                dfs.append(
+                    self.get_phenotypes(
+                        phenotypes, participants=participants_to_load, sessions=sessions
+                    )
+                )
+            if derivatives:
+                dfs.extend(
+                    self._get_derivatives_tables(
+                        derivatives,
+                        participants=participants_to_load,
+                        sessions=sessions,
+                        downcast=downcast,
+                    )
+                )
+            return dfs
+
+        if low_memory:
+            participants_of_chunk = [set() for _ in range(n_chunks)]
+            for participant_id, i_chunk in chunk_of_participant.items():
+                participants_of_chunk[i_chunk].add(participant_id)
+            for participants_chunk in participants_of_chunk:
+                yield pd.concat(
+                    _get_tables(participants_chunk), axis="columns", join="outer"
+                )
+            return
+
+        # load each table once, instead of once per group
+        iterators = [
+            _iter_row_groups(df, chunk_of_participant, n_chunks)
+            for df in _get_tables(participants)
+        ]
+        for dfs_chunk in zip(*iterators):
+            yield pd.concat(dfs_chunk, axis="columns", join="outer")
+
+
+class NipoppyFederatedDataRetriever:
+    """API for getting data from multiple Nipoppy studies at once.
+
+    Data is retrieved from each study with a :class:`NipoppyDataRetriever`, with
+    studies processed in parallel threads, and combined into a single dataframe with
+    an additional ``study`` index level.
+    """
+
+    _index_col_study = "study"
+
+    def __init__(
+        self,
+        paths: Union[Mapping[str, StrOrPathLike], Iterable[StrOrPathLike]],
+        parquet_cache: bool = True,
+        n_jobs: Optional[int] = None,
+    ):
+        """Instantiate a NipoppyFederatedDataRetriever object.
+
+        Parameters
+        ----------
+        paths : Union[Mapping[str, StrOrPathLike], Iterable[StrOrPathLike]]
+            The paths to the Nipoppy study root directories. If a mapping is given,
+            its keys are used as study names in the output. Otherwise, the names of
+            the study root directories are used.
+        parquet_cache : bool, optional
+            Whether to mirror loaded TSV files as Parquet files for faster loading,
+            by default True. Ignored if ``pyarrow`` is not installed.
+        n_jobs : Optional[int], optional
+            Maximum number of studies to load data from at the same time, by default
+            all of them.
+        """
+        if isinstance(paths, Mapping):
+            paths_by_study = dict(paths)
+        else:
+            paths_by_study = {}
+            for path in paths:
+                study_name = Path(path).name
+                if study_name in paths_by_study:
+                    raise ValueError(
+                        f"Found more than one study named {study_name}, use a mapping "
+                        "of study names to paths instead"
+                    )
+                paths_by_study[study_name] = path
+        if len(paths_by_study) == 0:
+            raise ValueError("At least one study path must be given")
+
+        self._retrievers = {
+            study_name: NipoppyDataRetriever(path, parquet_cache=parquet_cache)
+            for study_name, path in paths_by_study.items()
+        }
+        self._n_jobs = n_jobs or len(self._retrievers)
+
+    @property
+    def studies(self) -> List[str]:
+        """Names of the studies."""
+        return list(self._retrievers)
+
+    def _get_combined(self, method_name: str, **kwargs) -> pd.DataFrame:
+        """Call a NipoppyDataRetriever method for each study and combine results."""
+
+        def _get(retriever: NipoppyDataRetriever) -> pd.DataFrame:
+            return getattr(retriever, method_name)(**kwargs)
+
+        with ThreadPoolExecutor(max_workers=self._n_jobs) as executor:
+            dfs = dict(
+                zip(self._retrievers, executor.map(_get, self._retrievers.values()))
+            )
+
+        return pd.concat(dfs, names=[self._index_col_study])
+
+    def get_all_phenotypes(self, **kwargs) -> pd.DataFrame:
+        """Get all harmonized phenotypic data from the Nipoppy studies.
+
+        See :meth:`NipoppyDataRetriever.get_all_phenotypes` for the arguments.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe containing all the phenotypic data, with a ``pd.MultiIndex``
+            of study names, participant IDs and session IDs.
+        """
+        return self._get_combined("get_all_phenotypes", **kwargs)
+
+    def get_phenotypes(self, phenotypes: List[str], **kwargs) -> pd.DataFrame:
+        """Get harmonized phenotypic data from the Nipoppy studies.
+
+        See :meth:`NipoppyDataRetriever.get_phenotypes` for the arguments.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe containing the requested phenotypic data, with a
+            ``pd.MultiIndex`` of study names, participant IDs and session IDs.
+        """
+        _check_phenotypes_arg(phenotypes)
+        return self._get_combined("get_phenotypes", phenotypes=phenotypes, **kwargs)
+
+    def get_derivatives(
+        self, derivatives: List[Tuple[str, str, str]], **kwargs
+    ) -> pd.DataFrame:
+        """Get derivative data from the Nipoppy studies.
+
+        See :meth:`NipoppyDataRetriever.get_derivatives` for the arguments.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe containing the requested derivative data, with a
+            ``pd.MultiIndex`` of study names, participant IDs and session IDs.
+        """
+        _check_derivatives_arg(derivatives)
+        return self._get_combined("get_derivatives", derivatives=derivatives, **kwargs)
+
+    def get_tabular_data(self, **kwargs) -> pd.DataFrame:
+        """Get harmonized tabular data from the Nipoppy studies.
+
+        See :meth:`NipoppyDataRetriever.get_tabular_data` for the arguments.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe containing the requested phenotypic and derivative data, with
+            a ``pd.MultiIndex`` of study names, participant IDs and session IDs.
+
+        Examples
+        --------
+        >>> from nipoppy import NipoppyFederatedDataRetriever
+        >>> api = NipoppyFederatedDataRetriever(["/path/to/study1", "/path/to/study2"])
+        >>> df = api.get_tabular_data(phenotypes=["nb:Age", "nb:Sex"])
+                                          nb:Age            nb:Sex
+        study  participant_id session_id
+        study1 001            1             70.0  snomed:248153007
+        study2 A01            BL            64.0  snomed:248152002
+        """  # noqa E501
+        if not (kwargs.get("phenotypes") or kwargs.get("derivatives")):
+            raise ValueError("Must request at least one measure")
+        return self._get_combined("get_tabular_data", **kwargs)
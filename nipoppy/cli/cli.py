@@ -48,13 +48,21 @@ click.rich_click.OPTION_GROUPS = {
                 "--empty",
                 "--copy-files",
                 "--check-dicoms",
+                "--check-dicoms-per-series",
+                "--extract-archives",
+                "--dicom-index",
                 "--tar",
+                "--tar-compression",
                 "--query",
                 "--size",
                 "--zenodo-id",
                 "--password-file",
                 "--sandbox",
+                "--no-cache",
+                "--live",
                 "--community",
+                "--verify-images",
+                "--refresh-images",
             ],
         },
         {
@@ -71,6 +79,7 @@ click.rich_click.OPTION_GROUPS = {
                 "--hpc",
                 "--write-subcohort",
                 "--n-jobs",
+                "--persistent-container",
             ],
         },
         {
@@ -123,12 +132,20 @@ if cli.commands.get("gui"):
 )
 @click.option(
     "--mode",
-    type=click.Choice(["copy", "move", "symlink"]),
+    type=click.Choice(["copy", "hardlink", "move", "symlink"]),
     default="symlink",
     help=(
-        "If using a BIDS source, specify whether to copy, move, or symlink the files."
+        "If using a BIDS source, specify whether to copy, hardlink, move, or symlink "
+        "the files. Hard links fall back to copies across filesystems. An interrupted "
+        "copy can be resumed by rerunning the command with --force."
     ),
 )
+@click.option(
+    "--n-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of parallel workers to use when copying a BIDS source.",
+)
 @click.option(
     "--container-store",
     type=click.Path(exists=True, file_okay=False, path_type=Path, resolve_path=True),
@@ -208,6 +225,42 @@ def track_curation(**params):
         "converters). The paths to the derived DICOMs will be written to the log."
     ),
 )
+@click.option(
+    "--check-dicoms-per-series",
+    is_flag=True,
+    help=(
+        "When using --check-dicoms, only read the header of one file per series "
+        "directory and assume the result holds for the other files in it."
+    ),
+)
+@click.option(
+    "--extract-archives",
+    is_flag=True,
+    help=(
+        "Stream the content of ZIP/TAR archives found in the raw DICOM directories "
+        "directly into the reorganized directory, instead of symlinking or copying "
+        "the archives themselves."
+    ),
+)
+@click.option(
+    "--dicom-index",
+    is_flag=True,
+    help=(
+        "Build an index of DICOM header fields (series UID/description, image type, "
+        "acquisition time) for the reorganized files, with one Parquet file per "
+        "participant-session in <NIPOPPY_PROJECT_ROOT>/sourcedata/imaging/"
+        "dicom_index. Requires pip install nipoppy[parquet]."
+    ),
+)
+@click.option(
+    "--n-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help=(
+        "Number of parallel workers to use when checking, copying or indexing "
+        "DICOM files."
+    ),
+)
 @global_options
 @layout_option
 def reorg(**params):
@@ -249,6 +302,14 @@ def bidsify(**params):
         "in the tracker configuration file."
     ),
 )
+@click.option(
+    "--tar-compression",
+    type=click.Choice(["gzip", "zstd"]),
+    help=(
+        "Compress the tarballs created with --tar. zstd compression requires an "
+        "additional dependency (pip install nipoppy[zstd])."
+    ),
+)
 @global_options
 @layout_option
 def process(**params):
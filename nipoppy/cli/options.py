@@ -161,6 +161,15 @@ def runners_options(func):
         is_flag=True,
         help="Simulate the pipeline run without executing the generated command-line.",
     )(func)
+    func = click.option(
+        "--persistent-container",
+        is_flag=True,
+        help=(
+            "Start the pipeline container once (per parallel worker) and run all "
+            "participants/sessions inside it, instead of starting a new container "
+            "for each run. Useful for short runs with large container images."
+        ),
+    )(func)
     func = pipeline_options(func)
     return func
 
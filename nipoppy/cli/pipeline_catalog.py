@@ -14,7 +14,8 @@ from nipoppy.cli.options import (
     layout_option,
     password_file_option,
 )
-from nipoppy.env import PipelineTypeEnum
+from nipoppy.env import DPATH_USER_CACHE, PipelineTypeEnum
+from nipoppy.pipeline_catalog import PipelineCatalog
 from nipoppy.zenodo_api import ZenodoAPI
 
 
@@ -37,6 +38,31 @@ def zenodo_options(func):
     return func
 
 
+def zenodo_cache_option(func):
+    """Define option for disabling the Zenodo response cache."""
+    func = click.option(
+        "--no-cache",
+        "no_cache",
+        is_flag=True,
+        help=(
+            "Do not use or update the local cache of Zenodo API responses"
+            f" (in {DPATH_USER_CACHE})."
+        ),
+    )(func)
+    return func
+
+
+def _get_zenodo_cache_dir(no_cache: bool) -> Path | None:
+    if no_cache:
+        return None
+    return Path(DPATH_USER_CACHE, "zenodo").expanduser()
+
+
+def _get_pipeline_catalog(sandbox: bool) -> PipelineCatalog:
+    fname = "pipeline_catalog_sandbox.sqlite" if sandbox else "pipeline_catalog.sqlite"
+    return PipelineCatalog(Path(DPATH_USER_CACHE, fname))
+
+
 @pipeline.command("search")
 @click.argument("query", type=str, default="")
 @click.option(
@@ -56,21 +82,61 @@ def zenodo_options(func):
         " community."
     ),
 )
+@click.option(
+    "--live",
+    is_flag=True,
+    help=(
+        "Search Zenodo directly instead of the local pipeline catalog"
+        ' (see "nipoppy pipeline sync").'
+    ),
+)
 @password_file_option(required=False)
 @zenodo_options
+@zenodo_cache_option
 @global_options
 def pipeline_search(**params):
-    """Search for available pipelines on Zenodo."""
+    """Search for available pipelines on Zenodo.
+
+    If the local pipeline catalog has been synced, it is searched instead of Zenodo.
+    """
     from nipoppy.workflows.pipeline_store.search import PipelineSearchWorkflow
 
+    params["catalog"] = _get_pipeline_catalog(params["sandbox"])
+    # --no-cache also prevents live results from being added to the catalog
+    params["update_catalog"] = not params["no_cache"]
     params["zenodo_api"] = ZenodoAPI(
         sandbox=params.pop("sandbox"),
         password_file=params.pop("password_file", None),
+        cache_dir=_get_zenodo_cache_dir(params.pop("no_cache")),
     )
     with exception_handler(PipelineSearchWorkflow(**params)) as workflow:
         workflow.run()
 
 
+@pipeline.command("sync")
+@click.option(
+    "--dataset",
+    "dpath_root",
+    type=click.Path(exists=True, file_okay=False, path_type=Path, resolve_path=True),
+    help="Path to the root of a dataset whose installed pipelines should be added.",
+)
+@layout_option
+@zenodo_options
+@global_options
+def pipeline_sync(**params):
+    """Update the local pipeline catalog used for offline search.
+
+    The catalog contains all Nipoppy pipelines available on Zenodo, and optionally
+    the pipelines installed in a dataset.
+    """
+    from nipoppy.workflows.pipeline_store.sync import PipelineSyncWorkflow
+
+    params["catalog"] = _get_pipeline_catalog(params["sandbox"])
+    params["zenodo_api"] = ZenodoAPI(sandbox=params.pop("sandbox"))
+    with exception_handler(PipelineSyncWorkflow(**params)) as workflow:
+        workflow.run()
+
+
 @pipeline.command("create")
 @click.argument(
     "pipeline_dir",
@@ -114,8 +180,11 @@ def pipeline_create(**params):
 @click.argument(
     "source",
     type=str,
+    nargs=-1,
+    required=True,
 )
 @zenodo_options
+@zenodo_cache_option
 @dataset_option
 @click.option(
     "--force",
@@ -124,6 +193,22 @@ def pipeline_create(**params):
     is_flag=True,
     help="Overwrite existing pipeline directory if it exists.",
 )
+@click.option(
+    "--verify-images",
+    is_flag=True,
+    help=(
+        "Check the SHA-256 digest of container images reused from the image store "
+        "(slow for large images)."
+    ),
+)
+@click.option(
+    "--refresh-images",
+    is_flag=True,
+    help=(
+        "Pull container images again even if they are already downloaded or in the "
+        "image store (e.g. to update mutable tags like 'latest')."
+    ),
+)
 @global_options
 @layout_option
 @password_file_option(required=False)
@@ -132,7 +217,8 @@ def pipeline_install(**params):
     """
     Install a new pipeline into a dataset.
 
-    The source of the pipeline can be a local directory or a Zenodo ID.
+    The source of the pipeline can be a local directory or a Zenodo ID. Several
+    Zenodo IDs can be given to download and install multiple pipelines at once.
     """
     from nipoppy.workflows.pipeline_store.install import PipelineInstallWorkflow
 
@@ -140,6 +226,7 @@ def pipeline_install(**params):
     params["zenodo_api"] = ZenodoAPI(
         sandbox=params.pop("sandbox"),
         password_file=params.pop("password_file", None),
+        cache_dir=_get_zenodo_cache_dir(params.pop("no_cache")),
     )
     with exception_handler(PipelineInstallWorkflow(**params)) as workflow:
         workflow.run()
@@ -1,11 +1,14 @@
 """Classes for generating container commands."""
 
 import argparse
+import collections
+import functools
 import os
 import platform
 import shlex
 import shutil
 import subprocess
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Iterable, Optional
@@ -21,6 +24,88 @@ BIND_SEP = ":"
 logger = get_logger()
 
 
+@functools.lru_cache
+def _get_bind_parser(bind_flags: tuple[str]) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(exit_on_error=False)
+    parser.add_argument(*bind_flags, dest="bind", action="extend", nargs=1)
+    return parser
+
+
+class _ImageInventory:
+    """Per-process cache of the container images that are available locally.
+
+    Image files are checked against a single listing of their parent directory,
+    and Docker images against a single ``docker images`` call. The cache must be
+    cleared (with :func:`clear_image_inventory`) after pulling images.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dir_listings: dict[str, frozenset[str]] = {}
+        self._docker_images: dict[str, frozenset[str]] = {}
+        self._docker_inspected: dict[tuple[str, str], bool] = {}
+
+    def clear(self):
+        with self._lock:
+            self._dir_listings.clear()
+            self._docker_images.clear()
+            self._docker_inspected.clear()
+
+    def has_file(self, fpath: StrOrPathLike) -> bool:
+        dpath, fname = os.path.split(os.path.abspath(fpath))
+        with self._lock:
+            if dpath not in self._dir_listings:
+                try:
+                    with os.scandir(dpath) as entries:
+                        # follow symlinks (dangling symlinks are not images)
+                        self._dir_listings[dpath] = frozenset(
+                            entry.name
+                            for entry in entries
+                            if entry.is_file() or entry.is_dir()
+                        )
+                except OSError:
+                    self._dir_listings[dpath] = frozenset()
+            return fname in self._dir_listings[dpath]
+
+    def has_docker_image(self, command: str, image: str) -> bool:
+        with self._lock:
+            if command not in self._docker_images:
+                result = subprocess.run(
+                    [command, "images", "--format", "{{.Repository}}:{{.Tag}}"],
+                    capture_output=True,
+                    text=True,
+                )
+                self._docker_images[command] = (
+                    frozenset(result.stdout.split())
+                    if result.returncode == 0
+                    else frozenset()
+                )
+            tagged_image = image
+            if ":" not in image.rsplit("/", 1)[-1]:
+                tagged_image = f"{image}:latest"
+            if tagged_image in self._docker_images[command]:
+                return True
+
+            # the listing does not contain digests or default registry prefixes
+            if (command, image) not in self._docker_inspected:
+                result = subprocess.run(
+                    [command, "image", "inspect", image], capture_output=True
+                )
+                self._docker_inspected[(command, image)] = result.returncode == 0
+            return self._docker_inspected[(command, image)]
+
+
+_IMAGE_INVENTORY = _ImageInventory()
+
+
+def clear_image_inventory():
+    """Clear the cache of locally available container images.
+
+    This should be called after container images are pulled or removed.
+    """
+    _IMAGE_INVENTORY.clear()
+
+
 class ContainerHandler(Base, ABC):
     """Abstract class for container handlers."""
 
@@ -45,6 +130,17 @@ class ContainerHandler(Base, ABC):
             args = []
 
         self.args = args[:]
+        self.env_args = []
+
+        # leading args that have already been checked by fix_bind_args()
+        self._checked_args = []
+
+    def copy(self) -> "ContainerHandler":
+        """Return a copy of the handler that can be modified independently."""
+        handler = self.__class__(args=self.args)
+        handler.env_args = self.env_args[:]
+        handler._checked_args = self._checked_args[:]
+        return handler
 
     def check_command_exists(self):
         """Check that the command is available (i.e. in PATH)."""
@@ -90,19 +186,22 @@ class ContainerHandler(Base, ABC):
         )
 
     def fix_bind_args(self):
-        """Fix bind flags in args."""
-        # use argparse to parse all the bind flags
-        bind_spec_dest = "bind"
-        parser = argparse.ArgumentParser(exit_on_error=False)
-        parser.add_argument(
-            *self.bind_flags, dest=bind_spec_dest, action="extend", nargs=1
-        )
+        """Fix bind flags in args.
+
+        Args that have already been checked by a previous call are skipped.
+        """
+        n_checked = len(self._checked_args)
+        if self.args[:n_checked] != self._checked_args:
+            n_checked = 0
+        args_to_check = self.args[n_checked:]
 
         replacement_map = {}
         try:
-            # get all bind arguments
-            known_args, _ = parser.parse_known_args(self.args)
-            bind_specs = getattr(known_args, bind_spec_dest)
+            # use argparse to get all the bind arguments
+            known_args, _ = _get_bind_parser(tuple(self.bind_flags)).parse_known_args(
+                args_to_check
+            )
+            bind_specs = known_args.bind
             if bind_specs is not None:
                 for bind_spec in bind_specs:
                     # get the local path
@@ -116,7 +215,6 @@ class ContainerHandler(Base, ABC):
                     # path must be absolute and exist
                     path_local = path_local.resolve()
                     if path_local != path_local_original:
-                        path_local = path_local.resolve()
                         logger.debug(
                             "Resolving path for container"
                             f": {path_local_original} -> {path_local}"
@@ -143,15 +241,19 @@ class ContainerHandler(Base, ABC):
             ) from e
 
         # apply replacements
-        args_str = shlex.join(self.args)
         for to_replace, replacement in replacement_map.items():
-            args_str = args_str.replace(to_replace, replacement)
+            args_to_check = [
+                arg.replace(to_replace, replacement) for arg in args_to_check
+            ]
 
-        self.args = shlex.split(args_str)
+        self.args = self.args[:n_checked] + args_to_check
+        self._checked_args = self.args[:]
 
     def add_env_arg(self, key: str, value: str):
         """Set environment variables for the container."""
-        self.args.extend([self.env_flag, f"{key}={value}"])
+        env_args = [self.env_flag, f"{key}={value}"]
+        self.args.extend(env_args)
+        self.env_args.extend(env_args)
 
     def get_shell_command(
         self,
@@ -173,12 +275,104 @@ class ContainerHandler(Base, ABC):
         self.fix_bind_args()
         return shlex.join([self.command, subcommand] + self.args)
 
+    def get_instance_start_args(self) -> list[str]:
+        """Get the container arguments for starting a persistent container instance.
+
+        These are the container arguments without the environment variables set with
+        :meth:`add_env_arg`, which are instead passed to each command run inside the
+        instance (see :meth:`get_instance_exec_args`).
+
+        Returns
+        -------
+        list[str]
+            The container arguments
+        """
+        env_pairs = collections.Counter(zip(self.env_args[::2], self.env_args[1::2]))
+        # the environment variables were added after any from the container config,
+        # so look for them from the end
+        args = []
+        i_arg = len(self.args)
+        while i_arg > 0:
+            pair = tuple(self.args[i_arg - 2 : i_arg])
+            if i_arg >= 2 and env_pairs[pair] > 0:
+                env_pairs[pair] -= 1
+                i_arg -= 2
+            else:
+                args.append(self.args[i_arg - 1])
+                i_arg -= 1
+        return args[::-1]
+
+    def get_instance_start_command(self, name: str, image: str) -> str:
+        """Get the shell command for starting a persistent container instance.
+
+        The instance is started with the container arguments from
+        :meth:`get_instance_start_args` (including bind paths), and commands can then
+        be run inside it using the arguments from :meth:`get_instance_exec_args`.
+
+        Parameters
+        ----------
+        name : str
+            Name of the instance
+        image : str
+            Container image (path to an image file or image name)
+
+        Returns
+        -------
+        str
+            The command string
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support persistent instances"
+        )
+
+    def get_instance_exec_args(self, name: str, subcommand: str = "exec") -> list[str]:
+        """Get the arguments for running a command inside a container instance.
+
+        The last element of the returned list is the reference to the instance (to
+        be used in place of the container image).
+
+        Parameters
+        ----------
+        name : str
+            Name of the instance
+        subcommand : str, optional
+            Subcommand to use (e.g. "run", "exec"), by default "exec"
+
+        Returns
+        -------
+        list[str]
+            The command arguments
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support persistent instances"
+        )
+
+    def get_instance_stop_command(self, name: str) -> str:
+        """Get the shell command for stopping a container instance.
+
+        Parameters
+        ----------
+        name : str
+            Name of the instance
+
+        Returns
+        -------
+        str
+            The command string
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support persistent instances"
+        )
+
     @abstractmethod
     def is_image_downloaded(
         self, uri: Optional[str], fpath_container: Optional[StrOrPathLike]
     ) -> bool:
         """Check if a container image has been downloaded.
 
+        Results are cached for the current process, see
+        :func:`clear_image_inventory`.
+
         Parameters
         ----------
         uri : Optional[str]
@@ -252,7 +446,7 @@ class ApptainerHandler(ContainerHandler):
         """
         if fpath_container is None:
             raise ContainerError("Path to container image must be specified")
-        return Path(fpath_container).exists()
+        return _IMAGE_INVENTORY.has_file(fpath_container)
 
     def get_pull_confirmation_prompt(self, fpath_container: StrOrPathLike) -> str:
         """Get the confirmation prompt for pulling the container image.
@@ -295,6 +489,24 @@ class ApptainerHandler(ContainerHandler):
             )
         return shlex.join([self.command, "pull", str(fpath_container), uri])
 
+    def get_instance_start_command(self, name: str, image: str) -> str:
+        """Get the shell command for starting an Apptainer instance."""
+        self.check_command_exists()
+        self.fix_bind_args()
+        return shlex.join(
+            [self.command, "instance", "start"]
+            + self.get_instance_start_args()
+            + [str(image), name]
+        )
+
+    def get_instance_exec_args(self, name: str, subcommand: str = "exec") -> list[str]:
+        """Get the arguments for running a command inside an Apptainer instance."""
+        return [self.command, subcommand] + self.env_args + [f"instance://{name}"]
+
+    def get_instance_stop_command(self, name: str) -> str:
+        """Get the shell command for stopping an Apptainer instance."""
+        return shlex.join([self.command, "instance", "stop", name])
+
 
 class SingularityHandler(ApptainerHandler):
     """Container handler for Singularity."""
@@ -330,11 +542,7 @@ class DockerHandler(ContainerHandler):
         """
         if uri is None:
             raise ContainerError("URI must be specified")
-        uri = self._strip_prefix(uri)
-        result = subprocess.run(
-            [self.command, "image", "inspect", uri], capture_output=True
-        )
-        return result.returncode == 0
+        return _IMAGE_INVENTORY.has_docker_image(self.command, self._strip_prefix(uri))
 
     def get_pull_confirmation_prompt(self, fpath_container: StrOrPathLike) -> str:
         """Get the confirmation prompt for pulling the container image.
@@ -378,6 +586,32 @@ class DockerHandler(ContainerHandler):
         cmd.append(uri)
         return shlex.join(cmd)
 
+    def get_instance_start_command(self, name: str, image: str) -> str:
+        """Get the shell command for starting a detached Docker container.
+
+        The image entrypoint is replaced by a command that runs until the container
+        is stopped.
+        """
+        self.check_command_exists()
+        self.fix_bind_args()
+        return shlex.join(
+            [self.command, "run", "--detach", "--rm", "--name", name]
+            + self.get_instance_start_args()
+            + ["--entrypoint", "sleep", self._strip_prefix(image), "infinity"]
+        )
+
+    def get_instance_exec_args(self, name: str, subcommand: str = "exec") -> list[str]:
+        """Get the arguments for running a command inside a Docker container.
+
+        The subcommand is always "exec" since Docker cannot run the image entrypoint
+        inside an existing container.
+        """
+        return [self.command, "exec"] + self.env_args + [name]
+
+    def get_instance_stop_command(self, name: str) -> str:
+        """Get the shell command for stopping (and removing) a Docker container."""
+        return shlex.join([self.command, "rm", "--force", name])
+
 
 class BareMetalHandler(ContainerHandler):
     """Handler for bare metal execution (no container)."""
@@ -0,0 +1,199 @@
+"""Store for container image files, keyed by image URI."""
+
+from __future__ import annotations
+
+import hashlib
+import datetime
+import json
+import os
+import time
+from pathlib import Path
+
+from nipoppy.env import StrOrPathLike
+from nipoppy.logger import get_logger
+
+# directory (in the containers directory) with the stored images
+DNAME_IMAGE_STORE = ".image_store"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+logger = get_logger()
+
+
+def _hash_file(fpath: Path) -> str:
+    digest = hashlib.sha256()
+    with open(fpath, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """Store for container image files, keyed by image URI.
+
+    Each image is stored once, under a key derived from its URI (not from its
+    content, so a stored image is reused even if the URI refers to a mutable
+    tag). Image files used by datasets are hard links to the stored images (or
+    symbolic links if hard links cannot be created, e.g. across filesystems), so
+    datasets sharing a container store never hold several copies of the same
+    image.
+
+    Each stored image has a metadata file with its URI and size, which are used to
+    check that the image is complete. Computing the SHA-256 digest of an image
+    requires reading the whole file, so it is only done if requested (see
+    :meth:`add_image` and :meth:`has_image`).
+    """
+
+    def __init__(self, dpath: StrOrPathLike):
+        self.dpath = Path(dpath)
+
+    def get_key(self, uri: str) -> str:
+        """Get the store key for an image URI."""
+        return hashlib.sha256(uri.strip().encode()).hexdigest()
+
+    def get_fpath_image(self, uri: str) -> Path:
+        """Get the path to the stored image file."""
+        return self.dpath / f"{self.get_key(uri)}.img"
+
+    def get_fpath_metadata(self, uri: str) -> Path:
+        """Get the path to the stored image's metadata file."""
+        return self.dpath / f"{self.get_key(uri)}.json"
+
+    def get_fpath_lock(self, uri: str) -> Path:
+        """Get the path to the lock file to hold while adding an image."""
+        return self.dpath / f".{self.get_key(uri)}.lock"
+
+    def get_fpath_temp(self, uri: str) -> Path:
+        """Get a temporary path (on the store's filesystem) to pull an image to."""
+        return self.dpath / f".{self.get_key(uri)}.{os.getpid()}"
+
+    def _load_metadata(self, uri: str) -> dict | None:
+        try:
+            return json.loads(self.get_fpath_metadata(uri).read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exception:
+            logger.debug(f"Ignoring invalid image metadata for {uri}: {exception}")
+            return None
+
+    def _write_metadata(self, uri: str, metadata: dict):
+        fpath_metadata = self.get_fpath_metadata(uri)
+        fpath_metadata_tmp = fpath_metadata.with_name(
+            f".{fpath_metadata.name}.{os.getpid()}"
+        )
+        fpath_metadata_tmp.write_text(json.dumps(metadata))
+        os.replace(fpath_metadata_tmp, fpath_metadata)
+
+    def has_image(self, uri: str, verify_digest: bool = False) -> bool:
+        """Check if a complete image is stored for a URI.
+
+        Parameters
+        ----------
+        uri : str
+            URI of the container image
+        verify_digest : bool, optional
+            Whether to also check the SHA-256 digest of the stored image (slow for
+            large images), by default False. If the image was added without a
+            digest, the digest is computed and recorded for later checks.
+
+        Returns
+        -------
+        bool
+            True if the image is stored and its size (and digest if requested)
+            matches the metadata
+        """
+        metadata = self._load_metadata(uri)
+        if metadata is None or metadata.get("uri") != uri:
+            return False
+
+        fpath_image = self.get_fpath_image(uri)
+        try:
+            size = fpath_image.stat().st_size
+        except FileNotFoundError:
+            return False
+
+        if size != metadata.get("size"):
+            logger.warning(f"Ignoring corrupted image for {uri} in {self.dpath}")
+            return False
+
+        if verify_digest:
+            logger.info(f"Verifying stored image for {uri}")
+            digest = _hash_file(fpath_image)
+            if metadata.get("sha256") is None:
+                self._write_metadata(uri, {**metadata, "sha256": digest})
+            elif digest != metadata["sha256"]:
+                logger.warning(f"Ignoring corrupted image for {uri} in {self.dpath}")
+                return False
+        return True
+
+    def add_image(
+        self, uri: str, fpath_source: StrOrPathLike, compute_digest: bool = False
+    ) -> Path:
+        """Move a pulled image file into the store.
+
+        Parameters
+        ----------
+        uri : str
+            URI of the container image
+        fpath_source : nipoppy.env.StrOrPathLike
+            Path to the pulled image file, should be on the same filesystem as the
+            store (see :meth:`get_fpath_temp`)
+        compute_digest : bool, optional
+            Whether to record the SHA-256 digest of the image, by default False
+
+        Returns
+        -------
+        Path
+            Path to the stored image
+        """
+        fpath_source = Path(fpath_source)
+        metadata = {
+            "uri": uri,
+            "size": fpath_source.stat().st_size,
+            "sha256": _hash_file(fpath_source) if compute_digest else None,
+        }
+
+        self.dpath.mkdir(parents=True, exist_ok=True)
+        fpath_image = self.get_fpath_image(uri)
+        os.replace(fpath_source, fpath_image)
+        self._write_metadata(uri, metadata)
+        logger.debug(f"Added image for {uri} to the store: {fpath_image}")
+        return fpath_image
+
+    def describe_image(self, uri: str) -> str:
+        """Get a short description (age and digest) of a stored image, for logging."""
+        metadata = self._load_metadata(uri) or {}
+        try:
+            age = datetime.timedelta(
+                seconds=round(time.time() - self.get_fpath_image(uri).stat().st_mtime)
+            )
+        except OSError:
+            age = "unknown"
+        digest = metadata.get("sha256") or "not computed"
+        return f"age: {age}, SHA-256: {digest}"
+
+    def link_image(self, uri: str, fpath_target: StrOrPathLike):
+        """Create (or replace) a link to a stored image.
+
+        Parameters
+        ----------
+        uri : str
+            URI of the container image
+        fpath_target : nipoppy.env.StrOrPathLike
+            Path of the link
+        """
+        fpath_image = self.get_fpath_image(uri)
+        fpath_target = Path(fpath_target)
+        fpath_target.parent.mkdir(parents=True, exist_ok=True)
+
+        fpath_tmp = fpath_target.with_name(f".{fpath_target.name}.{os.getpid()}")
+        fpath_tmp.unlink(missing_ok=True)
+        try:
+            os.link(fpath_image, fpath_tmp)
+        except OSError as exception:
+            logger.debug(
+                f"Could not hard link {fpath_image}, using a symlink instead"
+                f": {exception}"
+            )
+            fpath_tmp.symlink_to(fpath_image.resolve())
+        os.replace(fpath_tmp, fpath_target)
@@ -47,6 +47,9 @@ DEFAULT_PIPELINE_STEP_NAME = "default"
 # user-level config
 FPATH_USER_CONFIG = "~/.nipoppy/config.json"
 
+# user-level cache
+DPATH_USER_CACHE = "~/.nipoppy/cache"
+
 # file extensions
 EXT_TAR = ".tar"
 EXT_LOG = ".log"
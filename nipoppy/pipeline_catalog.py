@@ -0,0 +1,262 @@
+"""Local catalog of Nipoppy pipelines with full-text search."""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from nipoppy.config.pipeline import BasePipelineConfig
+from nipoppy.env import StrOrPathLike
+
+# sources of catalog entries
+SOURCE_ZENODO = "zenodo"
+SOURCE_INSTALLED = "installed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    location TEXT,
+    communities TEXT NOT NULL,
+    downloads INTEGER,
+    text TEXT NOT NULL,
+    hit TEXT NOT NULL
+);
+"""
+_SCHEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    key UNINDEXED, text, tokenize = 'unicode61'
+);
+"""
+
+
+def _get_hit_text(hit: dict) -> str:
+    """Get the searchable text of a Zenodo record."""
+    metadata = hit.get("metadata", {})
+    keywords = metadata.get("keywords", [])
+    return "\n".join(
+        [
+            hit.get("title") or "",
+            metadata.get("description") or "",
+            " ".join(keywords),
+        ]
+    )
+
+
+def _get_query_tokens(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+class PipelineCatalog:
+    """Local index of Nipoppy pipelines, stored in a SQLite database.
+
+    The catalog contains Nipoppy pipeline records from Zenodo, and optionally the
+    pipeline bundles installed in a dataset. Records are stored as returned by the
+    Zenodo search API so that search results from the catalog and from Zenodo can
+    be handled the same way.
+
+    Search uses the SQLite FTS5 extension if it is available, otherwise it falls back
+    to (slower) substring matching.
+    """
+
+    def __init__(self, fpath: StrOrPathLike):
+        """Initialize the catalog. The database file is created on first use."""
+        self.fpath = Path(fpath).expanduser()
+        self._has_fts = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the database in a transaction, creating the tables if needed."""
+        self.fpath.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.fpath)) as connection:
+            with connection:
+                connection.executescript(_SCHEMA)
+                if self._has_fts is not False:
+                    try:
+                        connection.executescript(_SCHEMA_FTS)
+                        self._has_fts = True
+                    except sqlite3.OperationalError:
+                        # SQLite was compiled without FTS5
+                        self._has_fts = False
+                yield connection
+
+    @property
+    def last_sync(self) -> Optional[float]:
+        """Get the time of the last sync with Zenodo (None if never synced)."""
+        if not self.fpath.exists():
+            return None
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'last_sync'"
+            ).fetchone()
+        return None if row is None else float(row[0])
+
+    def _delete_records(self, connection: sqlite3.Connection, where: str, params=()):
+        if self._has_fts:
+            connection.execute(
+                "DELETE FROM records_fts WHERE key IN "
+                f"(SELECT key FROM records WHERE {where})",
+                params,
+            )
+        connection.execute(f"DELETE FROM records WHERE {where}", params)
+
+    def _insert_record(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        source: str,
+        hit: dict,
+        location: Optional[str] = None,
+    ):
+        self._delete_records(connection, "key = ?", (key,))
+        communities = " ".join(
+            community["id"]
+            for community in hit.get("metadata", {}).get("communities", [])
+            if community.get("id") is not None
+        )
+        text = _get_hit_text(hit)
+        connection.execute(
+            "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                source,
+                location,
+                communities,
+                hit.get("stats", {}).get("downloads"),
+                text,
+                json.dumps(hit),
+            ),
+        )
+        if self._has_fts:
+            connection.execute("INSERT INTO records_fts VALUES (?, ?)", (key, text))
+
+    def add_zenodo_records(self, hits: Iterable[dict], replace: bool = False):
+        """Add (or update) Zenodo records in the catalog.
+
+        Parameters
+        ----------
+        hits : Iterable[dict]
+            Records as returned by :meth:`nipoppy.zenodo_api.ZenodoAPI.search_records`.
+        replace : bool, optional
+            If True, remove all existing Zenodo records and mark the catalog as synced,
+            by default False
+        """
+        with self._connect() as connection:
+            if replace:
+                self._delete_records(connection, "source = ?", (SOURCE_ZENODO,))
+            for hit in hits:
+                self._insert_record(
+                    connection, f"{SOURCE_ZENODO}:{hit['id']}", SOURCE_ZENODO, hit
+                )
+            if replace:
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('last_sync', ?)",
+                    (str(time.time()),),
+                )
+
+    def add_installed_pipelines(
+        self,
+        dpath_pipelines: StrOrPathLike,
+        pipelines: Iterable[tuple[Path, BasePipelineConfig]],
+    ):
+        """Replace the installed pipelines of a dataset in the catalog.
+
+        Parameters
+        ----------
+        dpath_pipelines : nipoppy.env.StrOrPathLike
+            Path to the pipelines directory of the dataset.
+        pipelines : Iterable[tuple[Path, nipoppy.config.pipeline.BasePipelineConfig]]
+            Paths to the installed pipeline bundles and their configs.
+        """
+        location = str(Path(dpath_pipelines).resolve())
+        with self._connect() as connection:
+            self._delete_records(
+                connection, "source = ? AND location = ?", (SOURCE_INSTALLED, location)
+            )
+            for dpath_bundle, pipeline_config in pipelines:
+                keywords = [
+                    f"pipeline_name:{pipeline_config.NAME}",
+                    f"pipeline_version:{pipeline_config.VERSION}",
+                ]
+                if pipeline_config.PIPELINE_TYPE is not None:
+                    keywords.insert(
+                        0, f"pipeline_type:{pipeline_config.PIPELINE_TYPE.value}"
+                    )
+                hit = {
+                    "id": None,
+                    "title": f"{pipeline_config.NAME}-{pipeline_config.VERSION}",
+                    "metadata": {
+                        "description": pipeline_config.DESCRIPTION
+                        or f"Installed in {dpath_bundle}",
+                        "keywords": keywords,
+                    },
+                    "path": str(dpath_bundle),
+                }
+                self._insert_record(
+                    connection,
+                    f"{SOURCE_INSTALLED}:{dpath_bundle}",
+                    SOURCE_INSTALLED,
+                    hit,
+                    location=location,
+                )
+
+    def search(
+        self, query: str, community_id: Optional[str] = None, size: int = 10
+    ) -> dict:
+        """Search the catalog.
+
+        All words in the query must match (as prefixes of words in the record title,
+        description or keywords). Results are sorted by number of downloads.
+
+        Parameters
+        ----------
+        query : str
+            Search query. An empty query matches all records.
+        community_id : Optional[str], optional
+            If set, only return Zenodo records from this community, by default None
+        size : int, optional
+            Maximum number of results to return, by default 10
+
+        Returns
+        -------
+        dict
+            Dictionary with the same structure as the ``"hits"`` field of the Zenodo
+            search API response: ``"hits"`` (list of records) and ``"total"``.
+        """
+        if size < 1:
+            raise ValueError(f"size must be greater than 0, got {size}.")
+
+        conditions = []
+        params = []
+        tokens = _get_query_tokens(query)
+        with self._connect() as connection:
+            if tokens and self._has_fts:
+                conditions.append(
+                    "key IN (SELECT key FROM records_fts WHERE records_fts MATCH ?)"
+                )
+                params.append(" ".join(f'"{token}"*' for token in tokens))
+            else:
+                for token in tokens:
+                    conditions.append("lower(text) LIKE ?")
+                    params.append(f"%{token}%")
+            if community_id:
+                conditions.append("(' ' || communities || ' ') LIKE ?")
+                params.append(f"% {community_id} %")
+            where = " AND ".join(conditions) or "1"
+
+            total = connection.execute(
+                f"SELECT count(*) FROM records WHERE {where}", params
+            ).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT hit FROM records WHERE {where} "
+                "ORDER BY downloads IS NULL, downloads DESC, key LIMIT ?",
+                params + [size],
+            ).fetchall()
+
+        return {"hits": [json.loads(row[0]) for row in rows], "total": total}
@@ -0,0 +1,158 @@
+"""Registry of installed pipeline bundles."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from nipoppy.config.pipeline import BasePipelineConfig
+from nipoppy.env import StrOrPathLike
+from nipoppy.exceptions import ConfigError
+from nipoppy.layout import DatasetLayout
+from nipoppy.logger import get_logger
+from nipoppy.utils.utils import load_json
+
+# file (in the .nipoppy directory) with the installed pipeline bundles
+FNAME_PIPELINE_REGISTRY = "pipeline_registry.json"
+
+logger = get_logger()
+
+
+def _get_stamp(path: Path) -> Optional[list[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _get_bundle_stamp(dpath_bundle: Path) -> list:
+    """Get a stamp that changes if the pipeline config in a bundle may have changed.
+
+    If the bundle has no config file, the stamp of the directory is used instead so
+    that a newly created config file is detected.
+    """
+    if (
+        stamp := _get_stamp(dpath_bundle / DatasetLayout.fname_pipeline_config)
+    ) is None:
+        return ["dir", _get_stamp(dpath_bundle)]
+    return ["config", stamp]
+
+
+def _load_registry(fpath_registry: Path) -> dict:
+    try:
+        return json.loads(fpath_registry.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exception:
+        logger.debug(f"Ignoring invalid pipeline registry file: {exception}")
+        return {}
+
+
+def _save_registry(fpath_registry: Path, registry: dict):
+    if not fpath_registry.parent.exists():
+        return
+    fpath_tmp = fpath_registry.with_name(f".{fpath_registry.name}.{os.getpid()}")
+    try:
+        fpath_tmp.write_text(json.dumps(registry))
+        os.replace(fpath_tmp, fpath_registry)
+    except OSError as exception:
+        logger.debug(f"Could not write pipeline registry file: {exception}")
+
+
+def load_bundle_config(dpath_bundle: StrOrPathLike) -> Optional[BasePipelineConfig]:
+    """Load the pipeline config of a pipeline bundle.
+
+    Returns None if the bundle has no pipeline config file.
+
+    Raises
+    ------
+    nipoppy.exceptions.ConfigError
+        If the pipeline config file is invalid.
+    """
+    fpath_config = Path(dpath_bundle) / DatasetLayout.fname_pipeline_config
+    if not fpath_config.exists():
+        return None
+    try:
+        return BasePipelineConfig(**load_json(fpath_config, allow_json5=True))
+    except Exception as e:
+        raise ConfigError(
+            f"Error when loading pipeline config at {fpath_config}: {e}"
+        ) from e
+
+
+def _load_bundle_info(dpath_bundle: Path) -> Optional[dict]:
+    if (pipeline_config := load_bundle_config(dpath_bundle)) is None:
+        return None
+    return {"name": pipeline_config.NAME, "version": pipeline_config.VERSION}
+
+
+def get_pipeline_bundles(
+    dpath_store: StrOrPathLike,
+    fpath_registry: Optional[StrOrPathLike] = None,
+) -> dict[str, dict[str, Path]]:
+    """Get the pipeline bundles installed in a pipeline store directory.
+
+    If ``fpath_registry`` is given, the name and version of each bundle are stored
+    in that file, and are only read from the pipeline config files again if the
+    modification time or size of the config file (or of the store directory, for
+    added/removed bundles) changed.
+
+    Parameters
+    ----------
+    dpath_store : nipoppy.env.StrOrPathLike
+        Path to the directory containing pipeline bundle subdirectories.
+    fpath_registry : Optional[nipoppy.env.StrOrPathLike], optional
+        Path to the registry file, by default None (no registry)
+
+    Returns
+    -------
+    dict[str, dict[str, Path]]
+        Nested dictionary following the structure
+        {pipeline_name: {pipeline_version: dpath_bundle}}.
+
+    Raises
+    ------
+    nipoppy.exceptions.ConfigError
+        If a pipeline config file is invalid.
+    """
+    dpath_store = Path(dpath_store)
+    registry_key = str(dpath_store.resolve())
+    registry = {} if fpath_registry is None else _load_registry(Path(fpath_registry))
+    store_entry = registry.get(registry_key, {})
+    old_bundles: dict = store_entry.get("bundles", {})
+
+    store_stamp = _get_stamp(dpath_store)
+    if store_stamp is not None and store_stamp == store_entry.get("stamp"):
+        dnames = list(old_bundles)
+    elif store_stamp is not None:
+        dnames = sorted(path.name for path in dpath_store.iterdir() if path.is_dir())
+    else:
+        dnames = []
+
+    changed = store_stamp != store_entry.get("stamp")
+    bundles = {}
+    for dname in dnames:
+        dpath_bundle = dpath_store / dname
+        stamp = _get_bundle_stamp(dpath_bundle)
+        old_bundle = old_bundles.get(dname)
+        if old_bundle is not None and old_bundle["stamp"] == stamp:
+            bundles[dname] = old_bundle
+        else:
+            logger.debug(f"Loading pipeline bundle info from {dpath_bundle}")
+            bundles[dname] = {"stamp": stamp, "info": _load_bundle_info(dpath_bundle)}
+            changed = True
+
+    if fpath_registry is not None and changed:
+        registry[registry_key] = {"stamp": store_stamp, "bundles": bundles}
+        _save_registry(Path(fpath_registry), registry)
+
+    pipeline_bundles: dict[str, dict[str, Path]] = {}
+    for dname, bundle in bundles.items():
+        if (info := bundle["info"]) is not None:
+            pipeline_bundles.setdefault(info["name"], {})[info["version"]] = (
+                dpath_store / dname
+            )
+    return pipeline_bundles
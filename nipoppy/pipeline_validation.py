@@ -1,8 +1,12 @@
 """Pipeline store functions."""
 
+import hashlib
 import json
 import logging
+import os
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 import boutiques
 from pydantic_core import ValidationError
@@ -23,6 +27,14 @@ from nipoppy.layout import DatasetLayout, LayoutError
 from nipoppy.logger import get_logger
 from nipoppy.utils.utils import TEMPLATE_REPLACE_PATTERN, load_json
 
+try:
+    from nipoppy._version import __version__
+except ImportError:
+    __version__ = "unknown"
+
+# file (in the .nipoppy directory) with the stamps of validated pipeline bundles
+FNAME_VALIDATION_STAMPS = "pipeline_validation.json"
+
 logger = get_logger()
 
 PIPELINE_TYPE_TO_CLASS = {
@@ -303,3 +315,93 @@ def check_pipeline_bundle(
     _check_no_subdirectories(dpath_bundle)
 
     return config
+
+
+def _get_validation_stamp(dpath_bundle: Path, strict: bool) -> str:
+    """Hash the content of a bundle directory and the validation settings."""
+    hasher = hashlib.sha256(f"{__version__}\n{strict}\n".encode())
+    for path in sorted(dpath_bundle.iterdir()):
+        hasher.update(path.name.encode() + b"\0")
+        if path.is_file():
+            hasher.update(hashlib.sha256(path.read_bytes()).digest())
+    return hasher.hexdigest()
+
+
+def _load_validation_stamps(fpath_stamps: Path) -> dict:
+    try:
+        stamps = json.loads(fpath_stamps.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exception:
+        logger.debug(f"Ignoring invalid validation stamps file: {exception}")
+        return {}
+    return stamps if isinstance(stamps, dict) else {}
+
+
+def _save_validation_stamps(fpath_stamps: Path, stamps: dict):
+    if not fpath_stamps.parent.exists():
+        return
+    fpath_tmp = fpath_stamps.with_name(f".{fpath_stamps.name}.{os.getpid()}")
+    try:
+        fpath_tmp.write_text(json.dumps(stamps))
+        os.replace(fpath_tmp, fpath_stamps)
+    except OSError as exception:
+        logger.debug(f"Could not write validation stamps file: {exception}")
+
+
+@contextmanager
+def _record_warnings() -> Iterator[list[logging.LogRecord]]:
+    """Collect the warnings logged inside the context."""
+    records = []
+    handler = logging.Handler(logging.WARNING)
+    handler.emit = records.append
+    logger.addHandler(handler)
+    try:
+        yield records
+    finally:
+        logger.removeHandler(handler)
+
+
+def check_pipeline_bundle_cached(
+    dpath_bundle: StrOrPathLike,
+    fpath_stamps: StrOrPathLike,
+    *,
+    strict: bool = False,
+) -> bool:
+    """
+    Validate a pipeline bundle, unless it was already validated in its current state.
+
+    After a successful validation, a hash of the bundle files (and of the Nipoppy
+    version) is saved in ``fpath_stamps``, along with the warnings logged during the
+    validation. If the hash has not changed, the validation is skipped and the
+    recorded warnings are logged again.
+
+    Returns True if the bundle was validated, False if the validation was skipped.
+    """
+    dpath_bundle = Path(dpath_bundle).resolve()
+    fpath_stamps = Path(fpath_stamps)
+
+    try:
+        stamp = _get_validation_stamp(dpath_bundle, strict)
+    except OSError:
+        # let the validation report the problem
+        stamp = None
+
+    stamps = _load_validation_stamps(fpath_stamps)
+    entry = stamps.get(str(dpath_bundle))
+    if stamp is not None and isinstance(entry, dict) and entry.get("stamp") == stamp:
+        logger.debug(f"Pipeline bundle already validated: {dpath_bundle}")
+        for level, message in entry.get("warnings", []):
+            logger.log(level, message)
+        return False
+
+    with _record_warnings() as records:
+        check_pipeline_bundle(dpath_bundle, strict=strict)
+
+    if stamp is not None:
+        stamps[str(dpath_bundle)] = {
+            "stamp": stamp,
+            "warnings": [[record.levelno, record.getMessage()] for record in records],
+        }
+        _save_validation_stamps(fpath_stamps, stamps)
+    return True
@@ -1,25 +1,49 @@
 """Study class."""
 
+import builtins
+import hashlib
 import json
+import os
+import warnings
 from collections import defaultdict
 from functools import cached_property
 from pathlib import Path
+from typing import Optional
 
 from nipoppy.base import Base
 from nipoppy.config.main import Config
-from nipoppy.config.pipeline import BasePipelineConfig
 from nipoppy.env import PipelineTypeEnum
-from nipoppy.exceptions import ConfigError
 from nipoppy.layout import DatasetLayout
 from nipoppy.logger import get_logger
+from nipoppy.pipeline_registry import FNAME_PIPELINE_REGISTRY, get_pipeline_bundles
 from nipoppy.tabular.curation_status import CurationStatusTable
 from nipoppy.tabular.manifest import Manifest
 from nipoppy.tabular.processing_status import ProcessingStatusTable
-from nipoppy.utils.utils import load_json, process_template_str
+from nipoppy.utils.utils import (
+    TEMPLATE_REPLACE_PATTERN,
+    process_template_str,
+)
+
+try:
+    from nipoppy._version import __version__
+except ImportError:
+    __version__ = "unknown"
+
+# file (in the .nipoppy directory) with the resolved global config
+FNAME_CONFIG_CACHE = "config_cache.json"
 
 logger = get_logger()
 
 
+def _replay_warnings(config_warnings: list[list]):
+    """Issue warnings recorded while loading a config."""
+    for category_name, message, filename, lineno in config_warnings:
+        category = getattr(builtins, category_name, None)
+        if not (isinstance(category, type) and issubclass(category, Warning)):
+            category = UserWarning
+        warnings.warn_explicit(message, category, filename, lineno)
+
+
 class Study(Base):
     """
     Representation of a Nipoppy study.
@@ -44,10 +68,66 @@ class Study(Base):
         """Get the number of unique participant-visit combinations in the study."""
         return len(self.manifest)
 
-    @cached_property
-    def config(self) -> Config:
-        """The main configuration object."""
-        fpath_config = self.layout.fpath_config
+    @property
+    def _fpath_config_cache(self) -> Path:
+        return self.layout.dpath_nipoppy / FNAME_CONFIG_CACHE
+
+    def _get_config_cache_key(self, config_bytes: bytes) -> str:
+        """Hash everything the resolved config depends on.
+
+        This is the content of the config file, the layout paths it refers to
+        (resolved, as in :func:`nipoppy.utils.utils.process_template_str`) and the
+        Nipoppy version.
+        """
+        hasher = hashlib.sha256(f"{__version__}\0".encode())
+        hasher.update(config_bytes)
+        for template_key in sorted(
+            set(TEMPLATE_REPLACE_PATTERN.findall(config_bytes.decode(errors="replace")))
+        ):
+            value = getattr(self.layout, template_key.lower(), None)
+            if isinstance(value, Path):
+                value = value.resolve()
+            hasher.update(f"\0{template_key}={value}".encode())
+        return hasher.hexdigest()
+
+    def _load_cached_config(
+        self, cache_key: str
+    ) -> Optional[tuple[Config, list[list]]]:
+        try:
+            cache = json.loads(self._fpath_config_cache.read_text())
+            if cache["key"] != cache_key:
+                return None
+            return Config.model_validate(cache["config"]), list(cache["warnings"])
+        except FileNotFoundError:
+            return None
+        except Exception as exception:
+            logger.debug(f"Ignoring invalid config cache file: {exception}")
+            return None
+
+    def _save_cached_config(
+        self, cache_key: str, config: Config, config_warnings: list[list]
+    ):
+        fpath_cache = self._fpath_config_cache
+        if not fpath_cache.parent.exists():
+            return
+        fpath_tmp = fpath_cache.with_name(f".{fpath_cache.name}.{os.getpid()}")
+        try:
+            fpath_tmp.write_text(
+                json.dumps(
+                    {
+                        "key": cache_key,
+                        "config": config.model_dump(mode="json"),
+                        "warnings": config_warnings,
+                    }
+                )
+            )
+            os.replace(fpath_tmp, fpath_cache)
+        except OSError as exception:
+            logger.debug(f"Could not write config cache file: {exception}")
+        finally:
+            fpath_tmp.unlink(missing_ok=True)
+
+    def _load_config(self, fpath_config) -> Config:
         # load and apply user-defined substitutions
         logger.debug(f"Loading config from {fpath_config}")
         config = Config.load(fpath_config)
@@ -66,6 +146,48 @@ class Study(Base):
         )
         # restore original substitutions
         config.SUBSTITUTIONS = user_substitutions
+        return config
+
+    @cached_property
+    def config(self) -> Config:
+        """The main configuration object.
+
+        The resolved config is cached in the ``.nipoppy`` directory of the study, and
+        reused as long as the config file, the layout paths it refers to and the
+        Nipoppy version do not change. Warnings issued while loading the config file
+        are stored in the cache and issued again when it is used.
+        """
+        fpath_config = self.layout.fpath_config
+        try:
+            cache_key = self._get_config_cache_key(Path(fpath_config).read_bytes())
+        except OSError:
+            # errors are raised when loading the config file below
+            cache_key = None
+        if (
+            cache_key is not None
+            and (cached := self._load_cached_config(cache_key)) is not None
+        ):
+            logger.debug(f"Loaded cached config for {fpath_config}")
+            config, config_warnings = cached
+            _replay_warnings(config_warnings)
+            return config
+
+        # record the warnings so that they can be shown again when using the cache
+        with warnings.catch_warnings(record=True) as records:
+            config = self._load_config(fpath_config)
+        config_warnings = [
+            [
+                record.category.__name__,
+                str(record.message),
+                record.filename,
+                record.lineno,
+            ]
+            for record in records
+        ]
+        _replay_warnings(config_warnings)
+
+        if cache_key is not None:
+            self._save_cached_config(cache_key, config, config_warnings)
 
         return config
 
@@ -90,32 +212,41 @@ class Study(Base):
         logger.debug(f"Loading processing status table from {fpath_table}")
         return ProcessingStatusTable.load(fpath_table)
 
+    def get_pipeline_bundles(
+        self, pipeline_type: PipelineTypeEnum
+    ) -> dict[str, dict[str, Path]]:
+        """Get the installed pipeline bundles of a given type.
+
+        The pipeline names and versions are kept in a registry file in the
+        ``.nipoppy`` directory, so that pipeline config files only need to be loaded
+        again if they changed.
+
+        Parameters
+        ----------
+        pipeline_type : nipoppy.env.PipelineTypeEnum
+            Pipeline type.
+
+        Returns
+        -------
+        dict[str, dict[str, Path]]
+            Nested dictionary following the structure
+            {pipeline_name: {pipeline_version: dpath_bundle}}.
+        """
+        return get_pipeline_bundles(
+            self.layout.get_dpath_pipeline_store(pipeline_type),
+            fpath_registry=self.layout.dpath_nipoppy / FNAME_PIPELINE_REGISTRY,
+        )
+
     def _get_pipeline_info_map(
         self,
     ) -> dict[PipelineTypeEnum, defaultdict[str, list[str]]]:
         pipeline_type_to_info_map = {}
         for pipeline_type in PipelineTypeEnum:
             pipeline_names_to_versions_map = defaultdict(list)
-            dpath_pipeline_bundles = (
-                self.layout.dpath_pipelines
-                / DatasetLayout.pipeline_type_to_dname_map[pipeline_type]
-            )
-            for fpath_config in sorted(
-                dpath_pipeline_bundles.glob(f"*/{self.layout.fname_pipeline_config}")
-            ):
-                try:
-                    pipeline_config = BasePipelineConfig(
-                        **load_json(fpath_config, allow_json5=True)
-                    )
-                except Exception as e:
-                    raise ConfigError(
-                        f"Error when loading pipeline config at {fpath_config}: {e}"
-                    ) from e
-
-                pipeline_names_to_versions_map[pipeline_config.NAME].append(
-                    pipeline_config.VERSION
-                )
-
+            for pipeline_name, bundles in self.get_pipeline_bundles(
+                pipeline_type
+            ).items():
+                pipeline_names_to_versions_map[pipeline_name].extend(bundles)
             pipeline_type_to_info_map[pipeline_type] = pipeline_names_to_versions_map
 
         return pipeline_type_to_info_map
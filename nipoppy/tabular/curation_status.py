@@ -168,9 +168,10 @@ def generate_curation_status_table(
         else:
             dpath = Path(dpath)
             dpath_participant: Path = dpath / dname_subdirectory
-            if dpath_participant.exists():
+            if dpath_participant.is_dir():
                 status = next(dpath_participant.iterdir(), None) is not None
             else:
+                # single files (e.g. session archives) are not counted here
                 status = False
             logger.debug(f"Status for {dpath_participant}: {status}")
         return status
@@ -0,0 +1,452 @@
+"""Utilities for writing and reading tar archives."""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import importlib.util
+import io
+import json
+import os
+import tarfile
+import threading
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+from nipoppy.env import EXT_TAR, StrOrPathLike
+from nipoppy.logger import get_logger
+
+# file extensions for each compression type
+TAR_EXTENSIONS = {
+    None: EXT_TAR,
+    "gzip": f"{EXT_TAR}.gz",
+    "zstd": f"{EXT_TAR}.zst",
+}
+TAR_COMPRESSIONS = tuple(
+    compression for compression in TAR_EXTENSIONS if compression is not None
+)
+
+# file (next to the archive) with the list and offsets of archive members
+EXT_TAR_INDEX = ".index.json"
+TAR_INDEX_FIELDS = ("name", "type", "size", "offset", "frame_offset", "frame_start")
+
+# start a new compressed frame (after the current member) every N bytes, so that
+# reading a member never requires decompressing more than about N bytes
+TAR_FRAME_SIZE = 1024 * 1024
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# log progress every N archived paths
+TAR_PROGRESS_INTERVAL = 10000
+
+GZIP_COMPRESSLEVEL = 6
+
+# needed for zstd compression
+ZSTANDARD_INSTALLED = importlib.util.find_spec("zstandard") is not None
+
+logger = get_logger()
+
+
+def get_fpath_tar(dpath: StrOrPathLike, compression: Optional[str] = None) -> Path:
+    """Get the path to the archive of a directory."""
+    dpath = Path(dpath)
+    return dpath.with_name(f"{dpath.name}{TAR_EXTENSIONS[compression]}")
+
+
+def get_fpath_tar_index(fpath_tar: StrOrPathLike) -> Path:
+    """Get the path to the index file of an archive."""
+    fpath_tar = Path(fpath_tar)
+    return fpath_tar.with_name(f"{fpath_tar.name}{EXT_TAR_INDEX}")
+
+
+def get_tar_compression(fpath_tar: StrOrPathLike) -> Optional[str]:
+    """Get the compression type of an archive from its file extension."""
+    name = Path(fpath_tar).name
+    for compression in TAR_COMPRESSIONS:
+        if name.endswith(TAR_EXTENSIONS[compression]):
+            return compression
+    return None
+
+
+def find_tar(dpath: StrOrPathLike) -> Optional[Path]:
+    """Find the archive of a directory, with any of the supported compressions.
+
+    Returns None if no archive exists.
+    """
+    for compression in TAR_EXTENSIONS:
+        if (fpath_tar := get_fpath_tar(dpath, compression)).exists():
+            return fpath_tar
+    return None
+
+
+def _get_fpath_tmp(fpath: Path) -> Path:
+    # unique for each process and thread
+    return fpath.with_name(f".{fpath.name}.{os.getpid()}.{threading.get_ident()}")
+
+
+def _iter_paths(path: str) -> Iterator[str]:
+    """Iterate over a directory tree in the same order as tarfile.TarFile.add."""
+    yield path
+    with os.scandir(path) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_paths(entry.path)
+        else:
+            yield entry.path
+
+
+def _open_decompressed(file: IO[bytes], compression: Optional[str]) -> IO[bytes]:
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(
+            file, closefd=False, read_across_frames=True
+        )
+    elif compression == "gzip":
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    return file
+
+
+class _FramedWriter:
+    """Write-only file object that compresses data in independent frames.
+
+    Each frame (a zstd frame or a gzip member) can be decompressed on its own,
+    starting from its offset in the compressed file.
+    """
+
+    def __init__(self, file: IO[bytes], compression: Optional[str]):
+        self.file = file
+        self.compression = compression
+        # uncompressed offsets of the data written so far/of the current frame
+        self.offset = 0
+        self.frame_start = 0
+        # compressed offset of the current frame
+        self.frame_offset = 0
+        self._stream = self._open_frame()
+
+    def _open_frame(self) -> IO[bytes]:
+        if self.compression == "zstd":
+            import zstandard
+
+            return zstandard.ZstdCompressor().stream_writer(self.file, closefd=False)
+        elif self.compression == "gzip":
+            # empty filename so the temporary file name is not stored in the header
+            return gzip.GzipFile(
+                filename="",
+                fileobj=self.file,
+                mode="wb",
+                compresslevel=GZIP_COMPRESSLEVEL,
+            )
+        return self.file
+
+    def _close_frame(self):
+        if self.compression == "zstd":
+            import zstandard
+
+            self._stream.flush(zstandard.FLUSH_FRAME)
+        elif self.compression == "gzip":
+            self._stream.close()
+
+    def new_frame(self):
+        """End the current frame if it is large enough and start a new one."""
+        if self.compression is None or self.offset - self.frame_start < TAR_FRAME_SIZE:
+            return
+        self._close_frame()
+        self.frame_start = self.offset
+        self.frame_offset = self.file.tell()
+        if self.compression == "gzip":
+            self._stream = self._open_frame()
+
+    def write(self, data) -> int:
+        self._stream.write(data)
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def close(self):
+        self._close_frame()
+
+
+def _get_data_size(size: int) -> int:
+    # size of member data in the archive, padded to the tar block size
+    return -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+
+
+def _write_tar_index(fpath_tar: Path, compression: Optional[str], members: list):
+    fpath_index = get_fpath_tar_index(fpath_tar)
+    fpath_index_tmp = _get_fpath_tmp(fpath_index)
+    stat = fpath_tar.stat()
+    index = {
+        "compression": compression,
+        # to detect archives that were changed after the index was written
+        "archive_size": stat.st_size,
+        "archive_mtime_ns": stat.st_mtime_ns,
+        "fields": TAR_INDEX_FIELDS,
+        "members": members,
+    }
+    try:
+        fpath_index_tmp.write_text(json.dumps(index))
+        os.replace(fpath_index_tmp, fpath_index)
+    finally:
+        fpath_index_tmp.unlink(missing_ok=True)
+
+
+def write_tar(
+    dpath: StrOrPathLike,
+    fpath_tar: Optional[StrOrPathLike] = None,
+    compression: Optional[str] = None,
+    write_index: bool = True,
+) -> Path:
+    """Archive a directory into a tar file, without calling an external program.
+
+    The archive is streamed to a temporary file that is renamed once complete, so
+    that an incomplete archive is never visible and several directories can be
+    archived in parallel (in different threads or processes).
+
+    Compressed archives are made of independently compressed frames of about
+    :data:`TAR_FRAME_SIZE` (uncompressed) bytes, which standard tools read like
+    any other compressed archive. Together with the index, this allows single
+    members to be read without decompressing the whole archive (see
+    :class:`IndexedTar`).
+
+    Parameters
+    ----------
+    dpath : nipoppy.env.StrOrPathLike
+        Directory to archive. Member names are relative to its parent directory.
+    fpath_tar : Optional[nipoppy.env.StrOrPathLike], optional
+        Path to the archive, by default the directory path with the extension
+        for the compression type (see :func:`get_fpath_tar`)
+    compression : Optional[str], optional
+        Compression type (one of :data:`TAR_COMPRESSIONS`), by default None (no
+        compression). "zstd" requires the zstandard package.
+    write_index : bool, optional
+        Whether to also write the list of archive members and their offsets to a
+        JSON file next to the archive (see :func:`get_fpath_tar_index`), by
+        default True
+
+    Returns
+    -------
+    Path
+        Path to the archive
+    """
+    if compression not in TAR_EXTENSIONS:
+        raise ValueError(
+            f"Invalid compression: {compression}. Must be one of {TAR_COMPRESSIONS}"
+        )
+    dpath = Path(dpath)
+    fpath_tar = Path(
+        get_fpath_tar(dpath, compression) if fpath_tar is None else fpath_tar
+    )
+
+    members = []
+    fpath_tmp = _get_fpath_tmp(fpath_tar)
+    try:
+        with open(fpath_tmp, "wb") as file:
+            stream = _FramedWriter(file, compression)
+            # same format as GNU tar (no extended header for each member)
+            with tarfile.open(
+                fileobj=stream, mode="w", format=tarfile.GNU_FORMAT
+            ) as tar:
+                # member names are relative to the parent directory
+                len_prefix = len(str(dpath)) - len(dpath.name)
+                for path in _iter_paths(str(dpath)):
+                    tarinfo = tar.gettarinfo(path, arcname=path[len_prefix:])
+                    if tarinfo is None:
+                        logger.warning(f"Not archiving unsupported file: {path}")
+                        continue
+
+                    stream.new_frame()
+                    if tarinfo.isreg():
+                        with open(path, "rb") as file_member:
+                            tar.addfile(tarinfo, file_member)
+                    else:
+                        tar.addfile(tarinfo)
+                    members.append(
+                        (
+                            tarinfo.name,
+                            tarinfo.type.decode(),
+                            tarinfo.size,
+                            stream.offset - _get_data_size(tarinfo.size),
+                            stream.frame_offset,
+                            stream.frame_start,
+                        )
+                    )
+
+                    if len(members) % TAR_PROGRESS_INTERVAL == 0:
+                        logger.info(f"Archived {len(members)} paths from {dpath}")
+            stream.close()
+        os.replace(fpath_tmp, fpath_tar)
+    finally:
+        fpath_tmp.unlink(missing_ok=True)
+    logger.info(f"Archived {len(members)} paths from {dpath} into {fpath_tar}")
+
+    if write_index:
+        _write_tar_index(fpath_tar, compression, members)
+
+    return fpath_tar
+
+
+@contextlib.contextmanager
+def open_tar(fpath_tar: StrOrPathLike) -> Iterator[tarfile.TarFile]:
+    """Open a tar archive for reading, with any of the supported compressions.
+
+    zstd-compressed archives (".tar.zst") are opened in streaming mode, so members
+    can only be accessed sequentially. Use :class:`IndexedTar` to read single
+    members efficiently.
+    """
+    fpath_tar = Path(fpath_tar)
+    if get_tar_compression(fpath_tar) == "zstd":
+        with (
+            open(fpath_tar, "rb") as file,
+            _open_decompressed(file, "zstd") as stream,
+            tarfile.open(fileobj=stream, mode="r|") as tar,
+        ):
+            yield tar
+    else:
+        with tarfile.open(fpath_tar) as tar:
+            yield tar
+
+
+class _MemberFile(io.RawIOBase):
+    """Read-only file object for the data of a single archive member."""
+
+    def __init__(self, file: IO[bytes], stream: IO[bytes], size: int):
+        self._file = file
+        self._stream = stream
+        self._remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not (size := min(len(buffer), self._remaining)):
+            return 0
+        data = self._stream.read(size)
+        if not data:
+            raise tarfile.ReadError("Unexpected end of data in archive")
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            if self._stream is not self._file:
+                self._stream.close()
+            self._file.close()
+        super().close()
+
+
+class IndexedTar:
+    """Random access to the members of a tar archive.
+
+    Members are located with the index written by :func:`write_tar`, so opening
+    a member only requires seeking to it (and, for compressed archives,
+    decompressing the frame it is in) instead of reading all the members before
+    it. Archives without a valid index (e.g. created by other tools) are scanned
+    once when the object is created.
+
+    Parameters
+    ----------
+    fpath_tar : nipoppy.env.StrOrPathLike
+        Path to the archive
+
+    Examples
+    --------
+    >>> archive = IndexedTar("sub-01/ses-1.tar.zst")
+    >>> with archive.open("ses-1/anat/sub-01_ses-1_T1w.json") as file:
+    ...     content = file.read()
+    """
+
+    def __init__(self, fpath_tar: StrOrPathLike):
+        self.fpath_tar = Path(fpath_tar)
+        self.compression = get_tar_compression(self.fpath_tar)
+        self._members = self._load_index()
+        if self._members is None:
+            logger.debug(f"No valid index for {self.fpath_tar}, scanning the archive")
+            self._members = self._scan()
+
+    def _load_index(self) -> Optional[dict]:
+        try:
+            index = json.loads(get_fpath_tar_index(self.fpath_tar).read_text())
+            stat = self.fpath_tar.stat()
+            if (
+                index["archive_size"] != stat.st_size
+                or index["archive_mtime_ns"] != stat.st_mtime_ns
+                or index["compression"] != self.compression
+                or tuple(index["fields"]) != TAR_INDEX_FIELDS
+            ):
+                return None
+            return {member[0]: member for member in index["members"]}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            logger.debug(f"Ignoring invalid index for {self.fpath_tar}: {exception}")
+            return None
+
+    def _scan(self) -> dict:
+        # without frame information, compressed members are read from the start
+        with open_tar(self.fpath_tar) as tar:
+            return {
+                member.name: (
+                    member.name,
+                    member.type.decode(),
+                    member.size,
+                    member.offset_data,
+                    0,
+                    0,
+                )
+                for member in tar
+            }
+
+    def getnames(self) -> list[str]:
+        """Get the names of the archive members, in archive order."""
+        return list(self._members)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._members
+
+    def open(self, name: str) -> IO[bytes]:
+        """Open a regular file member of the archive for reading (in binary mode).
+
+        Raises
+        ------
+        KeyError
+            If there is no member with this name
+        ValueError
+            If the member is not a regular file
+        """
+        try:
+            _, member_type, size, offset, frame_offset, frame_start = self._members[
+                name
+            ]
+        except KeyError:
+            raise KeyError(f"{name} not found in {self.fpath_tar}")
+        if member_type.encode() not in tarfile.REGULAR_TYPES:
+            raise ValueError(f"{name} is not a regular file in {self.fpath_tar}")
+
+        file = open(self.fpath_tar, "rb")
+        try:
+            if self.compression is None:
+                file.seek(offset)
+                stream = file
+            else:
+                file.seek(frame_offset)
+                stream = _open_decompressed(file, self.compression)
+                # skip the start of the frame
+                to_skip = offset - frame_start
+                while to_skip > 0:
+                    if not (chunk := stream.read(min(to_skip, READ_CHUNK_SIZE))):
+                        raise tarfile.ReadError("Unexpected end of data in archive")
+                    to_skip -= len(chunk)
+        except BaseException:
+            file.close()
+            raise
+        return io.BufferedReader(_MemberFile(file, stream, size))
+
+    def read_bytes(self, name: str) -> bytes:
+        """Read the content of a regular file member of the archive."""
+        with self.open(name) as file:
+            return file.read()
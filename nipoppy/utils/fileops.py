@@ -1,14 +1,25 @@
 """File operations utility functions."""
 
 import errno
+import fcntl
+import os
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Iterable, Optional
 
 from nipoppy.exceptions import FileOperationError
 from nipoppy.logger import get_logger
 
 logger = get_logger()
 
+# ioctl request code for copy-on-write clones (from linux/fs.h)
+# fcntl.FICLONE is only available in Python 3.12+
+FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+COPY_CHUNK_SIZE = 1024 * 1024
+
 # TODO: Implement a dry-run decorator to avoid repeating dry_run checks
 
 
@@ -28,11 +39,187 @@ def mkdir(dpath: Path, dry_run=False):
         dpath.mkdir(parents=True, exist_ok=True)
 
 
-def copy(source: Path, target: Path, dry_run=False, exist_ok: bool = False):
+def _copy_file_contents(fsrc, fdst):
+    """Copy file contents using the fastest method supported by the filesystem.
+
+    Try a copy-on-write clone (reflink) first, then an in-kernel copy with
+    os.copy_file_range, and finally fall back to a buffered copy.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1024**3) > 0:
+                pass
+            return
+        except OSError:
+            # start over with the buffered copy
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+    shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+
+
+def _link_file(source: Path, target: Path) -> bool:
+    """Create a hard link, replacing an existing target.
+
+    Return False if hard links cannot be used (in which case the file should be
+    copied instead).
+    """
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        # e.g. linked or partially copied by an interrupted run
+        if os.path.samefile(source, target):
+            return True
+        os.unlink(target)
+        return _link_file(source, target)
+    except OSError as exception:
+        if exception.errno not in (
+            errno.EXDEV,
+            errno.EPERM,
+            errno.EMLINK,
+            errno.EOPNOTSUPP,
+        ):
+            raise
+        return False
+    return True
+
+
+def _open_new_file(target: Path):
+    try:
+        return open(target, "xb")
+    except FileExistsError:
+        # replace the existing file instead of writing through it, in case it is
+        # a link to the source file
+        os.unlink(target)
+        return open(target, "xb")
+
+
+def copy_file(source: Path, target: Path, hardlink: bool = False):
+    """Copy a single file, preserving metadata like shutil.copy2.
+
+    If hardlink is True, try to create a hard link first. This falls back to a
+    copy if the source and target are on different filesystems or if hard links
+    are not supported. An existing target file is replaced.
+    """
+    if hardlink and _link_file(source, target):
+        return
+
+    with open(source, "rb") as fsrc, _open_new_file(target) as fdst:
+        _copy_file_contents(fsrc, fdst)
+    shutil.copystat(source, target)
+
+
+def read_copy_manifest(fpath_manifest: Optional[Path]) -> set[str]:
+    """Read the paths of already-copied files from a copy manifest."""
+    if fpath_manifest is None or not fpath_manifest.exists():
+        return set()
+    return set(fpath_manifest.read_text().splitlines())
+
+
+def _copy_file_with_retries(
+    source: Path, target: Path, hardlink: bool, n_retries: int
+) -> Path:
+    """Copy a file, retrying on OSError (e.g. transient network filesystem errors)."""
+    for i_attempt in range(n_retries + 1):
+        try:
+            copy_file(source, target, hardlink=hardlink)
+            return target
+        except OSError as exception:
+            if i_attempt == n_retries:
+                raise FileOperationError(
+                    f"Failed to copy {source} to {target}: {exception}"
+                ) from exception
+            logger.debug(f"Retrying copy of {source} to {target}: {exception}")
+
+
+def copy_files(
+    sources_and_targets: Iterable[tuple[Path, Path]],
+    n_jobs: int = 1,
+    hardlink: bool = False,
+    n_retries: int = 2,
+    fpath_manifest: Optional[Path] = None,
+    dry_run=False,
+) -> int:
+    """
+    Copy many files concurrently.
+
+    If a manifest file is given, the target path of each successfully copied file
+    is appended to it, and files already listed in it are skipped. This allows an
+    interrupted copy to be resumed.
+
+    Return the number of files copied.
+    """
+    if n_jobs < 1:
+        raise ValueError(f"n_jobs must be at least 1, got {n_jobs}")
+
+    copied = read_copy_manifest(fpath_manifest)
+    sources_and_targets = [
+        (source, target)
+        for source, target in sources_and_targets
+        if str(target) not in copied
+    ]
+    logger.debug(
+        f"Copying {len(sources_and_targets)} files"
+        f" ({len(copied)} already copied) with {n_jobs} worker(s)"
+    )
+    if dry_run:
+        return 0
+
+    if fpath_manifest is not None:
+        mkdir(fpath_manifest.parent)
+        manifest_context = open(fpath_manifest, "a")
+    else:
+        manifest_context = nullcontext()
+
+    n_copied = 0
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor, manifest_context as file:
+        futures = [
+            executor.submit(
+                _copy_file_with_retries,
+                source,
+                target,
+                hardlink=hardlink,
+                n_retries=n_retries,
+            )
+            for source, target in sources_and_targets
+        ]
+        try:
+            for future in as_completed(futures):
+                target = future.result()
+                n_copied += 1
+                if file is not None:
+                    file.write(f"{target}\n")
+                    file.flush()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return n_copied
+
+
+def copy(
+    source: Path,
+    target: Path,
+    dry_run=False,
+    exist_ok: bool = False,
+    n_jobs: int = 1,
+    hardlink: bool = False,
+    fpath_manifest: Optional[Path] = None,
+):
     """
     Copy a file or directory.
 
-    Raise an error by default if the target path already exists.
+    Raise an error by default if the target path already exists. Directory trees
+    are copied file by file with copy_files (see that function for the other
+    parameters).
     """
     if target.exists() and not exist_ok:
         raise FileOperationError(f"Target already exists: {target}")
@@ -40,9 +227,27 @@ def copy(source: Path, target: Path, dry_run=False, exist_ok: bool = False):
     logger.debug(f"Copying {source} to {target}")
     if not dry_run:
         if source.is_file():
-            shutil.copy2(src=source, dst=target)
+            copy_file(source, target, hardlink=hardlink)
         else:
-            shutil.copytree(src=source, dst=target, dirs_exist_ok=exist_ok)
+            sources_and_targets = []
+            dpaths = []
+            for dpath_source, _, fnames in os.walk(source, followlinks=True):
+                dpath_target = target / Path(dpath_source).relative_to(source)
+                dpath_target.mkdir(parents=True, exist_ok=True)
+                dpaths.append((dpath_source, dpath_target))
+                sources_and_targets.extend(
+                    (Path(dpath_source, fname), dpath_target / fname)
+                    for fname in fnames
+                )
+            copy_files(
+                sources_and_targets,
+                n_jobs=n_jobs,
+                hardlink=hardlink,
+                fpath_manifest=fpath_manifest,
+            )
+            # copy directory metadata last since adding files changes it
+            for dpath_source, dpath_target in reversed(dpaths):
+                shutil.copystat(dpath_source, dpath_target)
 
 
 def movetree(source: Path, target: Path, dry_run=False):
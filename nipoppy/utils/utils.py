@@ -17,6 +17,7 @@ from nipoppy.env import (
     StrOrPathLike,
 )
 from nipoppy.exceptions import ConfigError, JSON5Error, JSONError, NipoppyError
+from nipoppy.utils.json5 import parse_json5
 
 if TYPE_CHECKING:
     import pandas as pd
@@ -85,7 +86,8 @@ def load_json(
         Path to the JSON file
     allow_json5 : bool, optional
         Whether to parse the file as JSON5 (supports comments and trailing commas),
-        by default False
+        by default False. Unless keyword arguments are given, this uses
+        :func:`nipoppy.utils.json5.parse_json5`, which is fast for plain JSON files.
     **kwargs :
         Keyword arguments to pass to json.loads or json5.loads
 
@@ -98,7 +100,9 @@ def load_json(
     json_text = fpath.read_text()
     if allow_json5:
         try:
-            return json5.loads(json_text, **kwargs)
+            if kwargs:
+                return json5.loads(json_text, **kwargs)
+            return parse_json5(json_text)
         except ValueError as e:
             raise JSON5Error(e, fpath=fpath) from e
     else:
@@ -29,6 +29,7 @@ class BIDSificationRunner(Runner):
         use_subcohort: Optional[StrOrPathLike] = None,
         simulate: bool = False,
         keep_workdir: bool = False,
+        persistent_container: bool = False,
         hpc: Optional[str] = None,
         write_subcohort: Optional[StrOrPathLike] = None,
         fpath_layout: Optional[StrOrPathLike] = None,
@@ -47,6 +48,7 @@ class BIDSificationRunner(Runner):
             use_subcohort=use_subcohort,
             simulate=simulate,
             keep_workdir=keep_workdir,
+            persistent_container=persistent_container,
             hpc=hpc,
             write_subcohort=write_subcohort,
             fpath_layout=fpath_layout,
@@ -78,6 +78,7 @@ class InitWorkflow(BaseDatasetWorkflow):
         mode="symlink",
         force=False,
         container_store: StrOrPathLike | None = None,
+        n_jobs: int = 1,
         fpath_layout: Optional[StrOrPathLike] = None,
         default_config: bool = False,
         verbose: bool = False,
@@ -94,10 +95,12 @@ class InitWorkflow(BaseDatasetWorkflow):
             _validate_layout=False,
         )
         self.fname_readme = "README.md"
+        self.fname_copy_manifest = "bids_source-copied_files.txt"
         self.bids_source = bids_source
         self.mode = mode
         self.force = force
         self.container_store = container_store
+        self.n_jobs = n_jobs
         self.default_config = default_config
 
     def run_main(self):
@@ -201,19 +204,41 @@ class InitWorkflow(BaseDatasetWorkflow):
     def _handle_bids_source(self) -> None:
         """Create bids source directory.
 
-        Handles copy/move/symlink modes.
-        If --force, attempt to remove the pre-existing conflicting bids source.
+        Handles copy/hardlink/move/symlink modes.
+        If --force, attempt to remove the pre-existing conflicting bids source,
+        unless it is from an interrupted copy that can be resumed.
         """
         dpath = self.study.layout.dpath_bids
+        fpath_copy_manifest = self.study.layout.dpath_nipoppy / self.fname_copy_manifest
+        resume_copy = (
+            self.mode in ("copy", "hardlink")
+            and dpath.exists()
+            and fpath_copy_manifest.exists()
+        )
 
         # Handle edge case where we need to clobber existing data
-        if dpath.exists() and self.force:
+        if dpath.exists() and self.force and not resume_copy:
             fileops.rm(dpath, dry_run=self.dry_run)
 
         fileops.mkdir(dpath.parent, dry_run=self.dry_run)
 
-        if self.mode == "copy":
-            fileops.copy(self.bids_source, dpath, dry_run=self.dry_run)
+        if self.mode in ("copy", "hardlink"):
+            if resume_copy:
+                logger.info(
+                    f"Resuming interrupted copy of {self.bids_source} "
+                    f"(already copied files are listed in {fpath_copy_manifest})"
+                )
+            fileops.copy(
+                self.bids_source,
+                dpath,
+                exist_ok=resume_copy,
+                n_jobs=self.n_jobs,
+                hardlink=(self.mode == "hardlink"),
+                fpath_manifest=fpath_copy_manifest,
+                dry_run=self.dry_run,
+            )
+            if not self.dry_run:
+                fpath_copy_manifest.unlink()
         elif self.mode == "move":
             fileops.movetree(self.bids_source, dpath, dry_run=self.dry_run)
         elif self.mode == "symlink":
@@ -1,11 +1,20 @@
 """DICOM file organization."""
 
 import hashlib
+import importlib.util
 import os
+import shutil
+import sys
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import IO, Iterator, Optional
 
+import pandas as pd
 import pydicom
+from pydicom.multival import MultiValue
 
 from nipoppy.env import StrOrPathLike
 from nipoppy.exceptions import FileOperationError, ReturnCode, WorkflowError
@@ -19,21 +28,100 @@ from nipoppy.utils.bids import (
 from nipoppy.workflows.base import BaseDatasetWorkflow
 
 HASH_LENGTH = 7
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# DICOM header index
+DICOM_INDEX_TAGS = [
+    "SeriesInstanceUID",
+    "SeriesDescription",
+    "ImageType",
+    "AcquisitionTime",
+]
+DNAME_DICOM_INDEX = "dicom_index"
+EXT_PARQUET = ".parquet"
+
+# needed to write Parquet files
+PYARROW_INSTALLED = importlib.util.find_spec("pyarrow") is not None
 
 logger = get_logger()
 
 
+@lru_cache(maxsize=1024)
+def _hash_dpath(dpath: str) -> str:
+    """Get the short hash for a directory path (memoized since files are grouped)."""
+    return hashlib.md5(dpath.encode("UTF-8")).hexdigest()[:HASH_LENGTH]
+
+
 def is_derived_dicom(fpath: Path) -> bool:
     """
     Read a DICOM file's header and check if it is a derived file.
 
     Some BIDS converters (e.g. Heudiconv) do not support derived DICOM files.
+
+    Only the ImageType tag is parsed and reading stops before the pixel data, so
+    the cost does not depend on the size of the image.
     """
-    dcm_info = pydicom.dcmread(fpath)
+    dcm_info = pydicom.dcmread(
+        fpath, stop_before_pixels=True, specific_tags=["ImageType"]
+    )
     img_types = dcm_info.ImageType
     return "DERIVED" in img_types
 
 
+def read_dicom_tags(fpath: StrOrPathLike, tags: list[str]) -> dict[str, Optional[str]]:
+    """
+    Read some tags from a DICOM file header, without reading the rest of the file.
+
+    Multi-valued tags are joined with backslashes (as they are stored in the file)
+    and missing tags are set to None.
+    """
+    dcm_info = pydicom.dcmread(fpath, stop_before_pixels=True, specific_tags=tags)
+    values = {}
+    for tag in tags:
+        value = dcm_info.get(tag)
+        if isinstance(value, MultiValue):
+            value = "\\".join(str(item) for item in value)
+        elif value is not None:
+            value = str(value)
+        values[tag] = value
+    return values
+
+
+def load_dicom_index(dpath_dicom_index: StrOrPathLike) -> pd.DataFrame:
+    """Load the DICOM header index built by ``nipoppy reorg --dicom-index``.
+
+    The index directory contains one Parquet file per participant-session, which
+    are all loaded into a single dataframe.
+    """
+    return pd.read_parquet(dpath_dicom_index)
+
+
+def is_archive(fpath: StrOrPathLike) -> bool:
+    """Check whether a file is a ZIP or TAR archive, based on its extension."""
+    return str(fpath).lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def iter_archive_members(fpath: StrOrPathLike) -> Iterator[tuple[str, IO[bytes]]]:
+    """
+    Iterate over the regular files in a ZIP or TAR archive.
+
+    Yield the path of each member inside the archive and a file object to read its
+    content from. TAR archives are read as a stream (compressed or not), so each
+    file object must be consumed before moving on to the next member.
+    """
+    if str(fpath).lower().endswith(".zip"):
+        with zipfile.ZipFile(fpath) as zip_file:
+            for info in zip_file.infolist():
+                if not info.is_dir():
+                    with zip_file.open(info) as file:
+                        yield info.filename, file
+    else:
+        with tarfile.open(fpath, mode="r|*") as tar_file:
+            for member in tar_file:
+                if member.isfile():
+                    yield member.name, tar_file.extractfile(member)
+
+
 class DicomReorgWorkflow(BaseDatasetWorkflow):
     """Workflow for organizing raw DICOM files."""
 
@@ -42,6 +130,10 @@ class DicomReorgWorkflow(BaseDatasetWorkflow):
         dpath_root: StrOrPathLike,
         copy_files: bool = False,
         check_dicoms: bool = False,
+        check_dicoms_per_series: bool = False,
+        extract_archives: bool = False,
+        dicom_index: bool = False,
+        n_jobs: int = 1,
         fpath_layout: Optional[StrOrPathLike] = None,
         verbose: bool = False,
         dry_run: bool = False,
@@ -56,18 +148,39 @@ class DicomReorgWorkflow(BaseDatasetWorkflow):
         )
         self.copy_files = copy_files
         self.check_dicoms = check_dicoms
+        self.check_dicoms_per_series = check_dicoms_per_series
+        self.extract_archives = extract_archives
+        self.dicom_index = dicom_index
+        self.n_jobs = n_jobs
 
         # the message logged in run_cleanup will depend on
         # the final values for these attributes (updated in run_main)
         self.n_success = 0
         self.n_total = 0
 
+        if self.dicom_index and not PYARROW_INSTALLED:
+            logger.error(
+                "An additional dependency is required to build the DICOM header index "
+                "with --dicom-index. Install it with: pip install nipoppy[parquet]",
+                extra={"markup": False},
+            )
+            sys.exit(ReturnCode.MISSING_DEPENDENCY)
+
+    @cached_property
+    def dpath_dicom_index(self) -> Path:
+        """Directory for the DICOM header index files."""
+        return self.study.layout.dpath_src_imaging / DNAME_DICOM_INDEX
+
     def get_fpaths_to_reorg(
         self,
         participant_id: str,
         session_id: str,
     ) -> list[Path]:
-        """Get file paths to reorganize for a single participant and session."""
+        """Get file paths to reorganize for a single participant and session.
+
+        With ``extract_archives``, the raw DICOM directory can also be a single
+        archive file.
+        """
         dpath_downloaded = (
             self.study.layout.dpath_pre_reorg
             / self.dicom_dir_map.get_dicom_dir(
@@ -82,6 +195,9 @@ class DicomReorgWorkflow(BaseDatasetWorkflow):
                 f" session {session_id}: {dpath_downloaded}"
             )
 
+        if dpath_downloaded.is_file():
+            return [dpath_downloaded] if self.extract_archives else []
+
         # crawl through directory tree and get all file paths
         fpaths = []
         for dpath, _, fnames in os.walk(dpath_downloaded):
@@ -98,64 +214,323 @@ class DicomReorgWorkflow(BaseDatasetWorkflow):
         DICOM series, while ensuring short filenames in nested directory structures.
         """
         fpath_source = Path(fpath_source)
-        hash_prefix = hashlib.md5(str(fpath_source.parent).encode("UTF-8")).hexdigest()[
-            :HASH_LENGTH
-        ]
+        hash_prefix = _hash_dpath(str(fpath_source.parent))
 
         return f"{hash_prefix}_{fpath_source.name}"
 
-    def run_single(self, participant_id: str, session_id: str):
-        """Reorganize downloaded DICOM files for a single participant and session."""
-        # get paths to reorganize
-        fpaths_to_reorg = self.get_fpaths_to_reorg(participant_id, session_id)
-
-        dpath_reorganized: Path = (
-            self.study.layout.dpath_post_reorg
-            / participant_id_to_bids_participant_id(participant_id)
-            / session_id_to_bids_session_id(session_id)
+    def get_fpath_copy_manifest(self, participant_id: str, session_id: str) -> Path:
+        """Get the path to the file listing already-copied files for a session."""
+        return (
+            self.study.layout.dpath_nipoppy
+            / self.name
+            / (
+                f"{participant_id_to_bids_participant_id(participant_id)}_"
+                f"{session_id_to_bids_session_id(session_id)}-copied_files.txt"
+            )
         )
-        fileops.mkdir(dpath_reorganized, dry_run=self.dry_run)
 
-        # do reorg
-        for fpath_source in fpaths_to_reorg:
-            # check file (though only error out if DICOM cannot be read)
-            if self.check_dicoms:
-                try:
-                    if is_derived_dicom(fpath_source):
-                        logger.warning(f"Derived DICOM file detected: {fpath_source}")
-                except Exception as e:
-                    raise WorkflowError(
-                        f"Error checking DICOM file {fpath_source}: {e}"
-                    ) from e
-
-            # the destination path is under dpath_reorganized
-            # resolve the path to avoid issues with symlinks
-            fpath_dest = (
-                dpath_reorganized
-                / self.apply_fname_mapping(
-                    fpath_source, participant_id=participant_id, session_id=session_id
+    def get_derived_dicoms(
+        self, fpaths: list[Path], dpaths_series: Optional[list[Path]] = None
+    ) -> dict[Path, int]:
+        """Check DICOM file headers and return the derived ones.
+
+        The returned dictionary maps each derived file that was read to the number
+        of files it accounts for. If ``check_dicoms_per_series`` is set, only one
+        file per series is read and the result is assumed to hold for all other
+        files in that series. By default, the series of a file is its parent
+        directory, but it can be specified with ``dpaths_series``.
+
+        Headers are read in parallel with ``n_jobs`` threads.
+        """
+        if dpaths_series is None:
+            dpaths_series = [fpath.parent for fpath in fpaths]
+
+        if self.check_dicoms_per_series:
+            n_files_per_series: dict[Path, int] = {}
+            fpaths_to_check = []
+            dpaths_series_to_check = []
+            for fpath, dpath_series in zip(fpaths, dpaths_series):
+                if dpath_series not in n_files_per_series:
+                    n_files_per_series[dpath_series] = 0
+                    fpaths_to_check.append(fpath)
+                    dpaths_series_to_check.append(dpath_series)
+                n_files_per_series[dpath_series] += 1
+            n_files_map = {
+                fpath: n_files_per_series[dpath_series]
+                for fpath, dpath_series in zip(fpaths_to_check, dpaths_series_to_check)
+            }
+        else:
+            fpaths_to_check = fpaths
+            n_files_map = {fpath: 1 for fpath in fpaths_to_check}
+
+        def _check(fpath: Path) -> bool:
+            # only error out if DICOM cannot be read
+            try:
+                return is_derived_dicom(fpath)
+            except Exception as e:
+                raise WorkflowError(f"Error checking DICOM file {fpath}: {e}") from e
+
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            results = executor.map(_check, fpaths_to_check)
+            return {
+                fpath: n_files_map[fpath]
+                for fpath, is_derived in zip(fpaths_to_check, results)
+                if is_derived
+            }
+
+    def _check_dicoms(
+        self, fpaths: list[Path], dpaths_series: Optional[list[Path]] = None
+    ):
+        """Log a warning for each derived DICOM file (or series)."""
+        if dpaths_series is None:
+            dpaths_series = [fpath.parent for fpath in fpaths]
+        fpath_to_dpath_series = dict(zip(fpaths, dpaths_series))
+
+        for fpath_derived, n_files in self.get_derived_dicoms(
+            fpaths, dpaths_series=dpaths_series
+        ).items():
+            log_msg = f"Derived DICOM file detected: {fpath_derived}"
+            if n_files > 1:
+                log_msg += (
+                    f" (assuming the same for all {n_files} files in"
+                    f" {fpath_to_dpath_series[fpath_derived]})"
                 )
-            ).resolve()
+            logger.warning(log_msg)
+
+    def link_or_copy_files(
+        self,
+        fpaths_source: list[Path],
+        dpath_dest: Path,
+        fnames_dest: set[str],
+        participant_id: str,
+        session_id: str,
+    ):
+        """
+        Create symlinks to (or copies of) files in the reorganized directory.
+
+        ``dpath_dest`` should already be resolved. ``fnames_dest`` is used to check
+        for collisions and updated with the new file names.
+        """
+        # the copy manifest only exists if a previous run was interrupted
+        # files listed in it are skipped, and other existing files may have been
+        # partially copied so they are overwritten
+        fpath_copy_manifest = self.get_fpath_copy_manifest(participant_id, session_id)
+        if self.copy_files and fpath_copy_manifest.exists():
+            fnames_resumable = set(fnames_dest)
+        else:
+            fnames_resumable = set()
+        sources_and_targets = []
+
+        # relative paths from the destination directory to each source directory
+        # files are grouped by directory so each directory is only resolved once
+        relative_dpaths_source: dict[Path, str] = {}
+
+        for fpath_source in fpaths_source:
+            fname_dest = self.apply_fname_mapping(
+                fpath_source, participant_id=participant_id, session_id=session_id
+            )
+            fpath_dest = dpath_dest / fname_dest
 
             # do not overwrite existing files
-            if fpath_dest.exists():
+            if fname_dest in fnames_dest and fname_dest not in fnames_resumable:
                 raise FileOperationError(
                     f"Cannot move file {fpath_source} to {fpath_dest}"
                     " because it already exists"
                 )
+            fnames_resumable.discard(fname_dest)
+            fnames_dest.add(fname_dest)
 
             # either create symlinks or copy original files
             if self.copy_files:
-                fileops.copy(fpath_source, fpath_dest, dry_run=self.dry_run)
+                sources_and_targets.append((fpath_source, fpath_dest))
             else:
-                fpath_source = os.path.relpath(
-                    fpath_source.resolve(), fpath_dest.parent
+                dpath_source = fpath_source.parent
+                if dpath_source not in relative_dpaths_source:
+                    relative_dpaths_source[dpath_source] = os.path.relpath(
+                        dpath_source.resolve(), dpath_dest
+                    )
+                if not self.dry_run:
+                    # the parent directory already exists and collisions
+                    # have been checked, so skip the checks in fileops.symlink
+                    os.symlink(
+                        os.path.join(
+                            relative_dpaths_source[dpath_source], fpath_source.name
+                        ),
+                        fpath_dest,
+                    )
+
+        if self.copy_files:
+            fileops.copy_files(
+                sources_and_targets,
+                n_jobs=self.n_jobs,
+                fpath_manifest=fpath_copy_manifest,
+                dry_run=self.dry_run,
+            )
+            if not self.dry_run:
+                fpath_copy_manifest.unlink()
+        else:
+            logger.debug(
+                f"Created symlinks for {len(fpaths_source)} files in {dpath_dest}"
+            )
+
+    def extract_archive(
+        self,
+        fpath_archive: Path,
+        dpath_dest: Path,
+        fnames_dest: set[str],
+        participant_id: str,
+        session_id: str,
+    ) -> list[tuple[Path, Path]]:
+        """
+        Stream the files in an archive directly into the reorganized directory.
+
+        Destination file names are obtained by applying the file name mapping to
+        the path of each member under the archive path (as if the archive had been
+        extracted in place). ``fnames_dest`` is used to check for collisions and
+        updated with the new file names.
+
+        Return the extracted file paths along with their (virtual) source paths.
+        """
+        if self.dry_run:
+            logger.info(f"Not extracting {fpath_archive} since this is a dry run")
+            return []
+
+        logger.debug(f"Extracting files from {fpath_archive} into {dpath_dest}")
+        fpaths_extracted = []
+        for member_name, file_member in iter_archive_members(fpath_archive):
+            fpath_source = fpath_archive / member_name
+            fname_dest = self.apply_fname_mapping(
+                fpath_source, participant_id=participant_id, session_id=session_id
+            )
+            fpath_dest = dpath_dest / fname_dest
+
+            if fname_dest in fnames_dest:
+                raise FileOperationError(
+                    f"Cannot extract file {fpath_source} to {fpath_dest}"
+                    " because it already exists"
                 )
-                fileops.symlink(
-                    source=fpath_source,
-                    target=fpath_dest,
-                    dry_run=self.dry_run,
+            fnames_dest.add(fname_dest)
+
+            with open(fpath_dest, "xb") as file_dest:
+                shutil.copyfileobj(file_member, file_dest, fileops.COPY_CHUNK_SIZE)
+            fpaths_extracted.append((fpath_dest, fpath_source))
+
+        return fpaths_extracted
+
+    def build_dicom_index(
+        self, dpath_reorganized: Path, participant_id: str, session_id: str
+    ) -> pd.DataFrame:
+        """
+        Index DICOM header fields for the reorganized files of a participant-session.
+
+        Headers are read in parallel with ``n_jobs`` threads. The index is written
+        to its own Parquet file (replacing any previous one for this
+        participant-session), so the study-level index is updated incrementally.
+        Paths are relative to the post-reorg directory.
+        """
+        bids_participant_id = participant_id_to_bids_participant_id(participant_id)
+        bids_session_id = session_id_to_bids_session_id(session_id)
+        fnames = sorted(os.listdir(dpath_reorganized))
+
+        def _read(fname: str) -> dict[str, Optional[str]]:
+            fpath = dpath_reorganized / fname
+            try:
+                return read_dicom_tags(fpath, DICOM_INDEX_TAGS)
+            except Exception as e:
+                logger.warning(f"Cannot read DICOM header of {fpath} for index: {e}")
+                return dict.fromkeys(DICOM_INDEX_TAGS)
+
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            records = list(executor.map(_read, fnames))
+
+        df_index = pd.DataFrame(records, columns=DICOM_INDEX_TAGS, dtype="string")
+        df_index.insert(0, "participant_id", participant_id)
+        df_index.insert(1, "session_id", session_id)
+        df_index.insert(
+            2,
+            "path",
+            [f"{bids_participant_id}/{bids_session_id}/{fname}" for fname in fnames],
+        )
+
+        # write to a temporary file first so that readers never see a partial file
+        fpath_index = (
+            self.dpath_dicom_index
+            / f"{bids_participant_id}_{bids_session_id}{EXT_PARQUET}"
+        )
+        fpath_index_tmp = fpath_index.with_name(f".{fpath_index.name}.tmp")
+        fileops.mkdir(fpath_index.parent)
+        df_index.to_parquet(fpath_index_tmp, index=False)
+        os.replace(fpath_index_tmp, fpath_index)
+        logger.debug(f"Wrote DICOM header index with {len(df_index)} rows")
+
+        return df_index
+
+    def run_single(self, participant_id: str, session_id: str):
+        """Reorganize downloaded DICOM files for a single participant and session."""
+        # get paths to reorganize
+        fpaths_to_reorg = self.get_fpaths_to_reorg(participant_id, session_id)
+
+        # archives will have their content extracted instead of being linked/copied
+        if self.extract_archives:
+            fpaths_archives = [fpath for fpath in fpaths_to_reorg if is_archive(fpath)]
+            fpaths_to_reorg = [
+                fpath for fpath in fpaths_to_reorg if not is_archive(fpath)
+            ]
+        else:
+            fpaths_archives = []
+
+        dpath_reorganized: Path = (
+            self.study.layout.dpath_post_reorg
+            / participant_id_to_bids_participant_id(participant_id)
+            / session_id_to_bids_session_id(session_id)
+        )
+        # check files before reorganizing anything
+        if self.check_dicoms:
+            self._check_dicoms(fpaths_to_reorg)
+
+        fileops.mkdir(dpath_reorganized, dry_run=self.dry_run)
+
+        # resolve the destination directory once to avoid issues with symlinks
+        # (instead of resolving every destination file path)
+        dpath_reorganized = dpath_reorganized.resolve()
+
+        # check for collisions against an in-memory set of file names
+        # instead of checking whether each destination path exists
+        if dpath_reorganized.exists():
+            fnames_dest = set(os.listdir(dpath_reorganized))
+        else:
+            fnames_dest = set()
+
+        self.link_or_copy_files(
+            fpaths_to_reorg,
+            dpath_reorganized,
+            fnames_dest=fnames_dest,
+            participant_id=participant_id,
+            session_id=session_id,
+        )
+
+        # extract archives and check the extracted files
+        fpaths_extracted = []
+        for fpath_archive in fpaths_archives:
+            fpaths_extracted.extend(
+                self.extract_archive(
+                    fpath_archive,
+                    dpath_reorganized,
+                    fnames_dest=fnames_dest,
+                    participant_id=participant_id,
+                    session_id=session_id,
                 )
+            )
+        if self.check_dicoms and fpaths_extracted:
+            self._check_dicoms(
+                [fpath_dest for fpath_dest, _ in fpaths_extracted],
+                dpaths_series=[
+                    fpath_source.parent for _, fpath_source in fpaths_extracted
+                ],
+            )
+
+        if self.dicom_index and not self.dry_run:
+            self.build_dicom_index(dpath_reorganized, participant_id, session_id)
 
         # update curation status
         self.curation_status_table.set_status(
@@ -165,6 +540,36 @@ class DicomReorgWorkflow(BaseDatasetWorkflow):
             status=True,
         )
 
+    def mark_downloaded_archives(self):
+        """Mark participants/sessions whose raw DICOM directory is a file as downloaded.
+
+        The curation status only counts non-empty directories as downloaded data, but
+        with ``extract_archives`` the raw DICOM directory can also be a single
+        archive file.
+        """
+        participants_sessions_downloaded = set(
+            self.curation_status_table.get_downloaded_participants_sessions()
+        )
+        for (
+            participant_id,
+            session_id,
+        ) in self.curation_status_table.get_participants_sessions():
+            if (participant_id, session_id) in participants_sessions_downloaded:
+                continue
+            fpath_downloaded = (
+                self.study.layout.dpath_pre_reorg
+                / self.dicom_dir_map.get_dicom_dir(
+                    participant_id=participant_id, session_id=session_id
+                )
+            )
+            if fpath_downloaded.is_file():
+                self.curation_status_table.set_status(
+                    participant_id=participant_id,
+                    session_id=session_id,
+                    col=self.curation_status_table.col_in_pre_reorg,
+                    status=True,
+                )
+
     def get_participants_sessions_to_run(self):
         """Return participant-session pairs to reorganize."""
         participants_sessions_organized = set(
@@ -187,6 +592,8 @@ class DicomReorgWorkflow(BaseDatasetWorkflow):
             dpath_organized=self.study.layout.dpath_post_reorg,
             dpath_bidsified=self.study.layout.dpath_bids,
         )
+        if self.extract_archives:
+            self.mark_downloaded_archives()
 
     def run_main(self):
         """Reorganize all downloaded DICOM files."""
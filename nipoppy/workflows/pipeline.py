@@ -43,8 +43,8 @@ from nipoppy.exceptions import (
     ReturnCode,
     WorkflowError,
 )
-from nipoppy.layout import DatasetLayout
 from nipoppy.logger import get_logger
+from nipoppy.pipeline_registry import FNAME_PIPELINE_REGISTRY, get_pipeline_bundles
 from nipoppy.utils import fileops
 from nipoppy.utils.bids import (
     add_pybids_ignore_patterns,
@@ -81,6 +81,7 @@ logger = get_logger()
 def get_pipeline_version(
     pipeline_name: str,
     dpath_pipelines: StrOrPathLike,
+    fpath_registry: Optional[StrOrPathLike] = None,
 ) -> str:
     """Get the latest version associated with a pipeline.
 
@@ -90,36 +91,28 @@ def get_pipeline_version(
         Name of the pipeline, as specified in the config
     dpath_pipelines : nipoppy.env.StrOrPathLike
         Path to directory containing pipeline bundle subdirectories
+    fpath_registry : Optional[nipoppy.env.StrOrPathLike], optional
+        Path to the pipeline registry file, by default None (no registry)
 
     Returns
     -------
     str
         The pipeline version
     """
-    installed_pipelines = []
-    pipeline_config_latest = None
-    for fpath_pipeline_config in Path(dpath_pipelines).glob(
-        f"*/{DatasetLayout.fname_pipeline_config}"
-    ):
-        pipeline_config = BasePipelineConfig(
-            **load_json(fpath_pipeline_config, allow_json5=True)
-        )
-        if pipeline_config.NAME == pipeline_name:
-            if pipeline_config_latest is None:
-                pipeline_config_latest = pipeline_config
-            elif Version(pipeline_config.VERSION) > Version(
-                pipeline_config_latest.VERSION
-            ):
-                pipeline_config_latest = pipeline_config
-        installed_pipelines.append((pipeline_config.NAME, pipeline_config.VERSION))
-
-    if pipeline_config_latest is not None:
-        return pipeline_config_latest.VERSION
+    pipeline_bundles = get_pipeline_bundles(
+        dpath_pipelines, fpath_registry=fpath_registry
+    )
+    if pipeline_name in pipeline_bundles:
+        return max(pipeline_bundles[pipeline_name], key=Version)
     else:
         raise WorkflowError(
             f"No config found for pipeline with NAME={pipeline_name}"
             ". Installed pipelines: "
-            + ", ".join(f"{name} {version}" for name, version in installed_pipelines)
+            + ", ".join(
+                f"{name} {version}"
+                for name, versions in pipeline_bundles.items()
+                for version in versions
+            )
         )
 
 
@@ -566,6 +559,8 @@ class BasePipelineWorkflow(BaseDatasetWorkflow, ABC):
                 dpath_pipelines=self.study.layout.get_dpath_pipeline_store(
                     self._pipeline_type
                 ),
+                fpath_registry=self.study.layout.dpath_nipoppy
+                / FNAME_PIPELINE_REGISTRY,
             )
             logger.warning(
                 f"Pipeline version not specified, using version {self.pipeline_version}"
@@ -2,17 +2,19 @@
 
 from __future__ import annotations
 
-import subprocess
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 from nipoppy.config.main import Config
 from nipoppy.config.pipeline import BasePipelineConfig
 from nipoppy.console import CONSOLE_STDERR, CONSOLE_STDOUT
 from nipoppy.container import get_container_handler
+from nipoppy.container_store import DNAME_IMAGE_STORE, ImageStore
 from nipoppy.env import ContainerCommandEnum, StrOrPathLike
 from nipoppy.exceptions import (
     ConfigError,
+    ContainerError,
     FileOperationError,
     WorkflowError,
 )
@@ -22,21 +24,33 @@ from nipoppy.utils import fileops
 from nipoppy.utils.json5 import update_json5_file
 from nipoppy.utils.utils import apply_substitutions_to_json, process_template_str
 from nipoppy.workflows.base import BaseDatasetWorkflow, _run_command
+from nipoppy.workflows.services.containers import ContainerPullManager
 from nipoppy.zenodo_api import ZenodoAPI
 
 logger = get_logger()
 
 
+def _is_zenodo_id(source: StrOrPathLike) -> bool:
+    return str(source).removeprefix("zenodo.").isnumeric()
+
+
 class PipelineInstallWorkflow(BaseDatasetWorkflow):
-    """Workflow for pipeline install command."""
+    """Workflow for pipeline install command.
+
+    The source can be a local pipeline config directory or a Zenodo ID. Several
+    Zenodo IDs can be given at once, in which case all records are downloaded
+    concurrently, then validated and installed.
+    """
 
     def __init__(
         self,
         dpath_root: Path,
-        source: StrOrPathLike | str,
+        source: StrOrPathLike | str | Sequence[StrOrPathLike],
         zenodo_api: ZenodoAPI = None,
         assume_yes: bool = False,
         force: bool = False,
+        verify_images: bool = False,
+        refresh_images: bool = False,
         fpath_layout: Optional[StrOrPathLike] = None,
         verbose: bool = False,
         dry_run: bool = False,
@@ -54,12 +68,23 @@ class PipelineInstallWorkflow(BaseDatasetWorkflow):
         self.zenodo_api.logger = logger  # use nipoppy logger configuration
         self.assume_yes = assume_yes
         self.force = force
+        self.verify_images = verify_images
+        self.refresh_images = refresh_images
+
+        if not isinstance(source, (str, os.PathLike)):
+            source = list(source)
+            if len(source) == 1:
+                source = source[0]
+        self.source = source
 
         self.dpath_pipeline = None
         self.zenodo_id = None
-        if (dpath_pipeline := Path(source)).exists():
+        self.zenodo_ids = []
+        if isinstance(source, list):
+            self.zenodo_ids = [str(zenodo_id) for zenodo_id in source]
+        elif (dpath_pipeline := Path(source)).exists():
             self.dpath_pipeline = dpath_pipeline.resolve()
-        elif source.removeprefix("zenodo.").isnumeric():
+        elif _is_zenodo_id(source):
             self.zenodo_id = source
         else:
             logger.warning(f"{source} does not seem like a valid path or Zenodo ID")
@@ -142,148 +167,166 @@ class PipelineInstallWorkflow(BaseDatasetWorkflow):
         return config
 
     def _download_container(self, pipeline_config: BasePipelineConfig):
-        uri = pipeline_config.CONTAINER_INFO.URI
+        self._download_containers([pipeline_config])
 
-        # pipeline is not containerized
-        if uri is None:
-            return
+    def _download_containers(self, pipeline_configs: Sequence[BasePipelineConfig]):
+        """Download the containers of several pipelines concurrently."""
+        container_handler = get_container_handler(self.study.config.CONTAINER_CONFIG)
+
+        to_pull = {}
+        for pipeline_config in pipeline_configs:
+            uri = pipeline_config.CONTAINER_INFO.URI
+
+            # pipeline is not containerized
+            if uri is None:
+                continue
 
-        # apply substitutions
-        pipeline_config = type(pipeline_config)(
-            **apply_substitutions_to_json(
-                pipeline_config.model_dump(mode="json"), self.study.config.SUBSTITUTIONS
+            # apply substitutions
+            pipeline_config = type(pipeline_config)(
+                **apply_substitutions_to_json(
+                    pipeline_config.model_dump(mode="json"),
+                    self.study.config.SUBSTITUTIONS,
+                )
             )
-        )
-        fpath_container = Path(
-            process_template_str(
-                str(pipeline_config.CONTAINER_INFO.FILE), objs=[self.study.layout]
+            fpath_container = Path(
+                process_template_str(
+                    str(pipeline_config.CONTAINER_INFO.FILE), objs=[self.study.layout]
+                )
             )
-        )
 
-        container_handler = get_container_handler(self.study.config.CONTAINER_CONFIG)
+            # container file already exists or will already be downloaded
+            if (uri, fpath_container) in to_pull or (
+                not self.refresh_images
+                and container_handler.is_image_downloaded(uri, fpath_container)
+            ):
+                continue
+
+            # prompt user and confirm
+            if self.assume_yes or CONSOLE_STDOUT.confirm(
+                (
+                    f"[yellow]{container_handler.get_pull_confirmation_prompt(fpath_container)}[/]"  # noqa: E501
+                ),
+                kwargs_call={"default": True},
+            ):
+                to_pull[(uri, fpath_container)] = None
 
-        # container file already exists
-        if container_handler.is_image_downloaded(uri, fpath_container):
+        if len(to_pull) == 0:
             return
 
-        # prompt user and confirm
-        if self.assume_yes or CONSOLE_STDOUT.confirm(
-            (
-                f"[yellow]{container_handler.get_pull_confirmation_prompt(fpath_container)}[/]"  # noqa: E501
-            ),
-            kwargs_call={"default": True},
-        ):
-            pull_command = container_handler.get_pull_command(uri, fpath_container)
-
-            if (
-                self.study.config.CONTAINER_CONFIG.COMMAND
-                == ContainerCommandEnum.DOCKER
-            ):
-                console = CONSOLE_STDOUT
-            else:
-                # use stderr for status messages so that the Apptainer/Singularity
-                # output does not break the status display
-                # ("apptainer/singularity pull" seems to only print to stderr)
-                console = CONSOLE_STDERR
-
-            try:
-                with console.status(
-                    "Downloading the container, this can take a while..."
-                ):
-                    _run_command(pull_command, dry_run=self.dry_run)
-            except subprocess.CalledProcessError as e:
-                logger.error(
-                    f"Failed to download container {pipeline_config.CONTAINER_INFO.URI}"
-                    f": {e}"
-                )
-                raise WorkflowError from e
-
-    def run_main(self):
-        """Install a pipeline.
+        if self.study.config.CONTAINER_CONFIG.COMMAND == ContainerCommandEnum.DOCKER:
+            console = CONSOLE_STDOUT
+        else:
+            # use stderr for status messages so that the Apptainer/Singularity
+            # output does not break the status display
+            # ("apptainer/singularity pull" seems to only print to stderr)
+            console = CONSOLE_STDERR
 
-        The pipeline config directory is put in the appropriate location in the dataset,
-        and any pipeline variables are added to the global config file.
-        """
-        if self.zenodo_id is not None:
-            # TODO extract the function to the zenodo_api module
-            record_source = (
-                self.zenodo_api.api_endpoint.removesuffix("api")
-                + "records/"
-                + self.zenodo_id
+        if len(to_pull) == 1:
+            status_message = "Downloading the container, this can take a while..."
+        else:
+            status_message = (
+                f"Downloading {len(to_pull)} containers, this can take a while..."
             )
-            logger.info(f"Installing pipeline from {record_source}")
-            dpath_pipeline = self.study.layout.dpath_pipelines / self.zenodo_id
-            if dpath_pipeline.exists() and not self.force:
-                logger.error(
-                    f"Output directory {dpath_pipeline} already exists."
-                    "Use the '--force' flag to overwrite the current content. Aborting."
-                )
-                raise WorkflowError
 
-            logger.debug(f"Downloading pipeline {self.zenodo_id} in {dpath_pipeline}")
-            self.zenodo_api.download_record_files(
-                record_id=self.zenodo_id, output_dir=dpath_pipeline
+        pull_manager = ContainerPullManager(
+            run_command=_run_command,
+            dry_run=self.dry_run,
+            image_store=ImageStore(
+                self.study.layout.dpath_containers / DNAME_IMAGE_STORE
+            ),
+            verify_images=self.verify_images,
+            refresh_images=self.refresh_images,
+        )
+        try:
+            with console.status(status_message):
+                pull_manager.pull_all(container_handler, list(to_pull))
+        except ContainerError as e:
+            logger.error(str(e))
+            raise WorkflowError from e
+
+    def _get_dpath_download(self, zenodo_id: str) -> Path:
+        """Get the temporary directory to download a Zenodo record into."""
+        dpath_download = self.study.layout.dpath_pipelines / zenodo_id
+        if dpath_download.exists() and not self.force:
+            logger.error(
+                f"Output directory {dpath_download} already exists."
+                "Use the '--force' flag to overwrite the current content. Aborting."
             )
-            logger.success("Pipeline successfully downloaded")
-        else:
-            logger.info(f"Installing pipeline from {self.source}")
-            dpath_pipeline = self.dpath_pipeline
+            raise WorkflowError
+        return dpath_download
+
+    def _get_record_url(self, zenodo_id: str) -> str:
+        return (
+            self.zenodo_api.api_endpoint.removesuffix("/api")
+            + "/records/"
+            + zenodo_id.removeprefix("zenodo.")
+        )
 
-        # load the config and validate file contents (including file paths)
+    def _check_pipeline_bundle(
+        self, dpath_pipeline: Path, zenodo_id: Optional[str] = None
+    ) -> BasePipelineConfig:
+        """Load the config and validate file contents (including file paths)."""
         try:
-            pipeline_config = check_pipeline_bundle(dpath_pipeline)
+            return check_pipeline_bundle(dpath_pipeline)
         except FileOperationError as e:
             # if the files were downloaded from Zenodo, point user to the Zenodo record
-            if self.zenodo_id is not None:
-                record_url = (
-                    self.zenodo_api.api_endpoint.removesuffix("/api")
-                    + "/records/"
-                    + self.zenodo_id
-                )
+            if zenodo_id is not None:
                 raise ConfigError(
                     f"{str(e)}. Make sure the record at "
-                    f"{record_url} contains valid Nipoppy pipeline configuration files."
+                    f"{self._get_record_url(zenodo_id)} contains valid Nipoppy "
+                    "pipeline configuration files."
                 ) from e
             else:
                 raise
 
-        # generate destination path
+    def _get_dpath_target(self, pipeline_config: BasePipelineConfig) -> Path:
+        """Generate the destination path and check if it already exists."""
         dpath_target = self.study.layout.get_dpath_pipeline_bundle(
             pipeline_config.PIPELINE_TYPE,
             pipeline_config.NAME,
             pipeline_config.VERSION,
         )
+        if dpath_target.exists() and not self.force:
+            raise FileOperationError(
+                f"Pipeline directory exists: {dpath_target}. Use --force to overwrite",
+            )
+        return dpath_target
 
-        # check if the target directory already exists
+    def _install_pipeline_bundle(
+        self,
+        dpath_pipeline: Path,
+        dpath_target: Path,
+        pipeline_config: BasePipelineConfig,
+        downloaded: bool,
+        download_container: bool = True,
+    ):
         if dpath_target.exists():
-            if not self.force:
-                raise FileOperationError(
-                    f"Pipeline directory exists: {dpath_target}"
-                    ". Use --force to overwrite",
-                )
-            else:
-                fileops.rm(dpath_target, dry_run=self.dry_run)
+            fileops.rm(dpath_target, dry_run=self.dry_run)
 
-        # copy the directory
-        if self.dpath_pipeline is not None:
-            fileops.copy(
+        if downloaded:
+            # if the pipeline was downloaded from Zenodo, move it to the target location
+            fileops.movetree(
                 source=dpath_pipeline,
                 target=dpath_target,
                 dry_run=self.dry_run,
             )
         else:
-            # if the pipeline was downloaded from Zenodo, move it to the target location
-            fileops.movetree(
+            fileops.copy(
                 source=dpath_pipeline,
                 target=dpath_target,
                 dry_run=self.dry_run,
             )
 
+        # update the installed pipeline registry
+        if not self.dry_run:
+            self.study.get_pipeline_bundles(pipeline_config.PIPELINE_TYPE)
+
         # update global config with new pipeline variables
         self._update_config_and_save(pipeline_config)
 
         # download container if it is specified
-        self._download_container(pipeline_config)
+        if download_container:
+            self._download_container(pipeline_config)
 
         logger.success(
             "Successfully installed pipeline "
@@ -291,6 +334,89 @@ class PipelineInstallWorkflow(BaseDatasetWorkflow):
             f"{dpath_target}"
         )
 
+    def _run_many(self):
+        """Download, validate and install several pipelines from Zenodo."""
+        invalid_sources = [
+            zenodo_id for zenodo_id in self.zenodo_ids if not _is_zenodo_id(zenodo_id)
+        ]
+        if len(invalid_sources) > 0:
+            raise WorkflowError(
+                "Only Zenodo IDs can be used to install several pipelines at once"
+                f", got invalid source(s): {invalid_sources}"
+            )
+
+        dpaths_download = {
+            zenodo_id: self._get_dpath_download(zenodo_id)
+            for zenodo_id in dict.fromkeys(self.zenodo_ids)
+        }
+        logger.info(
+            f"Installing {len(dpaths_download)} pipelines from "
+            f"{self.zenodo_api.api_endpoint.removesuffix('/api')}"
+        )
+        self.zenodo_api.download_records(dpaths_download)
+        logger.success(f"{len(dpaths_download)} pipelines successfully downloaded")
+
+        # validate all pipelines before installing any of them
+        to_install = []
+        dpaths_target = set()
+        for zenodo_id, dpath_download in dpaths_download.items():
+            pipeline_config = self._check_pipeline_bundle(dpath_download, zenodo_id)
+            dpath_target = self._get_dpath_target(pipeline_config)
+            if dpath_target in dpaths_target:
+                raise WorkflowError(
+                    f"Several records contain pipeline {pipeline_config.NAME}, "
+                    f"version {pipeline_config.VERSION}"
+                )
+            dpaths_target.add(dpath_target)
+            to_install.append((dpath_download, dpath_target, pipeline_config))
+
+        for dpath_download, dpath_target, pipeline_config in to_install:
+            self._install_pipeline_bundle(
+                dpath_download,
+                dpath_target,
+                pipeline_config,
+                downloaded=True,
+                download_container=False,
+            )
+
+        # download all containers at once
+        self._download_containers(
+            [pipeline_config for _, _, pipeline_config in to_install]
+        )
+
+    def run_main(self):
+        """Install a pipeline.
+
+        The pipeline config directory is put in the appropriate location in the dataset,
+        and any pipeline variables are added to the global config file.
+        """
+        if len(self.zenodo_ids) > 0:
+            self._run_many()
+            return
+
+        if self.zenodo_id is not None:
+            logger.info(
+                f"Installing pipeline from {self._get_record_url(self.zenodo_id)}"
+            )
+            dpath_pipeline = self._get_dpath_download(self.zenodo_id)
+
+            logger.debug(f"Downloading pipeline {self.zenodo_id} in {dpath_pipeline}")
+            self.zenodo_api.download_record_files(
+                record_id=self.zenodo_id, output_dir=dpath_pipeline
+            )
+            logger.success("Pipeline successfully downloaded")
+        else:
+            logger.info(f"Installing pipeline from {self.source}")
+            dpath_pipeline = self.dpath_pipeline
+
+        pipeline_config = self._check_pipeline_bundle(dpath_pipeline, self.zenodo_id)
+        self._install_pipeline_bundle(
+            dpath_pipeline,
+            self._get_dpath_target(pipeline_config),
+            pipeline_config,
+            downloaded=self.dpath_pipeline is None,
+        )
+
     def run_cleanup(self):
         """Close resources used by the workflow."""
         self.zenodo_api.close()
@@ -1,5 +1,7 @@
 """Workflow for pipeline search command."""
 
+import sqlite3
+import time
 from typing import Optional
 
 import pandas as pd
@@ -9,6 +11,7 @@ from rich.table import Table
 from nipoppy.console import _INDENT, CONSOLE_STDOUT
 from nipoppy.env import ZENODO_COMMUNITY_ID
 from nipoppy.logger import get_logger
+from nipoppy.pipeline_catalog import PipelineCatalog
 from nipoppy.utils.html import strip_html_tags
 from nipoppy.workflows.base import BaseWorkflow
 from nipoppy.zenodo_api import ZenodoAPI
@@ -21,7 +24,12 @@ logger = get_logger()
 
 
 class PipelineSearchWorkflow(BaseWorkflow):
-    """Search Zenodo for existing pipeline configurations and print results table."""
+    """Search Zenodo for existing pipeline configurations and print results table.
+
+    If a local pipeline catalog is given and has been synced, it is searched instead
+    of Zenodo (unless ``live`` is True). Results from Zenodo are then used to keep
+    the synced catalog up to date (unless ``update_catalog`` is False).
+    """
 
     col_zenodo_id = "Zenodo ID"
     col_community = "Community"
@@ -45,6 +53,9 @@ class PipelineSearchWorkflow(BaseWorkflow):
         zenodo_api: Optional[ZenodoAPI] = None,
         community: bool = False,
         size: int = 10,
+        catalog: Optional[PipelineCatalog] = None,
+        live: bool = False,
+        update_catalog: bool = True,
         verbose: bool = False,
         dry_run: bool = False,
     ):
@@ -59,6 +70,9 @@ class PipelineSearchWorkflow(BaseWorkflow):
         self.query = query
         self.community = community
         self.size = size
+        self.catalog = catalog
+        self.live = live
+        self.update_catalog = update_catalog
 
     def _hits_to_df(self, hits: list[dict]) -> pd.DataFrame:
         data_for_df = []
@@ -66,7 +80,13 @@ class PipelineSearchWorkflow(BaseWorkflow):
             description = hit.get("metadata", {}).get("description")
             if description is not None:
                 description = strip_html_tags(description).strip()
-            zenodo_id_with_link = f"[link={hit.get('doi_url')}]{hit.get('id')}[/link]"
+            if hit.get("doi_url") is None:
+                # pipeline installed in a dataset (from the local catalog)
+                zenodo_id_with_link = "-"
+            else:
+                zenodo_id_with_link = (
+                    f"[link={hit.get('doi_url')}]{hit.get('id')}[/link]"
+                )
             communities = hit.get("metadata", {}).get("communities", [])
             community_names = "\n".join(
                 rv for c in communities if (rv := c.get("id")) is not None
@@ -118,17 +138,61 @@ class PipelineSearchWorkflow(BaseWorkflow):
             table.add_row(*[str(cell) for cell in row])
         return table
 
+    def _search_catalog(self) -> Optional[dict]:
+        """Search the local catalog, or return None if it should not be used."""
+        if self.catalog is None or self.live:
+            return None
+
+        last_sync = self.catalog.last_sync
+        if last_sync is None:
+            logger.info(
+                "The local pipeline catalog is empty, searching Zenodo instead"
+                ' (run "nipoppy pipeline sync" to enable offline search)'
+            )
+            return None
+
+        logger.debug(f"Searching local pipeline catalog at {self.catalog.fpath}")
+        logger.info(
+            "Showing results from the local pipeline catalog (last synced on "
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(last_sync))}"
+            ", use --live to search Zenodo directly)"
+        )
+        return self.catalog.search(
+            self.query,
+            community_id=ZENODO_COMMUNITY_ID if self.community else None,
+            size=self.size,
+        )
+
+    def _update_catalog(self, hits: list[dict]):
+        """Update download counts and descriptions in a synced catalog."""
+        if self.catalog is None or not self.update_catalog or self.dry_run:
+            return
+
+        # the catalog is a cache, so failing to update it should not be an error
+        try:
+            if self.catalog.last_sync is None:
+                return
+            self.catalog.add_zenodo_records(hits)
+        except (sqlite3.Error, OSError) as exception:
+            logger.debug(
+                "Could not update the local pipeline catalog at"
+                f" {self.catalog.fpath}: {exception}"
+            )
+
     def run_main(self):
         """Run the workflow."""
-        with CONSOLE_STDOUT.status("Searching Nipoppy pipelines on Zenodo..."):
-            # we get all results and sort/slice them ourselves since we cannot currently
-            # sort by "mostdownloaded" through the API
-            results = self.zenodo_api.search_records(
-                query=self.query,
-                community_id=ZENODO_COMMUNITY_ID if self.community else None,
-                keywords=["Nipoppy"],
-                size=self.size,
-            )
+        results = self._search_catalog()
+        if results is None:
+            with CONSOLE_STDOUT.status("Searching Nipoppy pipelines on Zenodo..."):
+                # we get all results and sort/slice them ourselves since we cannot
+                # currently sort by "mostdownloaded" through the API
+                results = self.zenodo_api.search_records(
+                    query=self.query,
+                    community_id=ZENODO_COMMUNITY_ID if self.community else None,
+                    keywords=["Nipoppy"],
+                    size=self.size,
+                )
+            self._update_catalog(results["hits"])
 
         hits = results["hits"]
         n_total = results["total"]
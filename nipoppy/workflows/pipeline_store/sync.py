@@ -0,0 +1,108 @@
+"""Workflow for pipeline sync command."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from nipoppy.config.pipeline import BasePipelineConfig
+from nipoppy.console import CONSOLE_STDOUT
+from nipoppy.env import PipelineTypeEnum, StrOrPathLike
+from nipoppy.layout import DatasetLayout
+from nipoppy.logger import get_logger
+from nipoppy.pipeline_catalog import PipelineCatalog
+from nipoppy.pipeline_registry import load_bundle_config
+from nipoppy.study import Study
+from nipoppy.workflows.base import BaseWorkflow
+from nipoppy.zenodo_api import ZenodoAPI
+
+# maximum page size of the Zenodo search API for anonymous users
+SYNC_PAGE_SIZE = 25
+
+logger = get_logger()
+
+
+class PipelineSyncWorkflow(BaseWorkflow):
+    """Update the local pipeline catalog used for offline search.
+
+    All Nipoppy pipeline records are fetched from Zenodo. If a dataset is given,
+    the pipelines installed in it are also added to the catalog.
+    """
+
+    def __init__(
+        self,
+        catalog: PipelineCatalog,
+        zenodo_api: Optional[ZenodoAPI] = None,
+        dpath_root: Optional[StrOrPathLike] = None,
+        fpath_layout: Optional[StrOrPathLike] = None,
+        verbose: bool = False,
+        dry_run: bool = False,
+    ):
+        """Initialize the workflow."""
+        super().__init__(
+            name="pipeline_sync",
+            verbose=verbose,
+            dry_run=dry_run,
+        )
+        self.catalog = catalog
+        self.zenodo_api = zenodo_api or ZenodoAPI()
+        self.zenodo_api.logger = logger  # use nipoppy logger configuration
+        self.dpath_root = dpath_root
+        self.fpath_layout = fpath_layout
+
+    def _get_zenodo_records(self) -> list[dict]:
+        hits = []
+        page = 1
+        while True:
+            results = self.zenodo_api.search_records(
+                query="", keywords=["Nipoppy"], size=SYNC_PAGE_SIZE, page=page
+            )
+            hits.extend(results["hits"])
+            if len(results["hits"]) == 0 or len(hits) >= results["total"]:
+                return hits
+            page += 1
+
+    def _get_installed_pipelines(
+        self, layout: DatasetLayout
+    ) -> list[tuple[Path, BasePipelineConfig]]:
+        study = Study(layout=layout)
+        pipelines = []
+        for pipeline_type in PipelineTypeEnum:
+            dpaths_bundle = sorted(
+                dpath_bundle
+                for bundles in study.get_pipeline_bundles(pipeline_type).values()
+                for dpath_bundle in bundles.values()
+            )
+            for dpath_bundle in dpaths_bundle:
+                pipeline_config = load_bundle_config(dpath_bundle)
+                if pipeline_config.PIPELINE_TYPE is None:
+                    pipeline_config.PIPELINE_TYPE = pipeline_type
+                pipelines.append((dpath_bundle, pipeline_config))
+        return pipelines
+
+    def run_main(self):
+        """Run the workflow."""
+        with CONSOLE_STDOUT.status("Fetching Nipoppy pipelines from Zenodo..."):
+            hits = self._get_zenodo_records()
+        logger.info(f"Found {len(hits)} pipeline records on Zenodo")
+        if not self.dry_run:
+            self.catalog.add_zenodo_records(hits, replace=True)
+
+        if self.dpath_root is not None:
+            layout = DatasetLayout(
+                dpath_root=self.dpath_root, fpath_config=self.fpath_layout
+            )
+            pipelines = self._get_installed_pipelines(layout)
+            logger.info(
+                f"Found {len(pipelines)} pipelines installed in "
+                f"{layout.dpath_pipelines}"
+            )
+            if not self.dry_run:
+                self.catalog.add_installed_pipelines(layout.dpath_pipelines, pipelines)
+
+        if not self.dry_run:
+            logger.success(f"Pipeline catalog updated: {self.catalog.fpath}")
+
+    def run_cleanup(self):
+        """Close resources used by the workflow."""
+        self.zenodo_api.close()
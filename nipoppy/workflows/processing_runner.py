@@ -2,17 +2,23 @@
 
 from __future__ import annotations
 
+import sys
+import tarfile
 from functools import cached_property
 from pathlib import Path
-from tarfile import is_tarfile
 from typing import TYPE_CHECKING, Optional
 
 from nipoppy.config.tracker import TrackerConfig
-from nipoppy.env import BIDS_PATH_INJECTION_PREFIX, EXT_TAR, StrOrPathLike
-from nipoppy.exceptions import ConfigError, FileOperationError, WorkflowError
+from nipoppy.env import BIDS_PATH_INJECTION_PREFIX, StrOrPathLike
+from nipoppy.exceptions import (
+    ConfigError,
+    FileOperationError,
+    ReturnCode,
+    WorkflowError,
+)
 from nipoppy.logger import get_logger
 from nipoppy.utils import fileops
-from nipoppy.workflows.base import _run_command
+from nipoppy.utils.archive import ZSTANDARD_INSTALLED, get_fpath_tar, write_tar
 from nipoppy.workflows.runner import Runner
 
 if TYPE_CHECKING:
@@ -51,7 +57,9 @@ class ProcessingRunner(Runner):
         use_subcohort: Optional[StrOrPathLike] = None,
         simulate: bool = False,
         keep_workdir: bool = False,
+        persistent_container: bool = False,
         tar: bool = False,
+        tar_compression: Optional[str] = None,
         write_subcohort: Optional[StrOrPathLike] = None,
         fpath_layout: Optional[StrOrPathLike] = None,
         verbose: bool = False,
@@ -75,8 +83,18 @@ class ProcessingRunner(Runner):
             hpc=hpc,
             simulate=simulate,
             keep_workdir=keep_workdir,
+            persistent_container=persistent_container,
         )
         self.tar = tar
+        self.tar_compression = tar_compression
+
+        if self.tar_compression == "zstd" and not ZSTANDARD_INSTALLED:
+            logger.error(
+                "An additional dependency is required to compress tarballs with zstd. "
+                "Install it with: pip install nipoppy[zstd]",
+                extra={"markup": False},
+            )
+            sys.exit(ReturnCode.MISSING_DEPENDENCY)
 
     @cached_property
     def dpaths_to_check(self) -> list[Path]:
@@ -111,27 +129,31 @@ class ProcessingRunner(Runner):
             )
 
     def tar_directory(self, dpath: StrOrPathLike) -> Path:
-        """Tar a directory and delete it."""
+        """Tar a directory and delete it.
+
+        The archive is written in-process (see :func:`nipoppy.utils.archive.write_tar`),
+        along with an index of its members for random access (see
+        :class:`nipoppy.utils.archive.IndexedTar`).
+        """
         dpath = Path(dpath)
         if not dpath.exists():
             raise FileOperationError(f"Not tarring {dpath} since it does not exist")
         if not dpath.is_dir():
             raise FileOperationError(f"Not tarring {dpath} since it is not a directory")
 
-        tar_flags = "-cvf"
-        fpath_tarred = dpath.with_suffix(EXT_TAR)
+        fpath_tarred = get_fpath_tar(dpath, self.tar_compression)
 
-        _run_command(
-            f"tar {tar_flags} {fpath_tarred} -C {dpath.parent} {dpath.name}",
-            dry_run=self.dry_run,
-        )
+        logger.info(f"Archiving {dpath} to {fpath_tarred}")
+        if self.dry_run:
+            return fpath_tarred
 
-        # make sure that the tarfile was created successfully before removing
-        # original directory
-        if fpath_tarred.exists() and is_tarfile(fpath_tarred):
-            fileops.rm(dpath, dry_run=self.dry_run)
+        # only remove the original directory if the archive was created successfully
+        try:
+            write_tar(dpath, fpath_tarred, compression=self.tar_compression)
+        except (OSError, tarfile.TarError) as exception:
+            logger.error(f"Failed to tar {dpath} to {fpath_tarred}: {exception}")
         else:
-            logger.error(f"Failed to tar {dpath} to {fpath_tarred}")
+            fileops.rm(dpath, dry_run=self.dry_run)
 
         return fpath_tarred
 
@@ -162,6 +184,14 @@ class ProcessingRunner(Runner):
             if participant_session not in participants_sessions_completed:
                 yield participant_session
 
+    def _get_tar_flags(self) -> list[str]:
+        if not self.tar:
+            return []
+        flags = ["--tar"]
+        if self.tar_compression is not None:
+            flags.extend(["--tar-compression", self.tar_compression])
+        return flags
+
     def _generate_cli_command_for_hpc(
         self, participant_id: str | None = None, session_id: str | None = None
     ) -> list[str]:
@@ -169,7 +199,7 @@ class ProcessingRunner(Runner):
         return self.hpc_runner.generate_cli_command(
             participant_id=participant_id,
             session_id=session_id,
-            extra_flags=["--tar"] if self.tar else None,
+            extra_flags=self._get_tar_flags() or None,
         )
 
     def run_setup(self):
@@ -13,11 +13,25 @@ from typing_extensions import override
 from nipoppy.config.boutiques import BoutiquesConfig
 from nipoppy.config.container import ContainerConfig
 from nipoppy.config.hpc import HpcConfig
-from nipoppy.container import ContainerHandler, get_container_handler
+from nipoppy.container import (
+    BareMetalHandler,
+    ContainerHandler,
+    DockerHandler,
+    get_container_handler,
+)
 from nipoppy.env import ContainerCommandEnum, StrOrPathLike
+from nipoppy.exceptions import ContainerError
 from nipoppy.logger import get_logger
-from nipoppy.pipeline_validation import check_pipeline_bundle
-from nipoppy.utils.utils import TEMPLATE_REPLACE_PATTERN, get_pipeline_tag, load_json
+from nipoppy.pipeline_validation import (
+    FNAME_VALIDATION_STAMPS,
+    check_pipeline_bundle_cached,
+)
+from nipoppy.utils.utils import (
+    TEMPLATE_REPLACE_PATTERN,
+    apply_substitutions_to_json,
+    get_pipeline_tag,
+    load_json,
+)
 from nipoppy.workflows.base import _run_command
 from nipoppy.workflows.pipeline import BasePipelineWorkflow
 from nipoppy.workflows.services.boutiques import (
@@ -25,6 +39,7 @@ from nipoppy.workflows.services.boutiques import (
     run_bosh_launch,
     run_bosh_simulate,
 )
+from nipoppy.workflows.services.containers import ContainerInstancePool
 from nipoppy.workflows.services.hpc import HPCRunner
 
 logger = get_logger()
@@ -40,6 +55,7 @@ class Runner(BasePipelineWorkflow, ABC):
         subcommand: str,
         simulate: bool = False,
         keep_workdir: bool = False,
+        persistent_container: bool = False,
         *args,
         **kwargs,
     ):
@@ -47,13 +63,68 @@ class Runner(BasePipelineWorkflow, ABC):
         self.subcommand = subcommand
         self.simulate = simulate
         self.keep_workdir = keep_workdir
+        self.persistent_container = persistent_container
+
+        # compiled container specs, keyed by rendered configs and bind paths
+        self._container_specs: dict[tuple, tuple[str, ContainerHandler]] = {}
 
     def run_setup(self):
         """Run pipeline setup and validate the pipeline bundle."""
         to_return = super().run_setup()
-        check_pipeline_bundle(self.dpath_pipeline_bundle, strict=False)
+        check_pipeline_bundle_cached(
+            self.dpath_pipeline_bundle,
+            self.study.layout.dpath_nipoppy / FNAME_VALIDATION_STAMPS,
+            strict=False,
+        )
         return to_return
 
+    @cached_property
+    def container_instances(self) -> ContainerInstancePool:
+        """Get the pool of persistent container instances."""
+        return ContainerInstancePool(
+            name_prefix=f"nipoppy-{self.pipeline_name}",
+            run_command=_run_command,
+            dry_run=self.dry_run,
+        )
+
+    def _use_container_instance(
+        self, container_handler: ContainerHandler | None
+    ) -> bool:
+        return (
+            self.persistent_container
+            and not self.simulate
+            and container_handler is not None
+            and not isinstance(container_handler, BareMetalHandler)
+        )
+
+    def _get_container_image(
+        self, container_handler: ContainerHandler, descriptor: dict
+    ) -> str:
+        """Get the image to start a persistent container instance from."""
+        if isinstance(container_handler, DockerHandler):
+            image = (descriptor.get("container-image") or {}).get(
+                "image", self.pipeline_config.CONTAINER_INFO.URI
+            )
+            if image is None:
+                raise ContainerError(
+                    "Container image URI must be specified to use a persistent "
+                    "Docker container"
+                )
+            return image
+        return str(self.fpath_container)
+
+    def _get_container_instance_args(
+        self,
+        container_handler: ContainerHandler,
+        descriptor: dict,
+        subcommand: str = "exec",
+    ) -> list[str]:
+        return self.container_instances.get_exec_args(
+            container_handler,
+            self._get_container_image(container_handler, descriptor),
+            subcommand=subcommand,
+        )
+
     @cached_property
     def hpc_runner(self) -> HPCRunner:
         """Get the HPC runner service."""
@@ -175,6 +246,17 @@ class Runner(BasePipelineWorkflow, ABC):
         # process the descriptor if it containers Nipoppy-specific placeholder
         # expressions (legacy behaviour)
         if TEMPLATE_REPLACE_PATTERN.search(self.descriptor["command-line"]):
+            if self._use_container_instance(container_handler):
+                # the container command and image are replaced by the command
+                # for running inside the instance
+                *container_command, kwargs["fpath_container"] = (
+                    self._get_container_instance_args(
+                        container_handler,
+                        self.descriptor,
+                        subcommand=self.boutiques_config.CONTAINER_SUBCOMMAND,
+                    )
+                )
+                kwargs["container_command"] = shlex.join(container_command)
             logger.info("Processing the JSON descriptor")
             descriptor_str = self.process_template_json(
                 self.descriptor,
@@ -203,6 +285,21 @@ class Runner(BasePipelineWorkflow, ABC):
                     descriptor, self.pipeline_config.CONTAINER_INFO.URI
                 )
 
+            if (
+                self._use_container_instance(container_handler)
+                and descriptor.get("container-image") is not None
+            ):
+                # run the command line inside the instance instead of letting
+                # Boutiques start a new container
+                descriptor = copy.deepcopy(descriptor)
+                container_args = self._get_container_instance_args(
+                    container_handler, descriptor
+                )
+                del descriptor["container-image"]
+                descriptor["command-line"] = (
+                    f"{shlex.join(container_args)} {descriptor['command-line']}"
+                )
+
             descriptor_str = json.dumps(descriptor)
             if container_handler is None or descriptor.get("container-image") is None:
                 bosh_exec_launch_args.append("--no-container")
@@ -264,39 +361,51 @@ class Runner(BasePipelineWorkflow, ABC):
 
         return descriptor_str, invocation_str
 
-    def process_container_config(
-        self,
-        participant_id: str,
-        session_id: str,
-        bind_paths: list[StrOrPathLike] | None = None,
-    ) -> tuple[str, ContainerHandler]:
-        """Update container config and generate container command."""
-        if bind_paths is None:
-            bind_paths = []
-
-        # always bind the dataset's root directory
-        bind_paths = [self.study.layout.dpath_root] + bind_paths
+    @cached_property
+    def _container_config_templates(self) -> tuple[str, str]:
+        """Get the container and Boutiques configs as JSON template strings.
 
-        # get and process container config
-        container_config = self.pipeline_step_config.get_container_config()
-        container_config = ContainerConfig(
-            **self.process_template_json(
-                container_config.model_dump(),
-                participant_id=participant_id,
-                session_id=session_id,
+        User-defined substitutions are applied once here, so that only the
+        participant-/session-specific template strings (if any) need to be replaced
+        for each run.
+        """
+        return tuple(
+            json.dumps(
+                apply_substitutions_to_json(
+                    config.model_dump(), self.study.config.SUBSTITUTIONS
+                )
+            )
+            for config in (
+                self.pipeline_step_config.get_container_config(),
+                self.boutiques_config,
             )
         )
-        logger.debug(f"Initial container config: {container_config}")
 
-        # get and process Boutiques config
-        boutiques_config = BoutiquesConfig(
-            **self.process_template_json(
-                self.boutiques_config.model_dump(),
-                participant_id=participant_id,
-                session_id=session_id,
-            )
+    def _render_config_template(
+        self, template_str: str, participant_id: str, session_id: str
+    ) -> str:
+        if TEMPLATE_REPLACE_PATTERN.search(template_str) is None:
+            return template_str
+        return self.process_template_json(
+            json.loads(template_str),
+            participant_id=participant_id,
+            session_id=session_id,
+            return_str=True,
+            with_substitutions=False,
         )
 
+    def _compile_container_spec(
+        self,
+        container_config_str: str,
+        boutiques_config_str: str,
+        bind_paths: list[StrOrPathLike],
+    ) -> tuple[str, ContainerHandler]:
+        """Build the container command and handler from rendered configs."""
+        container_config = ContainerConfig(**json.loads(container_config_str))
+        logger.debug(f"Initial container config: {container_config}")
+
+        boutiques_config = BoutiquesConfig(**json.loads(boutiques_config_str))
+
         # update container config with additional information from Boutiques config
         logger.debug(f"Boutiques config: {boutiques_config}")
         if boutiques_config != BoutiquesConfig():
@@ -312,12 +421,57 @@ class Runner(BasePipelineWorkflow, ABC):
 
         logger.debug(f"Using container handler: {container_handler}")
 
+        # this also resolves and creates the bind paths
         container_command = container_handler.get_shell_command(
             subcommand=boutiques_config.CONTAINER_SUBCOMMAND,
         )
 
         return container_command, container_handler
 
+    def process_container_config(
+        self,
+        participant_id: str,
+        session_id: str,
+        bind_paths: list[StrOrPathLike] | None = None,
+    ) -> tuple[str, ContainerHandler]:
+        """Update container config and generate container command.
+
+        The container command and handler are only built once for each distinct
+        set of rendered configs and bind paths. Runs that only differ in their
+        participant/session ID reuse them unless the configs are templated with
+        participant-/session-specific values.
+        """
+        if bind_paths is None:
+            bind_paths = []
+
+        # always bind the dataset's root directory
+        bind_paths = [self.study.layout.dpath_root] + bind_paths
+
+        container_config_str, boutiques_config_str = (
+            self._render_config_template(template_str, participant_id, session_id)
+            for template_str in self._container_config_templates
+        )
+
+        key = (
+            container_config_str,
+            boutiques_config_str,
+            tuple(str(bind_path) for bind_path in bind_paths),
+            str(Path.cwd()),
+        )
+        if key not in self._container_specs:
+            self._container_specs[key] = self._compile_container_spec(
+                container_config_str, boutiques_config_str, bind_paths
+            )
+        container_command, container_handler = self._container_specs[key]
+
+        return container_command, container_handler.copy()
+
+    def run_cleanup(self):
+        """Stop persistent container instances."""
+        if "container_instances" in self.__dict__:
+            self.container_instances.stop_all()
+        return super().run_cleanup()
+
     @override
     def _handle_execution_strategy(self, participants_sessions):
         """Handle the execution strategy based on the workflow configuration.
@@ -0,0 +1,360 @@
+"""Container services: persistent container instances and image pulls."""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from nipoppy.container import ContainerHandler, DockerHandler, clear_image_inventory
+from nipoppy.container_store import ImageStore
+from nipoppy.exceptions import ContainerError
+from nipoppy.logger import get_logger
+from nipoppy.workflows.base import CommandRunner
+
+logger = get_logger()
+
+
+@dataclass
+class _ContainerInstance:
+    name: str
+    handler: ContainerHandler
+    key: tuple
+
+
+class ContainerInstancePool:
+    """Persistent container instances, with one instance per worker thread.
+
+    Instances are started on first use and reused for all subsequent runs in the same
+    thread. If the container arguments (e.g. bind paths) of a run differ from those
+    of the running instance, the instance is restarted with the new arguments.
+    Environment variables are passed to each command run inside the instance, so
+    changing them does not restart the instance.
+    """
+
+    def __init__(
+        self,
+        name_prefix: str,
+        run_command: CommandRunner,
+        dry_run: bool = False,
+    ):
+        # instance names can only contain alphanumeric characters, "_", "." and "-"
+        self.name_prefix = re.sub(r"[^\w.-]", "_", f"{name_prefix}-{os.getpid()}")
+        self.run_command = run_command
+        self.dry_run = dry_run
+
+        self._instances: dict[int, _ContainerInstance] = {}
+        self._lock = threading.Lock()
+        self._n_started = 0
+
+    def _start(self, handler: ContainerHandler, image: str) -> _ContainerInstance:
+        with self._lock:
+            name = f"{self.name_prefix}-{self._n_started}"
+            self._n_started += 1
+        command = handler.get_instance_start_command(name, image)
+        logger.info(f"Starting persistent container instance {name}")
+        try:
+            self.run_command(command, dry_run=self.dry_run)
+        except subprocess.CalledProcessError as exception:
+            raise ContainerError(
+                f"Failed to start container instance {name} "
+                f"(return code: {exception.returncode})"
+            ) from exception
+        return _ContainerInstance(
+            name=name, handler=handler, key=self._get_key(handler, image)
+        )
+
+    @staticmethod
+    def _get_key(handler: ContainerHandler, image: str) -> tuple:
+        return (tuple(handler.get_instance_start_args()), image)
+
+    def _stop(self, instance: _ContainerInstance):
+        logger.info(f"Stopping persistent container instance {instance.name}")
+        try:
+            self.run_command(
+                instance.handler.get_instance_stop_command(instance.name),
+                dry_run=self.dry_run,
+            )
+        except subprocess.CalledProcessError as exception:
+            logger.warning(
+                f"Failed to stop container instance {instance.name} "
+                f"(return code: {exception.returncode})"
+            )
+
+    def get_exec_args(
+        self, handler: ContainerHandler, image: str, subcommand: str = "exec"
+    ) -> list[str]:
+        """Get the arguments for running a command in the current thread's instance.
+
+        Parameters
+        ----------
+        handler : nipoppy.container.ContainerHandler
+            Container handler with the arguments for the current run.
+        image : str
+            Container image (path to an image file or image name).
+        subcommand : str, optional
+            Container subcommand to use (e.g. "run", "exec"), by default "exec"
+
+        Returns
+        -------
+        list[str]
+            The command arguments, with the reference to the instance as the last
+            element.
+        """
+        thread_id = threading.get_ident()
+        instance = self._instances.get(thread_id)
+
+        # only compare the arguments that are set when starting the instance
+        handler.fix_bind_args()
+        if instance is not None and instance.key != self._get_key(handler, image):
+            logger.debug(
+                f"Container arguments changed, restarting instance {instance.name}"
+            )
+            self._stop(instance)
+            instance = None
+
+        if instance is None:
+            instance = self._start(handler, image)
+            self._instances[thread_id] = instance
+
+        return handler.get_instance_exec_args(instance.name, subcommand=subcommand)
+
+    def stop_all(self):
+        """Stop all running instances."""
+        while self._instances:
+            _, instance = self._instances.popitem()
+            self._stop(instance)
+
+
+class ContainerPullManager:
+    """Pull container images concurrently, with bounded parallelism.
+
+    Each image is pulled while holding a lock for that image. For image files, the
+    lock is a file lock so that processes sharing a container directory (e.g. a
+    container store) never pull the same image twice: the image is checked again
+    once the lock is acquired. Image files are pulled to a temporary file that is
+    then moved to the final path, so incomplete images are never visible to other
+    processes.
+
+    If an image store is given, image files are pulled into the store once per URI
+    and linked to their final path (see :class:`nipoppy.container_store.ImageStore`).
+    If ``verify_images`` is True, the SHA-256 digest of stored images is checked
+    before they are reused, and corrupted images are pulled again. If
+    ``refresh_images`` is True, images are pulled again even if they are already
+    available (in the image store or at their final path), e.g. to update mutable
+    tags. Each image is only pulled once per manager.
+    """
+
+    def __init__(
+        self,
+        run_command: CommandRunner,
+        max_workers: int = 4,
+        dry_run: bool = False,
+        image_store: Optional[ImageStore] = None,
+        verify_images: bool = False,
+        refresh_images: bool = False,
+    ):
+        self.run_command = run_command
+        self.max_workers = max_workers
+        self.dry_run = dry_run
+        self.image_store = image_store
+        self.verify_images = verify_images
+        self.refresh_images = refresh_images
+
+        # keys of the images pulled by this manager
+        self._pulled: set[str] = set()
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _lock_image(
+        self, uri: str, key: str, fpath_lock: Optional[Path]
+    ) -> Iterator[None]:
+        with self._locks_lock:
+            thread_lock = self._locks.setdefault(key, threading.Lock())
+
+        with thread_lock:
+            if fpath_lock is None or self.dry_run:
+                yield
+                return
+
+            fpath_lock.parent.mkdir(parents=True, exist_ok=True)
+            with open(fpath_lock, "a") as file_lock:
+                try:
+                    fcntl.flock(file_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    logger.info(f"Waiting for another process to finish pulling {uri}")
+                    fcntl.flock(file_lock, fcntl.LOCK_EX)
+                # the lock is released when the file is closed
+                yield
+
+    def _run_pull_command(
+        self, handler: ContainerHandler, uri: str, fpath_pull: Optional[Path]
+    ):
+        try:
+            self.run_command(
+                handler.get_pull_command(uri, fpath_pull), dry_run=self.dry_run
+            )
+        except subprocess.CalledProcessError as exception:
+            raise ContainerError(
+                f"Failed to download container {uri}: {exception}"
+            ) from exception
+
+    def _pull_to_store(
+        self,
+        handler: ContainerHandler,
+        uri: str,
+        fpath_container: Path,
+        refresh: bool = False,
+    ) -> bool:
+        if not refresh and self.image_store.has_image(
+            uri, verify_digest=self.verify_images
+        ):
+            logger.info(
+                f"Using stored container image for {uri} "
+                f"({self.image_store.describe_image(uri)}). "
+                "Use --refresh-images to pull it again"
+            )
+            self.image_store.link_image(uri, fpath_container)
+            return False
+
+        fpath_pull = self.image_store.get_fpath_temp(uri)
+        fpath_pull.unlink(missing_ok=True)
+        try:
+            self._run_pull_command(handler, uri, fpath_pull)
+            if fpath_pull.exists():
+                self.image_store.add_image(
+                    uri, fpath_pull, compute_digest=self.verify_images
+                )
+                self.image_store.link_image(uri, fpath_container)
+            else:
+                logger.warning(f"Pulling container {uri} did not create an image file")
+        finally:
+            fpath_pull.unlink(missing_ok=True)
+        return True
+
+    def pull(
+        self,
+        handler: ContainerHandler,
+        uri: str,
+        fpath_container: Optional[Path] = None,
+    ) -> bool:
+        """Pull a container image unless it is already available.
+
+        Parameters
+        ----------
+        handler : nipoppy.container.ContainerHandler
+            Container handler for the container platform to use.
+        uri : str
+            URI of the container image (e.g. docker://...)
+        fpath_container : Optional[Path], optional
+            Path to save the image file at (not used for Docker), by default None
+
+        Returns
+        -------
+        bool
+            True if the image was pulled, False if it was already available
+            (including in the image store).
+
+        Raises
+        ------
+        nipoppy.exceptions.ContainerError
+            If the pull command fails.
+        """
+        if isinstance(handler, DockerHandler):
+            fpath_container = None
+        elif fpath_container is not None:
+            fpath_container = Path(fpath_container)
+
+        use_store = (
+            self.image_store is not None
+            and fpath_container is not None
+            and not self.dry_run
+        )
+        if use_store:
+            key = self.image_store.get_key(uri)
+            fpath_lock = self.image_store.get_fpath_lock(uri)
+        elif fpath_container is not None:
+            key = str(fpath_container.resolve())
+            fpath_lock = fpath_container.with_name(f".{fpath_container.name}.lock")
+        else:
+            key = uri
+            fpath_lock = None
+
+        with self._lock_image(uri, key, fpath_lock):
+            # the image may have been pulled while waiting for the lock
+            clear_image_inventory()
+            refresh = self.refresh_images and key not in self._pulled
+            if not refresh and handler.is_image_downloaded(uri, fpath_container):
+                logger.info(f"Container image {uri} is already available")
+                return False
+
+            try:
+                if use_store:
+                    pulled = self._pull_to_store(
+                        handler, uri, fpath_container, refresh=refresh
+                    )
+                    self._pulled.add(key)
+                    return pulled
+
+                fpath_pull = fpath_container
+                if fpath_container is not None and not self.dry_run:
+                    fpath_pull = fpath_container.with_name(
+                        f".{fpath_container.name}.{os.getpid()}"
+                    )
+                    fpath_pull.unlink(missing_ok=True)
+                try:
+                    self._run_pull_command(handler, uri, fpath_pull)
+                    if fpath_pull != fpath_container and os.path.lexists(fpath_pull):
+                        os.replace(fpath_pull, fpath_container)
+                finally:
+                    if fpath_pull != fpath_container:
+                        fpath_pull.unlink(missing_ok=True)
+                self._pulled.add(key)
+            finally:
+                clear_image_inventory()
+
+        return True
+
+    def pull_all(
+        self,
+        handler: ContainerHandler,
+        images: Sequence[tuple[str, Optional[Path]]],
+    ) -> list[bool]:
+        """Pull several container images concurrently.
+
+        Parameters
+        ----------
+        handler : nipoppy.container.ContainerHandler
+            Container handler for the container platform to use.
+        images : Sequence[tuple[str, Optional[Path]]]
+            URIs and paths of the images to pull, see :meth:`pull`.
+
+        Returns
+        -------
+        list[bool]
+            Whether each image was pulled.
+
+        Raises
+        ------
+        nipoppy.exceptions.ContainerError
+            If any of the pulls fails. The other pulls are completed first.
+        """
+        if len(images) == 0:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(images))
+        ) as executor:
+            futures = [
+                executor.submit(self.pull, handler, uri, fpath_container)
+                for uri, fpath_container in images
+            ]
+        # futures are all done once the executor is shut down
+        return [future.result() for future in futures]
@@ -1,15 +1,15 @@
 """PipelineTracker workflow."""
 
-import tarfile
 from pathlib import Path
 from typing import Iterable, List, Optional, Tuple
 
 from nipoppy.config.pipeline_step import AnalysisLevelType
 from nipoppy.config.tracker import TrackerConfig
-from nipoppy.env import EXT_TAR, StrOrPathLike
+from nipoppy.env import StrOrPathLike
 from nipoppy.exceptions import NipoppyError
 from nipoppy.logger import get_logger
 from nipoppy.tabular.processing_status import ProcessingStatusTable
+from nipoppy.utils.archive import IndexedTar, find_tar
 from nipoppy.workflows.pipeline import BasePipelineWorkflow
 
 logger = get_logger()
@@ -82,14 +82,12 @@ class PipelineTracker(BasePipelineWorkflow):
     ):
         """Check the processing status based on a list of expected paths."""
         # collect list of paths in tarball if it exists
+        # (from its index if available, to avoid reading the whole tarball)
         paths_tarred = []
         if relative_dpath_tarred is not None:
-            fpath_tarball = (
-                self.dpath_pipeline_output / f"{relative_dpath_tarred}{EXT_TAR}"
-            )
-            if fpath_tarball.exists():
-                with tarfile.open(fpath_tarball) as tarball:
-                    paths_tarred = tarball.getnames()
+            fpath_tarball = find_tar(self.dpath_pipeline_output / relative_dpath_tarred)
+            if fpath_tarball is not None:
+                paths_tarred = IndexedTar(fpath_tarball).getnames()
 
         for relative_path in relative_paths:
             relative_path = Path(relative_path)
@@ -1,13 +1,23 @@
 """Client for Zenodo API."""
 
+import asyncio
 import hashlib
+import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Optional, Tuple
+from typing import Any, Awaitable, BinaryIO, Iterable, Mapping, Optional, Tuple
 
 import httpx
 from typing_extensions import Self
 
+# buffer size for reading/writing downloaded files
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# suffix for partially downloaded files
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+
 
 class ChecksumError(Exception): ...  # noqa E701
 
@@ -15,6 +25,139 @@ class ChecksumError(Exception): ...  # noqa E701
 class ZenodoAPIError(Exception): ...  # noqa E701
 
 
+def _get_api_endpoint(sandbox: bool) -> str:
+    return "https://sandbox.zenodo.org/api" if sandbox else "https://zenodo.org/api"
+
+
+def _get_default_logger(logger: logging.Logger | None) -> logging.Logger:
+    if logger is None:
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+def _process_record_id(record_id: str | None) -> str:
+    """Process the record ID to remove the 'zenodo.' prefix if present."""
+    return record_id.removeprefix("zenodo.") if record_id else None
+
+
+def _get_file_checksums(response: httpx.Response, record_id: str) -> dict[str, str]:
+    """Get the MD5 checksum of each file from a record file listing response."""
+    if response.status_code != 200:
+        raise ZenodoAPIError(
+            f"Failed to get files for zenodo.{record_id}: {response.json()}"
+        )
+
+    # Exclude "md5:" prefix
+    return {
+        entry["key"]: entry["checksum"].removeprefix("md5:")
+        for entry in response.json()["entries"]
+    }
+
+
+def _get_partial_md5(fpath_partial: Path):
+    """Get the MD5 hash object of the part of a file that was already downloaded."""
+    md5 = hashlib.md5()
+    with fpath_partial.open("rb") as file_partial:
+        while chunk := file_partial.read(DOWNLOAD_CHUNK_SIZE):
+            md5.update(chunk)
+    return md5
+
+
+class _FileDownload:
+    """State of a resumable file download, shared by the sync and async clients.
+
+    See :meth:`ZenodoAPI._download_file`.
+    """
+
+    def __init__(
+        self, fpath: Path, checksum: str, record_id: str, logger: logging.Logger
+    ):
+        self.fpath = fpath
+        self.fpath_partial = fpath.with_name(f".{fpath.name}{PARTIAL_DOWNLOAD_SUFFIX}")
+        self.checksum = checksum
+        self.record_id = record_id
+        self.logger = logger
+        self.n_bytes_done = 0
+        self.md5 = None
+
+    def _get_error(self, details: Any = None) -> ZenodoAPIError:
+        message = f"Failed to download file for zenodo.{self.record_id}: "
+        message += self.fpath.name
+        if details is not None:
+            message += f"\n{details}"
+        return ZenodoAPIError(message)
+
+    def get_headers(self) -> dict[str, str]:
+        """Get the request headers for the next attempt."""
+        self.n_bytes_done = (
+            self.fpath_partial.stat().st_size if self.fpath_partial.exists() else 0
+        )
+        return {"Range": f"bytes={self.n_bytes_done}-"} if self.n_bytes_done else {}
+
+    def open(self, response: httpx.Response) -> Optional[BinaryIO]:
+        """Open the temporary file to write the content of a response to.
+
+        Returns None if the download should be restarted. The content of error
+        responses must have been read before calling this method.
+        """
+        if response.status_code == 206:
+            mode = "ab"
+            self.md5 = _get_partial_md5(self.fpath_partial)
+        elif response.status_code == 200:
+            # server ignored the range request: start over
+            mode = "wb"
+            self.md5 = hashlib.md5()
+        elif response.status_code == 416 and self.n_bytes_done:
+            # invalid range (e.g. file changed on server): start over
+            self.fpath_partial.unlink()
+            return None
+        else:
+            raise self._get_error(response.json())
+
+        # write data as it is received, so that it is kept on errors
+        return self.fpath_partial.open(mode, buffering=DOWNLOAD_CHUNK_SIZE)
+
+    def write(self, file_partial: BinaryIO, chunk: bytes):
+        """Write a chunk of the response content."""
+        file_partial.write(chunk)
+        self.md5.update(chunk)
+
+    def retry(self, exception: httpx.TransportError, is_last_attempt: bool):
+        """Handle a network error, raising it if there are no attempts left."""
+        if is_last_attempt:
+            raise self._get_error(exception) from exception
+        self.logger.debug(f"Error downloading {self.fpath.name}, retrying: {exception}")
+
+    def fail(self):
+        """Raise an error when all attempts were restarted."""
+        raise self._get_error()
+
+    def finalize(self):
+        """Verify the checksum of the file and move it to its final location."""
+        content_md5 = self.md5.hexdigest()
+        if content_md5 != self.checksum:
+            self.fpath_partial.unlink()
+            raise ChecksumError(
+                f"Checksum mismatch: '{self.fpath.name}' has invalid checksum "
+                f"{content_md5} (expected: {self.checksum})"
+            )
+
+        os.replace(self.fpath_partial, self.fpath)
+
+
+async def _gather_or_cancel(awaitables: Iterable[Awaitable]) -> list:
+    """Run awaitables concurrently, cancelling the remaining ones on error."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 class ZenodoAPI:
     """Client to interact with Zenodo API.
 
@@ -25,6 +168,12 @@ class ZenodoAPI:
     HTTP communication. It supports use as a context manager (``with``
     statement) for automatic resource cleanup, and exposes an explicit
     :meth:`close` method for manual cleanup.
+
+    If ``cache_dir`` is set, responses to requests for public record information
+    (searches, record metadata and file lists) are cached on disk. Cached responses
+    are reused without contacting Zenodo for ``cache_ttl`` seconds, then revalidated
+    with conditional requests (``ETag``/``Last-Modified``). If Zenodo cannot be
+    reached, cached responses are reused regardless of their age.
     """
 
     def __init__(
@@ -33,13 +182,15 @@ class ZenodoAPI:
         password_file: Optional[Path] = None,
         logger: Optional[logging.Logger] = None,
         timeout: float = 10.0,
+        cache_dir: Optional[Path] = None,
+        cache_ttl: float = 300.0,
     ):
         self.sandbox = sandbox
-        self.api_endpoint = (
-            "https://sandbox.zenodo.org/api" if sandbox else "https://zenodo.org/api"
-        )
+        self.api_endpoint = _get_api_endpoint(sandbox)
         self.timeout = timeout
         self.logger = logger
+        self.cache_dir = None if cache_dir is None else Path(cache_dir).expanduser()
+        self.cache_ttl = cache_ttl
 
         # Access token is required for uploading files
         self.password_file = password_file
@@ -75,24 +226,164 @@ class ZenodoAPI:
     @logger.setter
     def logger(self, logger: logging.Logger | None):
         """Set the logger for the ZenodoAPI instance."""
-        if logger is None:
-            logger = logging.getLogger(__name__)
-            logger.setLevel(logging.INFO)
-        self._logger = logger
+        self._logger = _get_default_logger(logger)
+
+    def _load_cache_entry(self, fpath_entry: Path) -> Optional[dict]:
+        try:
+            entry = json.loads(fpath_entry.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exception:
+            self.logger.debug(f"Ignoring invalid cache file {fpath_entry}: {exception}")
+            return None
+
+        # e.g. entries written by another version of Nipoppy
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get("timestamp"), (int, float))
+            and not isinstance(entry["timestamp"], bool)
+            and isinstance(entry.get("content"), str)
+            and all(
+                isinstance(entry.get(key), (str, type(None)))
+                for key in ("etag", "last_modified")
+            )
+        ):
+            self.logger.debug(f"Ignoring cache file with invalid format: {fpath_entry}")
+            return None
+        return entry
+
+    def _save_cache_entry(self, fpath_entry: Path, entry: dict):
+        fpath_tmp = fpath_entry.with_name(f".{fpath_entry.name}.{os.getpid()}")
+        try:
+            fpath_entry.parent.mkdir(parents=True, exist_ok=True)
+            fpath_tmp.write_text(json.dumps(entry))
+            os.replace(fpath_tmp, fpath_entry)
+        except OSError as exception:
+            self.logger.debug(f"Could not write cache file {fpath_entry}: {exception}")
+        finally:
+            fpath_tmp.unlink(missing_ok=True)
+
+    def _get_cached(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """Send a GET request, using the on-disk cache if enabled."""
+        if self.cache_dir is None:
+            return self.client.get(url, params=params)
+
+        request = self.client.build_request("GET", url, params=params)
+        fpath_entry = (
+            self.cache_dir
+            / f"{hashlib.sha256(str(request.url).encode()).hexdigest()}.json"
+        )
+        entry = self._load_cache_entry(fpath_entry)
+
+        def _from_cache() -> httpx.Response:
+            return httpx.Response(
+                200,
+                content=entry["content"].encode(),
+                headers={"Content-Type": "application/json"},
+                request=request,
+            )
+
+        if entry is not None and time.time() - entry["timestamp"] < self.cache_ttl:
+            self.logger.debug(f"Using cached response for {request.url}")
+            return _from_cache()
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.client.get(url, params=params, headers=headers)
+        except httpx.TransportError as exception:
+            if entry is None:
+                raise
+            cache_time = time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(entry["timestamp"])
+            )
+            self.logger.warning(
+                f"Could not connect to Zenodo ({exception}), using cached response "
+                f"from {cache_time}"
+            )
+            return _from_cache()
+
+        if response.status_code == 304 and entry is not None:
+            self.logger.debug(f"Cached response for {request.url} is still valid")
+            entry["timestamp"] = time.time()
+            self._save_cache_entry(fpath_entry, entry)
+            return _from_cache()
+
+        if response.status_code == 200:
+            self._save_cache_entry(
+                fpath_entry,
+                {
+                    "url": str(request.url),
+                    "timestamp": time.time(),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "content": response.text,
+                },
+            )
+        return response
 
     def _process_record_id(self, record_id: str | None) -> str:
         """Process the record ID to remove the 'zenodo.' prefix if present."""
-        return record_id.removeprefix("zenodo.") if record_id else None
+        return _process_record_id(record_id)
 
-    def download_record_files(self, record_id: str, output_dir: Path):
+    def _download_file(
+        self,
+        url: str,
+        fpath: Path,
+        checksum: str,
+        record_id: str,
+        n_retries: int = 2,
+    ):
+        """Download a file by streaming it to disk, and verify its MD5 checksum.
+
+        The file is first written to a temporary file next to ``fpath``, which is
+        renamed once the checksum (computed while downloading) is verified. If the
+        temporary file already exists (e.g. from an interrupted download, or after a
+        network error), the download is resumed with an HTTP range request when the
+        server supports it.
+        """
+        download = _FileDownload(fpath, checksum, record_id, self.logger)
+
+        for i_attempt in range(n_retries + 1):
+            try:
+                with self.client.stream(
+                    "GET", url, headers=download.get_headers()
+                ) as response:
+                    if response.status_code not in (200, 206):
+                        response.read()
+                    file_partial = download.open(response)
+                    if file_partial is None:
+                        continue
+                    with file_partial:
+                        for chunk in response.iter_bytes():
+                            download.write(file_partial, chunk)
+                break
+            except httpx.TransportError as exception:
+                download.retry(exception, is_last_attempt=i_attempt == n_retries)
+        else:
+            download.fail()
+
+        # checksum verification before the file is moved to its final location
+        download.finalize()
+
+    def download_record_files(self, record_id: str, output_dir: Path, n_jobs: int = 4):
         """Download the files of a Zenodo record in the `output_dir` directory.
 
+        Files are streamed to disk in chunks, and interrupted downloads are resumed.
+
         Parameters
         ----------
         record_id : str
             Record ID in Zenodo.
         output_dir : Path
             Output directory to save the files.
+        n_jobs : int, optional
+            Maximum number of files to download at the same time, by default 4.
 
         Raises
         ------
@@ -102,34 +393,57 @@ class ZenodoAPI:
         record_id = self._process_record_id(record_id)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        response = self.client.get(f"/records/{record_id}/files")
-        if response.status_code != 200:
-            raise ZenodoAPIError(
-                f"Failed to get files for zenodo.{record_id}: {response.json()}"
-            )
-
-        # Exclude "md5:" prefix
-        files = {
-            entry["key"]: entry["checksum"].removeprefix("md5:")
-            for entry in response.json()["entries"]
-        }
-        for file, checksum in files.items():
-            response = self.client.get(f"/records/{record_id}/files/{file}/content")
-            if response.status_code != 200:
-                raise ZenodoAPIError(
-                    f"Failed to download file for zenodo.{record_id}: {file}"
-                    f"\n{response.json()}"
+        files = _get_file_checksums(
+            self._get_cached(f"/records/{record_id}/files"), record_id
+        )
+        if not files:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(files))) as executor:
+            futures = [
+                executor.submit(
+                    self._download_file,
+                    f"/records/{record_id}/files/{file}/content",
+                    output_dir / file,
+                    checksum,
+                    record_id,
                 )
+                for file, checksum in files.items()
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def download_records(
+        self, output_dirs: Mapping[str, Path], max_concurrency: int = 8
+    ):
+        """Download the files of several Zenodo records concurrently.
 
-            # Checksum verification before writing to disk
-            content_md5 = hashlib.md5(response.content).hexdigest()
-            if content_md5 != checksum:
-                raise ChecksumError(
-                    f"Checksum mismatch: '{file}' has invalid checksum {content_md5}"
-                    f" (expected: {checksum})"
-                )
+        This uses an :class:`AsyncZenodoAPI` client with the same settings.
 
-            output_dir.joinpath(file).write_bytes(response.content)
+        Parameters
+        ----------
+        output_dirs : Mapping[str, Path]
+            Mapping from record IDs to the directories to save their files in.
+        max_concurrency : int, optional
+            Maximum number of concurrent requests, by default 8.
+        """
+
+        async def _download_records():
+            async with AsyncZenodoAPI(
+                sandbox=self.sandbox,
+                password_file=self.password_file,
+                logger=self.logger,
+                timeout=self.timeout,
+                max_concurrency=max_concurrency,
+            ) as async_zenodo_api:
+                await async_zenodo_api.download_records(output_dirs)
+
+        asyncio.run(_download_records())
 
     def _update_metadata(self, record_id: str, metadata: dict):
         response = self.client.put(
@@ -333,10 +647,16 @@ class ZenodoAPI:
         community_id: Optional[str] = None,
         keywords: Optional[list[str]] = None,
         size: int = 10,
+        page: int = 1,
     ):
-        """Search for records in Zenodo."""
+        """Search for records in Zenodo.
+
+        Use ``page`` to get results beyond the first ``size`` records.
+        """
         if size < 1:
             raise ValueError(f"size must be greater than 0, got {size}.")
+        if page < 1:
+            raise ValueError(f"page must be greater than 0, got {page}.")
 
         if keywords is None:
             keywords = []
@@ -354,14 +674,14 @@ class ZenodoAPI:
         self.logger.debug(f'Using Zenodo query string: "{full_query}"')
 
         api_endpoint = self._get_api_endpoint(community_id)
-        response = self.client.get(
-            api_endpoint,
-            params={
-                "q": full_query,
-                "size": size,
-                "sort": sort,
-            },
-        )
+        params = {
+            "q": full_query,
+            "size": size,
+            "sort": sort,
+        }
+        if page > 1:
+            params["page"] = page
+        response = self._get_cached(api_endpoint, params=params)
         try:
             response.raise_for_status()
         except httpx.HTTPError as e:
@@ -381,9 +701,7 @@ class ZenodoAPI:
     def get_record_metadata(self, record_id: str):
         """Get the metadata of a Zenodo record."""
         record_id = self._process_record_id(record_id)
-        response = self.client.get(
-            f"{self.api_endpoint}/records/{record_id}",
-        )
+        response = self._get_cached(f"{self.api_endpoint}/records/{record_id}")
         if response.status_code != 200:
             raise ZenodoAPIError(
                 f"Failed to get metadata for zenodo.{record_id}: {response.json()}"
@@ -416,3 +734,163 @@ class ZenodoAPI:
             )
 
         return str(response.json()["id"])
+
+
+class AsyncZenodoAPI:
+    """Asynchronous client for reading records from the Zenodo API.
+
+    This is a counterpart of :class:`ZenodoAPI` for batch operations on many
+    records (e.g. fetching metadata or downloading files for several records at
+    once). It manages a persistent :class:`httpx.AsyncClient` with a pool of
+    connections, and at most ``max_concurrency`` requests are sent at the same time.
+    It supports use as an asynchronous context manager (``async with`` statement).
+
+    Instances should only be used within a single event loop.
+    """
+
+    def __init__(
+        self,
+        sandbox: bool = False,
+        password_file: Optional[Path] = None,
+        logger: Optional[logging.Logger] = None,
+        timeout: float = 10.0,
+        max_concurrency: int = 8,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be at least 1, got {max_concurrency}"
+            )
+
+        self.sandbox = sandbox
+        self.api_endpoint = _get_api_endpoint(sandbox)
+        self.timeout = timeout
+        self.logger = _get_default_logger(logger)
+        self.max_concurrency = max_concurrency
+        self.password_file = password_file
+
+        self.client = httpx.AsyncClient(
+            base_url=self.api_endpoint,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        if self.password_file is not None:
+            access_token = self.password_file.read_text().strip()
+            self.client.headers.update({"Authorization": f"Bearer {access_token}"})
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and release connections."""
+        await self.client.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def _get(self, url: str) -> httpx.Response:
+        async with self._semaphore:
+            return await self.client.get(url)
+
+    async def get_record_metadata(self, record_id: str) -> dict:
+        """Get the metadata of a Zenodo record."""
+        record_id = _process_record_id(record_id)
+        response = await self._get(f"/records/{record_id}")
+        if response.status_code != 200:
+            raise ZenodoAPIError(
+                f"Failed to get metadata for zenodo.{record_id}: {response.json()}"
+            )
+
+        return response.json()["metadata"]
+
+    async def get_records_metadata(self, record_ids: Iterable[str]) -> list[dict]:
+        """Get the metadata of several Zenodo records, in the same order."""
+        return await _gather_or_cancel(
+            self.get_record_metadata(record_id) for record_id in record_ids
+        )
+
+    async def _download_file(
+        self,
+        url: str,
+        fpath: Path,
+        checksum: str,
+        record_id: str,
+        n_retries: int = 2,
+    ):
+        """Download a file by streaming it to disk, and verify its MD5 checksum.
+
+        See :meth:`ZenodoAPI._download_file`.
+        """
+        download = _FileDownload(fpath, checksum, record_id, self.logger)
+
+        for i_attempt in range(n_retries + 1):
+            try:
+                async with (
+                    self._semaphore,
+                    self.client.stream(
+                        "GET", url, headers=download.get_headers()
+                    ) as response,
+                ):
+                    if response.status_code not in (200, 206):
+                        await response.aread()
+                    file_partial = download.open(response)
+                    if file_partial is None:
+                        continue
+                    with file_partial:
+                        async for chunk in response.aiter_bytes():
+                            download.write(file_partial, chunk)
+                break
+            except httpx.TransportError as exception:
+                download.retry(exception, is_last_attempt=i_attempt == n_retries)
+        else:
+            download.fail()
+
+        download.finalize()
+
+    async def download_record_files(self, record_id: str, output_dir: Path):
+        """Download the files of a Zenodo record in the `output_dir` directory.
+
+        Parameters
+        ----------
+        record_id : str
+            Record ID in Zenodo.
+        output_dir : Path
+            Output directory to save the files.
+
+        Raises
+        ------
+        ChecksumError
+            Checksum mismatch between the downloaded file and the expected checksum.
+        """
+        record_id = _process_record_id(record_id)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        files = _get_file_checksums(
+            await self._get(f"/records/{record_id}/files"), record_id
+        )
+        await _gather_or_cancel(
+            self._download_file(
+                f"/records/{record_id}/files/{file}/content",
+                output_dir / file,
+                checksum,
+                record_id,
+            )
+            for file, checksum in files.items()
+        )
+
+    async def download_records(self, output_dirs: Mapping[str, Path]):
+        """Download the files of several Zenodo records concurrently.
+
+        Parameters
+        ----------
+        output_dirs : Mapping[str, Path]
+            Mapping from record IDs to the directories to save their files in.
+        """
+        await _gather_or_cancel(
+            self.download_record_files(record_id, output_dir)
+            for record_id, output_dir in output_dirs.items()
+        )
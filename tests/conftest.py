@@ -16,6 +16,7 @@ from fids.fids import create_fake_bids_dataset
 
 from nipoppy.config.main import Config
 from nipoppy.config.schema import get_current_schema_version
+from nipoppy.container import clear_image_inventory
 from nipoppy.env import (
     NIPOPPY_DIR_NAME,
     ConfigType,
@@ -80,6 +81,12 @@ ATTR_TO_FPATH_MAP = {
 MOCKED_DATETIME = datetime.datetime(2024, 4, 4, 12, 34, 56, 789000)
 
 
+@pytest.fixture(autouse=True)
+def clear_container_image_inventory():
+    """Do not reuse cached container image checks across tests."""
+    clear_image_inventory()
+
+
 @pytest.fixture()
 def logger() -> Generator[NipoppyLogger]:
     """Fixture for NipoppyLogger instance."""
@@ -318,6 +318,29 @@ def test_generate_missing_paths(tmp_path: Path):
     assert table[CurationStatusTable.col_in_bids].all()
 
 
+def test_generate_session_archive(tmp_path: Path):
+    manifest = prepare_dataset(participants_and_sessions_manifest={"01": ["BL"]})
+    dpath_downloaded = tmp_path / "downloaded"
+    fpath_archive = dpath_downloaded / "01" / "BL.zip"
+    fpath_archive.parent.mkdir(parents=True)
+    fpath_archive.touch()
+
+    table = generate_curation_status_table(
+        manifest=manifest,
+        dicom_dir_map=DicomDirMap(
+            data={
+                DicomDirMap.col_participant_id: ["01"],
+                DicomDirMap.col_session_id: ["BL"],
+                DicomDirMap.col_participant_dicom_dir: ["01/BL.zip"],
+            }
+        ),
+        dpath_downloaded=dpath_downloaded,
+    )
+
+    # only counted as downloaded by the reorg workflow with --extract-archives
+    assert not table[CurationStatusTable.col_in_pre_reorg].any()
+
+
 def test_curation_status_table_generation_no_session(
     tmp_path: Path,
 ):
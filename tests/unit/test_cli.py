@@ -61,6 +61,10 @@ COMMAND_WORKFLOW_MAP = {
         "nipoppy.workflows.pipeline_store.upload",
         "PipelineUploadWorkflow",
     ),
+    "pipeline sync": (
+        "nipoppy.workflows.pipeline_store.sync",
+        "PipelineSyncWorkflow",
+    ),
 }
 
 DEFAULT_VALUE_DUMMY_CLI = "default"
@@ -103,6 +107,17 @@ def test_cli_invalid(args):
     ), f"Expected invalid command exit code for: {args}\n{result.output}"
 
 
+@pytest.mark.parametrize("n_jobs", ["0", "-1"])
+@pytest.mark.parametrize(
+    "command",
+    [["reorg", "--dataset", "my_dataset"], ["init", "--dataset", "my_dataset"]],
+)
+def test_cli_invalid_n_jobs(command: list[str], n_jobs: str):
+    result = runner.invoke(cli, command + ["--n-jobs", n_jobs])
+    assert result.exit_code == ReturnCode.INVALID_COMMAND, result.output
+    assert "--n-jobs" in result.output
+
+
 @pytest.mark.parametrize(
     "command,workflow,expected_warning",
     [
@@ -285,6 +300,18 @@ def test_cli_gui_visibility(monkeypatch, trogon_installed):
             ],
             "nipoppy.workflows.pipeline_store.search.PipelineSearchWorkflow",
         ),
+        (
+            ["pipeline", "search", "mriqc", "--no-cache"],
+            "nipoppy.workflows.pipeline_store.search.PipelineSearchWorkflow",
+        ),
+        (
+            ["pipeline", "search", "mriqc", "--live"],
+            "nipoppy.workflows.pipeline_store.search.PipelineSearchWorkflow",
+        ),
+        (
+            ["pipeline", "sync"],
+            "nipoppy.workflows.pipeline_store.sync.PipelineSyncWorkflow",
+        ),
         (
             [
                 "pipeline",
@@ -317,6 +344,17 @@ def test_cli_gui_visibility(monkeypatch, trogon_installed):
             ],
             "nipoppy.workflows.pipeline_store.install.PipelineInstallWorkflow",
         ),
+        (
+            [
+                "pipeline",
+                "install",
+                "--dataset",
+                "[mocked_dir]",
+                "zenodo.123456",
+                "654321",
+            ],
+            "nipoppy.workflows.pipeline_store.install.PipelineInstallWorkflow",
+        ),
         (
             [
                 "pipeline",
@@ -568,6 +606,8 @@ def test_cli_params_match_workflows(command_name):
     ignored_params = {
         "name",  # not exposed to CLI
         "zenodo_api",  # instantiated by the CLI from other params
+        "catalog",  # instantiated by the CLI from other params
+        "update_catalog",  # set from --no-cache
         "dpath_pipeline",  # positional arg in CLI
     }
 
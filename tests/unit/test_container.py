@@ -14,6 +14,7 @@ from nipoppy.container import (
     ContainerHandler,
     DockerHandler,
     SingularityHandler,
+    clear_image_inventory,
     get_container_handler,
 )
 from nipoppy.exceptions import ContainerError
@@ -197,9 +198,54 @@ def test_fix_bind_args_error(handler: ContainerHandler):
         handler.fix_bind_args()
 
 
+def test_fix_bind_args_skip_checked(
+    handler: ContainerHandler, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    handler.args = ["-B", str(tmp_path / "dir1")]
+    handler.fix_bind_args()
+
+    mocked_mkdir = mocker.patch("pathlib.Path.mkdir")
+    handler.add_bind_arg(tmp_path / "dir2")
+    handler.fix_bind_args()
+
+    # only the new bind path is checked
+    mocked_mkdir.assert_called_once()
+    assert handler.args == [
+        "-B",
+        str(tmp_path / "dir1"),
+        "-B",
+        f"{tmp_path / 'dir2'}:{tmp_path / 'dir2'}:rw",
+    ]
+
+
+def test_fix_bind_args_args_replaced(handler: ContainerHandler, tmp_path: Path):
+    handler.args = ["-B", str(tmp_path / "dir1")]
+    handler.fix_bind_args()
+
+    handler.args = ["-B", str(tmp_path / "dir2")]
+    handler.fix_bind_args()
+
+    assert (tmp_path / "dir2").exists()
+
+
+def test_copy(handler: ContainerHandler):
+    handler.add_env_arg("VAR1", "1")
+    handler.fix_bind_args()
+
+    handler_copy = handler.copy()
+    assert isinstance(handler_copy, _TestHandler)
+    assert handler_copy.args == handler.args
+    assert handler_copy.env_args == handler.env_args
+
+    handler_copy.add_env_arg("VAR2", "2")
+    assert handler.args == ["--env", "VAR1=1"]
+    assert handler.env_args == ["--env", "VAR1=1"]
+
+
 def test_add_env_arg(handler: ContainerHandler):
     handler.add_env_arg("VAR1", "1")
     assert handler.args == ["--env", "VAR1=1"]
+    assert handler.env_args == ["--env", "VAR1=1"]
 
 
 @pytest.mark.parametrize(
@@ -236,6 +282,84 @@ def test_get_shell_command(
     mocked_check_command_exists.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    "handler,image,expected_start,expected_exec,expected_stop",
+    [
+        (
+            ApptainerHandler(args=["--cleanenv"]),
+            "image.sif",
+            "apptainer instance start --cleanenv image.sif instance1",
+            ["apptainer", "run", "--env", "VAR1=1", "instance://instance1"],
+            "apptainer instance stop instance1",
+        ),
+        (
+            SingularityHandler(),
+            "image.sif",
+            "singularity instance start image.sif instance1",
+            ["singularity", "run", "--env", "VAR1=1", "instance://instance1"],
+            "singularity instance stop instance1",
+        ),
+        (
+            DockerHandler(args=["--volume", "/:/container/path:ro"]),
+            "docker://dummy/image:1.0",
+            (
+                "docker run --detach --rm --name instance1 --volume "
+                "/:/container/path:ro --entrypoint sleep "
+                "dummy/image:1.0 infinity"
+            ),
+            ["docker", "exec", "--env", "VAR1=1", "instance1"],
+            "docker rm --force instance1",
+        ),
+    ],
+)
+def test_instance_commands(
+    handler: ContainerHandler,
+    image: str,
+    expected_start: str,
+    expected_exec: list[str],
+    expected_stop: str,
+    mocker: pytest_mock.MockerFixture,
+):
+    mocker.patch.object(handler, "check_command_exists")
+    handler.add_env_arg("VAR1", "1")
+
+    assert handler.get_instance_start_command("instance1", image) == expected_start
+    assert handler.get_instance_exec_args("instance1", subcommand="run") == (
+        expected_exec
+    )
+    assert handler.get_instance_stop_command("instance1") == expected_stop
+
+
+def test_get_instance_start_args():
+    handler = ApptainerHandler(args=["--env", "VAR0=0", "--cleanenv"])
+    handler.add_env_arg("VAR1", "1")
+    handler.add_bind_arg("/")
+    handler.add_env_arg("VAR0", "0")
+
+    # environment variables from the container config are kept
+    assert handler.get_instance_start_args() == [
+        "--env",
+        "VAR0=0",
+        "--cleanenv",
+        "--bind",
+        "/:/:rw",
+    ]
+    assert handler.env_args == ["--env", "VAR1=1", "--env", "VAR0=0"]
+
+
+@pytest.mark.parametrize(
+    "method,args",
+    [
+        ("get_instance_start_command", ["instance1", "image.sif"]),
+        ("get_instance_exec_args", ["instance1"]),
+        ("get_instance_stop_command", ["instance1"]),
+    ],
+)
+def test_instance_commands_baremetal(method: str, args: list):
+    with pytest.raises(NotImplementedError, match="does not support persistent"):
+        getattr(BareMetalHandler(), method)(*args)
+
+
 @pytest.mark.parametrize(
     "uri,fname_container,exists",
     [
@@ -299,6 +423,54 @@ def test_is_image_downloaded_docker(
     assert handler.is_image_downloaded(uri, "not_used") == exists
 
 
+def test_is_image_downloaded_cached(tmp_path: Path):
+    handler = ApptainerHandler()
+    fpath_container = tmp_path / "image.sif"
+
+    assert not handler.is_image_downloaded(None, fpath_container)
+    fpath_container.touch()
+    assert not handler.is_image_downloaded(None, fpath_container)
+
+    clear_image_inventory()
+    assert handler.is_image_downloaded(None, fpath_container)
+
+
+def test_is_image_downloaded_dangling_symlink(tmp_path: Path):
+    fpath_container = tmp_path / "image.sif"
+    fpath_container.symlink_to(tmp_path / "missing.sif")
+    assert not ApptainerHandler().is_image_downloaded(None, fpath_container)
+
+
+@pytest.mark.parametrize(
+    "uri,exists",
+    [
+        ("docker://test/image1:1.0.0", True),
+        ("test/image2", True),
+        ("test/image2:1.0.0", False),
+    ],
+)
+def test_is_image_downloaded_docker_listing(
+    uri, exists, mocker: pytest_mock.MockerFixture
+):
+    handler = DockerHandler()
+
+    def mock_run(cmd, *args, **kwargs):
+        if cmd[1] == "images":
+            return mocker.MagicMock(
+                returncode=0, stdout="test/image1:1.0.0\ntest/image2:latest\n"
+            )
+        return mocker.MagicMock(returncode=1)
+
+    mocked_run = mocker.patch("nipoppy.container.subprocess.run", side_effect=mock_run)
+
+    for _ in range(2):
+        assert handler.is_image_downloaded(uri, None) == exists
+
+    # listing is only done once, images not in the listing are inspected once
+    assert mocked_run.call_count == (1 if exists else 2)
+    assert mocked_run.call_args_list[0][0][0][:2] == ["docker", "images"]
+
+
 def test_is_image_downloaded_docker_error():
     handler = DockerHandler()
 
@@ -0,0 +1,153 @@
+"""Tests for the container image store."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+import pytest_mock
+
+from nipoppy.container_store import ImageStore
+
+URI = "docker://test/image:1.0.0"
+
+
+@pytest.fixture
+def image_store(tmp_path: Path) -> ImageStore:
+    return ImageStore(tmp_path / "store")
+
+
+def _add_image(
+    image_store: ImageStore, content: str = "image", compute_digest: bool = True
+) -> Path:
+    image_store.dpath.mkdir(parents=True, exist_ok=True)
+    fpath_pulled = image_store.get_fpath_temp(URI)
+    fpath_pulled.write_text(content)
+    return image_store.add_image(URI, fpath_pulled, compute_digest=compute_digest)
+
+
+def test_get_key(image_store: ImageStore):
+    assert image_store.get_key(URI) == image_store.get_key(f" {URI}\n")
+    assert image_store.get_key(URI) != image_store.get_key("docker://test/image:2")
+    assert image_store.get_fpath_image(URI).parent == image_store.dpath
+
+
+@pytest.mark.parametrize(
+    "compute_digest,digest",
+    [
+        (True, "6105d6cc76af400325e94d588ce511be5bfdbb73b437dc51eca43917d7a43e3d"),
+        (False, None),
+    ],
+)
+def test_add_image(image_store: ImageStore, compute_digest: bool, digest):
+    fpath_pulled = image_store.get_fpath_temp(URI)
+
+    fpath_image = _add_image(image_store, compute_digest=compute_digest)
+
+    assert fpath_image == image_store.get_fpath_image(URI)
+    assert fpath_image.read_text() == "image"
+    assert not fpath_pulled.exists()
+    assert json.loads(image_store.get_fpath_metadata(URI).read_text()) == {
+        "uri": URI,
+        "size": 5,
+        "sha256": digest,
+    }
+    assert image_store.has_image(URI, verify_digest=True)
+
+
+def test_has_image_records_digest(image_store: ImageStore):
+    _add_image(image_store, compute_digest=False)
+
+    assert image_store.has_image(URI, verify_digest=True)
+    metadata = json.loads(image_store.get_fpath_metadata(URI).read_text())
+    assert metadata["sha256"] == (
+        "6105d6cc76af400325e94d588ce511be5bfdbb73b437dc51eca43917d7a43e3d"
+    )
+
+    # the recorded digest is used for later checks
+    image_store.get_fpath_image(URI).write_text("IMAGE")
+    assert not image_store.has_image(URI, verify_digest=True)
+
+
+def test_has_image_missing(image_store: ImageStore):
+    assert not image_store.has_image(URI)
+
+    # metadata without image
+    _add_image(image_store)
+    image_store.get_fpath_image(URI).unlink()
+    assert not image_store.has_image(URI)
+
+
+def test_has_image_invalid_metadata(image_store: ImageStore):
+    _add_image(image_store)
+    image_store.get_fpath_metadata(URI).write_text("{")
+    assert not image_store.has_image(URI)
+
+
+@pytest.mark.no_xdist
+@pytest.mark.parametrize(
+    "new_content,verify_digest,expected",
+    [
+        ("truncated", False, False),
+        ("IMAGE", False, True),
+        ("IMAGE", True, False),
+    ],
+)
+def test_has_image_corrupted(
+    image_store: ImageStore,
+    new_content: str,
+    verify_digest: bool,
+    expected: bool,
+    caplog: pytest.LogCaptureFixture,
+):
+    _add_image(image_store)
+    image_store.get_fpath_image(URI).write_text(new_content)
+
+    assert image_store.has_image(URI, verify_digest=verify_digest) == expected
+    assert ("Ignoring corrupted image" in caplog.text) != expected
+
+
+@pytest.mark.parametrize("compute_digest", [True, False])
+def test_describe_image(image_store: ImageStore, compute_digest: bool):
+    _add_image(image_store, compute_digest=compute_digest)
+    fpath_image = image_store.get_fpath_image(URI)
+    os.utime(fpath_image, (time.time() - 3600, time.time() - 3600))
+
+    description = image_store.describe_image(URI)
+    assert description.startswith("age: 1:00:0")
+    if compute_digest:
+        assert description.endswith(
+            "SHA-256: 6105d6cc76af400325e94d588ce511be5bfdbb73b437dc51eca43917d7a43e3d"
+        )
+    else:
+        assert description.endswith("SHA-256: not computed")
+
+
+def test_link_image(image_store: ImageStore, tmp_path: Path):
+    fpath_image = _add_image(image_store)
+    fpath_target = tmp_path / "dataset" / "containers" / "image.sif"
+
+    image_store.link_image(URI, fpath_target)
+    assert fpath_target.samefile(fpath_image)
+    assert not fpath_target.is_symlink()
+
+    # replace existing file
+    fpath_target.unlink()
+    fpath_target.write_text("other")
+    image_store.link_image(URI, fpath_target)
+    assert fpath_target.samefile(fpath_image)
+    assert os.listdir(fpath_target.parent) == ["image.sif"]
+
+
+def test_link_image_symlink(
+    image_store: ImageStore, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    fpath_image = _add_image(image_store)
+    fpath_target = tmp_path / "image.sif"
+    mocker.patch("nipoppy.container_store.os.link", side_effect=OSError)
+
+    image_store.link_image(URI, fpath_target)
+
+    assert fpath_target.is_symlink()
+    assert fpath_target.resolve() == fpath_image.resolve()
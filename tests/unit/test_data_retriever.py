@@ -1,5 +1,8 @@
 """Tests for NipoppyDataRetriever class."""
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pandas as pd
@@ -7,11 +10,19 @@ import pytest
 import pytest_mock
 
 from nipoppy._data_retriever import (
+    DNAME_PARQUET_CACHE,
     NipoppyDataRetriever,
+    NipoppyFederatedDataRetriever,
     _check_derivatives_arg,
     _check_phenotypes_arg,
+    _downcast_dtypes,
+    _filter_rows,
+    _glob_to_regex,
+    _normalize_ids,
 )
+from nipoppy.exceptions import NipoppyError
 from nipoppy.tabular.manifest import Manifest
+from nipoppy.utils.bids import check_participant_id
 
 
 @pytest.fixture
@@ -141,6 +152,365 @@ def test_load_tsv_index(api: NipoppyDataRetriever, tmp_path: Path):
     )
 
 
+def test_load_tsv_index_invalid(api: NipoppyDataRetriever, tmp_path: Path):
+    fpath = tmp_path / "test.tsv"
+    pd.DataFrame(
+        {
+            "participant_id": ["sub-01", "sub-0_2"],
+            "session_id": ["ses-A", "ses-A"],
+            "col1": [1, 2],
+        }
+    ).to_csv(fpath, sep="\t", index=False)
+
+    with pytest.raises(NipoppyError, match="Invalid participant ID"):
+        api._load_tsv(fpath=fpath, index_cols=["participant_id", "session_id"])
+
+
+def test_load_tsv_columns(api: NipoppyDataRetriever, tmp_path: Path):
+    fpath = tmp_path / "test.tsv"
+    pd.DataFrame(
+        {
+            "participant_id": ["01", "02"],
+            "session_id": ["A", "A"],
+            "col1": [1, 2],
+            "col2": [3, 4],
+            "col3": [5, 6],
+        }
+    ).to_csv(fpath, sep="\t", index=False)
+
+    df_loaded = api._load_tsv(
+        fpath=fpath,
+        index_cols=["participant_id", "session_id"],
+        columns=["col3", "col1", "col_missing"],
+    )
+    assert set(df_loaded.columns) == {"col1", "col3"}
+
+
+def test_load_tsv_cache(
+    api: NipoppyDataRetriever, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    fpath = tmp_path / "test.tsv"
+    index_cols = ["participant_id", "session_id"]
+    df_orig = pd.DataFrame(
+        {
+            "participant_id": ["01", "02"],
+            "session_id": ["A", "A"],
+            "col1": [1, 2],
+            "col2": [3, 4],
+        }
+    )
+    df_orig.to_csv(fpath, sep="\t", index=False)
+    spy_read_csv = mocker.spy(pd, "read_csv")
+
+    df1 = api._load_tsv(fpath=fpath, index_cols=index_cols)
+    # modifying the returned dataframe should not affect the cache
+    df1.loc[:, "col1"] = 0
+    df2 = api._load_tsv(fpath=fpath, index_cols=index_cols)
+    # projection of the cached full table
+    df3 = api._load_tsv(fpath=fpath, index_cols=index_cols, columns=["col2"])
+    assert spy_read_csv.call_count == 1
+    assert list(df2["col1"]) == [1, 2]
+    assert list(df3.columns) == ["col2"]
+
+    # file changed: cache is invalidated
+    df_orig.assign(col1=[7, 8], col3=[0, 0]).to_csv(fpath, sep="\t", index=False)
+    df4 = api._load_tsv(fpath=fpath, index_cols=index_cols)
+    assert spy_read_csv.call_count == 2
+    assert list(df4["col1"]) == [7, 8]
+
+
+def test_load_tsv_parquet_cache(
+    api: NipoppyDataRetriever, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    api._study.layout.dpath_root.mkdir(parents=True)
+    fpath = tmp_path / "test.tsv"
+    index_cols = ["participant_id", "session_id"]
+    df_orig = pd.DataFrame(
+        {
+            "participant_id": ["sub-01", "sub-02"],
+            "session_id": ["ses-A", "ses-A"],
+            "col1": [1.5, 2.5],
+            "col2": ["a", "b"],
+        }
+    )
+    df_orig.to_csv(fpath, sep="\t", index=False)
+    spy_read_csv = mocker.spy(pd, "read_csv")
+
+    df_tsv = api._load_tsv(fpath=fpath, index_cols=index_cols)
+    dpath_cache = api._study.layout.dpath_nipoppy / DNAME_PARQUET_CACHE
+    assert len(list(dpath_cache.iterdir())) == 1
+
+    # new instance (empty in-memory cache) reads from the Parquet mirror
+    api_new = NipoppyDataRetriever(path=api._study.layout.dpath_root)
+    pd.testing.assert_frame_equal(
+        api_new._load_tsv(fpath=fpath, index_cols=index_cols), df_tsv
+    )
+    df_projected = api_new._load_tsv(
+        fpath=fpath, index_cols=index_cols, columns=["col2", "col_missing"]
+    )
+    assert spy_read_csv.call_count == 1
+    pd.testing.assert_frame_equal(df_projected, df_tsv.loc[:, ["col2"]])
+
+    # changed file: mirror is rebuilt and the outdated one is removed
+    df_orig.assign(col1=[3.5, 4.5]).to_csv(fpath, sep="\t", index=False)
+    os.utime(fpath, ns=(0, 0))
+    df_new = api_new._load_tsv(fpath=fpath, index_cols=index_cols)
+    assert spy_read_csv.call_count == 2
+    assert list(df_new["col1"]) == [3.5, 4.5]
+    assert len(list(dpath_cache.iterdir())) == 1
+
+
+@pytest.mark.parametrize(
+    "parquet_cache,pyarrow_installed", [(False, True), (True, False)]
+)
+def test_load_tsv_parquet_cache_disabled(
+    tmp_path: Path, mocker: pytest_mock.MockFixture, parquet_cache, pyarrow_installed
+):
+    mocker.patch("nipoppy._data_retriever.PYARROW_INSTALLED", pyarrow_installed)
+    api = NipoppyDataRetriever(path=tmp_path / "my_study", parquet_cache=parquet_cache)
+    api._study.layout.dpath_root.mkdir(parents=True)
+    fpath = tmp_path / "test.tsv"
+    pd.DataFrame({"participant_id": ["01"], "session_id": ["A"], "col1": [1]}).to_csv(
+        fpath, sep="\t", index=False
+    )
+
+    api._load_tsv(fpath=fpath, index_cols=["participant_id", "session_id"])
+    assert not (api._study.layout.dpath_nipoppy / DNAME_PARQUET_CACHE).exists()
+
+
+@pytest.mark.filterwarnings("ignore::pandas.errors.DtypeWarning")
+def test_load_tsv_parquet_cache_mixed_types(api: NipoppyDataRetriever, tmp_path: Path):
+    api._study.layout.dpath_root.mkdir(parents=True)
+    fpath = tmp_path / "test.tsv"
+    # large enough for pandas to infer different types for different chunks,
+    # which gives an object column with ints and strings that pyarrow rejects
+    n_rows = 300000
+    pd.DataFrame(
+        {
+            "participant_id": [str(i) for i in range(n_rows)],
+            "session_id": "A",
+            "col1": [str(i) for i in range(n_rows - 10)] + ["x"] * 10,
+        }
+    ).to_csv(fpath, sep="\t", index=False)
+
+    df = api._load_tsv(fpath=fpath, index_cols=["participant_id", "session_id"])
+    assert len(df) == n_rows
+    assert df["col1"].iloc[-1] == "x"
+
+    # no mirror or temporary file left behind
+    dpath_cache = api._study.layout.dpath_nipoppy / DNAME_PARQUET_CACHE
+    assert list(dpath_cache.iterdir()) == []
+
+
+def test_write_parquet_mirror_concurrent(
+    api: NipoppyDataRetriever, mocker: pytest_mock.MockFixture
+):
+    api._study.layout.dpath_root.mkdir(parents=True)
+    df = pd.DataFrame(
+        {"col1": [1.5]},
+        index=pd.MultiIndex.from_tuples([("01", "A")], names=api._index_cols_output),
+    )
+    fpath_mirror = api._get_fpath_parquet_mirror(
+        Path("test.tsv"), api._index_cols_derivatives, (1, 2)
+    )
+    # outdated mirror of the same file
+    fpath_outdated = api._get_fpath_parquet_mirror(
+        Path("test.tsv"), api._index_cols_derivatives, (0, 2)
+    )
+    fpath_outdated.parent.mkdir(parents=True)
+    fpath_outdated.touch()
+
+    # make both threads write their temporary file at the same time
+    barrier = threading.Barrier(2)
+    to_parquet = pd.DataFrame.to_parquet
+
+    def _to_parquet(self, path, **kwargs):
+        to_parquet(self, path, **kwargs)
+        barrier.wait(timeout=5)
+
+    mocker.patch.object(pd.DataFrame, "to_parquet", _to_parquet)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(api._write_parquet_mirror, df, fpath_mirror)
+            for _ in range(2)
+        ]
+        for future in futures:
+            future.result()
+
+    assert list(fpath_mirror.parent.iterdir()) == [fpath_mirror]
+    pd.testing.assert_frame_equal(pd.read_parquet(fpath_mirror), df)
+
+
+def test_load_tsv_parquet_cache_no_study_dir(api: NipoppyDataRetriever, tmp_path: Path):
+    fpath = tmp_path / "test.tsv"
+    pd.DataFrame({"participant_id": ["01"], "session_id": ["A"], "col1": [1]}).to_csv(
+        fpath, sep="\t", index=False
+    )
+
+    df = api._load_tsv(fpath=fpath, index_cols=["participant_id", "session_id"])
+    assert list(df["col1"]) == [1]
+    assert not api._study.layout.dpath_root.exists()
+
+
+@pytest.mark.parametrize("parquet_cache", [True, False])
+@pytest.mark.parametrize(
+    "participants,sessions,expected",
+    [
+        (["01"], None, [("01", "A"), ("01", "B")]),
+        (["sub-01", "03"], ["ses-B"], [("01", "B")]),
+        (None, ["A"], [("01", "A"), ("02", "A")]),
+        (["04"], None, []),
+    ],
+)
+def test_load_tsv_filter_rows(
+    api: NipoppyDataRetriever,
+    tmp_path: Path,
+    mocker: pytest_mock.MockFixture,
+    parquet_cache,
+    participants,
+    sessions,
+    expected,
+):
+    # small chunks to test streaming
+    mocker.patch("nipoppy._data_retriever.TSV_CHUNK_SIZE", 2)
+    api._parquet_cache = parquet_cache
+    api._study.layout.dpath_root.mkdir(parents=True)
+    fpath = tmp_path / "test.tsv"
+    index_cols = ["participant_id", "session_id"]
+    pd.DataFrame(
+        {
+            "participant_id": ["sub-01", "sub-01", "sub-02", "sub-03"],
+            "session_id": ["ses-A", "ses-B", "ses-A", "ses-C"],
+            "col1": [1, 2, 3, 4],
+        }
+    ).to_csv(fpath, sep="\t", index=False)
+
+    # streamed from the TSV file
+    df_filtered = api._load_tsv(
+        fpath=fpath, index_cols=index_cols, participants=participants, sessions=sessions
+    )
+    assert list(df_filtered.index) == expected
+    assert api._cache == {}
+
+    # after a full load: from the Parquet mirror or the in-memory cache
+    api._load_tsv(fpath=fpath, index_cols=index_cols)
+    df_filtered = api._load_tsv(
+        fpath=fpath, index_cols=index_cols, participants=participants, sessions=sessions
+    )
+    assert list(df_filtered.index) == expected
+    api._cache = {}
+    df_filtered = api._load_tsv(
+        fpath=fpath, index_cols=index_cols, participants=participants, sessions=sessions
+    )
+    assert list(df_filtered.index) == expected
+
+
+def test_load_tsv_filter_rows_invalid(api: NipoppyDataRetriever, tmp_path: Path):
+    with pytest.raises(TypeError, match="Expected a collection of IDs"):
+        api._load_tsv(
+            fpath=tmp_path / "test.tsv",
+            index_cols=["participant_id", "session_id"],
+            participants="01",
+        )
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "idp/a.tsv",
+        "idp/*.tsv",
+        "*/a.tsv",
+        "**/a.tsv",
+        "**/*.tsv",
+        "idp/**/b?.tsv",
+        "idp/sub[12]/*.tsv",
+        "idp/sub[!1]/*.tsv",
+        "idp/**/*",
+        "idp/a.tsv.json",
+        "idp/(a).tsv",
+    ],
+)
+def test_glob_to_regex(tmp_path: Path, pattern):
+    fpaths = [
+        "idp/a.tsv",
+        "idp/a.tsv.json",
+        "idp/(a).tsv",
+        "idp/sub1/b1.tsv",
+        "idp/sub2/b2.tsv",
+        "idp/sub2/deeper/b3.tsv",
+        "idp/sub2/deeper/c.tsv",
+    ]
+    for fpath in fpaths:
+        (tmp_path / fpath).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / fpath).touch()
+
+    regex = _glob_to_regex(pattern)
+    assert {fpath for fpath in fpaths if regex.fullmatch(fpath)} == {
+        path.relative_to(tmp_path).as_posix()
+        for path in tmp_path.glob(pattern)
+        if path.is_file()
+    }
+
+
+def test_get_idp_index(
+    api: NipoppyDataRetriever, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    dpath_idp = tmp_path / "idp"
+    (dpath_idp / "sub").mkdir(parents=True)
+    (dpath_idp / "a.tsv").touch()
+    (dpath_idp / "sub" / "b.tsv").touch()
+    spy_walk = mocker.spy(os, "walk")
+
+    assert sorted(api._get_idp_index(dpath_idp)) == ["a.tsv", "sub/b.tsv"]
+    assert sorted(api._get_idp_index(dpath_idp)) == ["a.tsv", "sub/b.tsv"]
+    assert spy_walk.call_count == 1
+
+    # new file in a subdirectory: index is rebuilt
+    (dpath_idp / "sub" / "c.tsv").touch()
+    os.utime(dpath_idp / "sub", ns=(0, 0))
+    assert sorted(api._get_idp_index(dpath_idp)) == [
+        "a.tsv",
+        "sub/b.tsv",
+        "sub/c.tsv",
+    ]
+    assert spy_walk.call_count == 2
+
+    # removed subdirectory: index is rebuilt
+    (dpath_idp / "sub" / "b.tsv").unlink()
+    (dpath_idp / "sub" / "c.tsv").unlink()
+    (dpath_idp / "sub").rmdir()
+    assert api._get_idp_index(dpath_idp) == ["a.tsv"]
+    assert spy_walk.call_count == 3
+
+
+def test_find_derivative_path_idp_dir_first(
+    api: NipoppyDataRetriever, mocker: pytest_mock.MockFixture
+):
+    pipeline_name = "pipeline1"
+    pipeline_version = "v1.0"
+    dpath_pipeline = api._study.layout.get_dpath_pipeline(
+        pipeline_name, pipeline_version
+    )
+    for filepath in ("idp/stats/idp.tsv", "output/sub-01/idp.tsv"):
+        (dpath_pipeline / filepath).parent.mkdir(parents=True, exist_ok=True)
+        (dpath_pipeline / filepath).touch()
+    spy_glob = mocker.spy(Path, "glob")
+
+    assert (
+        api._find_derivative_path(pipeline_name, pipeline_version, "**/idp.tsv")
+        == dpath_pipeline / "idp/stats/idp.tsv"
+    )
+    spy_glob.assert_not_called()
+
+    # falls back to searching the whole pipeline directory
+    assert (
+        api._find_derivative_path(pipeline_name, pipeline_version, "output/*/idp.tsv")
+        == dpath_pipeline / "output/sub-01/idp.tsv"
+    )
+    spy_glob.assert_called_once()
+
+
 def test_find_derivative_path_valid(api: NipoppyDataRetriever):
     pipeline_name = "pipeline1"
     pipeline_version = "v1.0"
@@ -222,7 +592,10 @@ def test_get_derivatives_table(
         pipeline_name, pipeline_version, filepath_pattern
     )
     mocked_load_tsv.assert_called_once_with(
-        expected_path, index_cols=api._index_cols_derivatives
+        expected_path,
+        index_cols=api._index_cols_derivatives,
+        participants=None,
+        sessions=None,
     )
     assert df_derivatives.equals(mocked_load_tsv.return_value)
 
@@ -282,7 +655,11 @@ def test_get_all_phenotypes(
     df_phenotypes = api.get_all_phenotypes()
 
     mocked_load_tsv.assert_called_once_with(
-        api._study.layout.fpath_harmonized, index_cols=api._index_cols_phenotypes
+        api._study.layout.fpath_harmonized,
+        index_cols=api._index_cols_phenotypes,
+        columns=None,
+        participants=None,
+        sessions=None,
     )
     mocked_filter_with_manifest.assert_called_once_with(df_harmonized)
 
@@ -297,9 +674,9 @@ def test_get_phenotypes(
     mocked_check_phenotypes_arg = mocker.patch(
         "nipoppy._data_retriever._check_phenotypes_arg"
     )
-    mocked_get_all_phenotypes = mocker.patch.object(
+    mocked_get_phenotypes_table = mocker.patch.object(
         api,
-        "get_all_phenotypes",
+        "_get_phenotypes_table",
         return_value=df_harmonized,
     )
 
@@ -307,7 +684,9 @@ def test_get_phenotypes(
     df_phenotypes = api.get_phenotypes(phenotypes=phenotypes)
 
     mocked_check_phenotypes_arg.assert_called_once_with(phenotypes)
-    mocked_get_all_phenotypes.assert_called_once_with()
+    mocked_get_phenotypes_table.assert_called_once_with(
+        columns=phenotypes, participants=None, sessions=None
+    )
 
     assert list(df_phenotypes.columns) == phenotypes
 
@@ -320,11 +699,11 @@ def test_get_derivatives(api: NipoppyDataRetriever, mocker: pytest_mock.MockFixt
         api,
         "_get_derivatives_table",
         # return string instead of df for testing purposes
-        side_effect=(lambda name, version, pattern: f"df_{pattern}"),
+        side_effect=(lambda name, version, pattern, **kwargs: f"df_{pattern}"),
     )
     mocked_pd_concat = mocker.patch("pandas.concat", return_value=pd.DataFrame())
     mocked_filter_with_manifest = mocker.patch.object(
-        api, "_filter_with_manifest", return_value=pd.DataFrame()
+        api, "_filter_with_manifest", side_effect=(lambda df: f"filtered_{df}")
     )
 
     derivatives = [
@@ -336,14 +715,57 @@ def test_get_derivatives(api: NipoppyDataRetriever, mocker: pytest_mock.MockFixt
     mocked_check_derivatives_arg.assert_called_once_with(derivatives)
     assert mocked_get_derivatives_table.call_count == len(derivatives)
     for derivative_spec in derivatives:
-        mocked_get_derivatives_table.assert_any_call(*derivative_spec)
+        mocked_get_derivatives_table.assert_any_call(
+            *derivative_spec, participants=None, sessions=None
+        )
+    # tables are filtered before being joined
+    assert mocked_filter_with_manifest.call_count == len(derivatives)
     mocked_pd_concat.assert_called_once_with(
-        ["df_pattern1", "df_pattern2"], axis="columns", join="outer"
+        ["filtered_df_pattern1", "filtered_df_pattern2"], axis="columns", join="outer"
+    )
+    assert id(df_derivatives) == id(mocked_pd_concat.return_value)
+
+
+@pytest.mark.parametrize("downcast", [True, False])
+def test_get_derivatives_downcast(
+    api: NipoppyDataRetriever, mocker: pytest_mock.MockFixture, downcast
+):
+    df = pd.DataFrame(
+        {"col_float": [1.5, 2.5], "col_int": [1, 2]},
+        index=pd.MultiIndex.from_tuples(
+            [("01", "A"), ("02", "A")], names=api._index_cols_output
+        ),
+    )
+    mocker.patch.object(api, "_get_derivatives_table", return_value=df)
+    mocker.patch.object(api, "_filter_with_manifest", side_effect=lambda df: df)
+
+    df_derivatives = api.get_derivatives(
+        derivatives=[("pipeline1", "v1.0", "pattern1")], downcast=downcast
+    )
+
+    assert (df_derivatives["col_float"].dtype == "float32") == downcast
+    assert (df_derivatives["col_int"].dtype == "int8") == downcast
+
+
+def test_downcast_dtypes():
+    df = pd.DataFrame(
+        {
+            "col_float": [1.5, 2.5, None, 4.5],
+            "col_int": [1, 2, 3, 300],
+            "col_repeated": ["a", "b", "a", "a"],
+            "col_unique": ["a", "b", "c", "d"],
+            "col_bool": [True, False, True, True],
+        }
     )
-    assert id(mocked_filter_with_manifest.call_args[0][0]) == id(
-        mocked_pd_concat.return_value
+    df_downcast = _downcast_dtypes(df)
+    assert df_downcast["col_float"].dtype == "float32"
+    assert df_downcast["col_int"].dtype == "int16"
+    assert isinstance(df_downcast["col_repeated"].dtype, pd.CategoricalDtype)
+    assert df_downcast["col_unique"].dtype == df["col_unique"].dtype
+    assert df_downcast["col_bool"].dtype == "bool"
+    pd.testing.assert_frame_equal(
+        df_downcast.astype(df.dtypes.to_dict()), df, check_exact=False
     )
-    assert id(df_derivatives) == id(mocked_filter_with_manifest.return_value)
 
 
 def test_get_tabular_data(api: NipoppyDataRetriever, mocker: pytest_mock.MockFixture):
@@ -362,8 +784,12 @@ def test_get_tabular_data(api: NipoppyDataRetriever, mocker: pytest_mock.MockFix
     ]
     df_tabular = api.get_tabular_data(phenotypes=phenotypes, derivatives=derivatives)
 
-    mocked_get_phenotypes_table.assert_called_once_with(phenotypes)
-    mocked_get_derivatives_table.assert_called_once_with(derivatives)
+    mocked_get_phenotypes_table.assert_called_once_with(
+        phenotypes, participants=None, sessions=None
+    )
+    mocked_get_derivatives_table.assert_called_once_with(
+        derivatives, participants=None, sessions=None, downcast=False
+    )
     mocked_pd_concat.assert_called_once_with(
         ["df_phenotypes", "df_derivatives"], axis="columns", join="outer"
     )
@@ -402,11 +828,221 @@ def test_get_tabular_data_optional_args(
     api.get_tabular_data(phenotypes=phenotypes, derivatives=derivatives)
 
     if get_phenotypes_called:
-        mocked_get_phenotypes_table.assert_called_once_with(phenotypes)
+        mocked_get_phenotypes_table.assert_called_once_with(
+            phenotypes, participants=None, sessions=None
+        )
     if get_derivatives_called:
-        mocked_get_derivatives_table.assert_called_once_with(derivatives)
+        mocked_get_derivatives_table.assert_called_once_with(
+            derivatives, participants=None, sessions=None, downcast=False
+        )
 
 
 def test_get_tabular_data_error_no_measures_requested(api: NipoppyDataRetriever):
     with pytest.raises(ValueError, match="Must request at least one measure"):
         api.get_tabular_data(phenotypes=None, derivatives=None)
+
+
+@pytest.mark.parametrize(
+    "chunk_size,participants,sessions,expected_chunks",
+    [
+        (2, None, None, [["01"], ["02", "03"], ["04"]]),
+        (3, None, None, [["01", "02"], ["03", "04"]]),
+        # participant with more sessions than chunk_size
+        (1, None, None, [["01"], ["02"], ["03"], ["04"]]),
+        (10, ["01", "sub-04"], None, [["01", "04"]]),
+        (2, None, ["A"], [["01", "02"], ["03", "04"]]),
+    ],
+)
+@pytest.mark.parametrize("low_memory", [False, True])
+def test_iter_tabular_data(
+    api: NipoppyDataRetriever,
+    mocker: pytest_mock.MockFixture,
+    chunk_size,
+    participants,
+    sessions,
+    expected_chunks,
+    low_memory,
+):
+    participants_sessions = [("01", "A"), ("01", "B"), ("02", "A"), ("03", "A")]
+    participants_sessions.append(("04", "A"))
+    api._study.manifest = Manifest().add_or_update_records(
+        [
+            {
+                "participant_id": participant_id,
+                "visit_id": session_id,
+                "session_id": session_id,
+                "datatype": None,
+            }
+            for participant_id, session_id in participants_sessions
+        ]
+    )
+    fpath_harmonized = api._study.layout.fpath_harmonized
+    fpath_harmonized.parent.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "nb:ParticipantID": [
+                f"sub-{participant_id}"
+                # also a participant that is not in the manifest
+                for participant_id, _ in participants_sessions + [("05", "A")]
+            ],
+            "nb:SessionID": [
+                f"ses-{session_id}"
+                for _, session_id in participants_sessions + [("05", "A")]
+            ],
+            "nb:Age": range(len(participants_sessions) + 1),
+        }
+    ).to_csv(fpath_harmonized, sep="\t", index=False)
+    # derivatives in a different order than the manifest
+    df_derivatives = pd.DataFrame(
+        {"col1": [4.5, 3.5, 2.5, 1.5]},
+        index=pd.MultiIndex.from_tuples(
+            [("04", "A"), ("03", "A"), ("01", "B"), ("01", "A")],
+            names=api._index_cols_output,
+        ),
+    )
+    mocked_get_derivatives_table = mocker.patch.object(
+        api,
+        "_get_derivatives_table",
+        side_effect=lambda *args, participants, sessions: _filter_rows(
+            df_derivatives, _normalize_ids(participants, check_participant_id), sessions
+        ),
+    )
+    spy_load_tsv = mocker.spy(api, "_load_tsv")
+
+    kwargs = dict(
+        phenotypes=["nb:Age"],
+        derivatives=[("pipeline1", "v1.0", "pattern1")],
+        participants=participants,
+        sessions=sessions,
+    )
+    chunks = list(
+        api.iter_tabular_data(chunk_size=chunk_size, low_memory=low_memory, **kwargs)
+    )
+
+    assert [
+        list(dict.fromkeys(chunk.index.get_level_values(0))) for chunk in chunks
+    ] == expected_chunks
+    if low_memory:
+        # files are read for each chunk, only for the participants in the chunk
+        assert [
+            sorted(call.kwargs["participants"]) for call in spy_load_tsv.call_args_list
+        ] == expected_chunks
+        assert mocked_get_derivatives_table.call_count == len(expected_chunks)
+    else:
+        # each file is only read once
+        assert spy_load_tsv.call_count == 1
+        assert mocked_get_derivatives_table.call_count == 1
+
+    # same data as loading everything at once
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks).sort_index(),
+        api.get_tabular_data(**kwargs).sort_index(),
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs,error_message",
+    [
+        ({}, "Must request at least one measure"),
+        ({"phenotypes": ["nb:Age"], "chunk_size": 0}, "chunk_size must be a positive"),
+    ],
+)
+def test_iter_tabular_data_error(api: NipoppyDataRetriever, kwargs, error_message):
+    with pytest.raises(ValueError, match=error_message):
+        next(api.iter_tabular_data(**kwargs))
+
+
+@pytest.mark.parametrize(
+    "paths,expected_studies",
+    [
+        (["/path/to/study1", "/other/path/to/study2"], ["study1", "study2"]),
+        ({"A": "/path/to/study", "B": "/other/path/to/study"}, ["A", "B"]),
+    ],
+)
+def test_federated_init(paths, expected_studies):
+    api = NipoppyFederatedDataRetriever(paths)
+    assert api.studies == expected_studies
+
+
+@pytest.mark.parametrize(
+    "paths,error_message",
+    [
+        ([], "At least one study path must be given"),
+        (
+            ["/path/to/study", "/other/path/to/study"],
+            "Found more than one study named study",
+        ),
+    ],
+)
+def test_federated_init_error(paths, error_message):
+    with pytest.raises(ValueError, match=error_message):
+        NipoppyFederatedDataRetriever(paths)
+
+
+def test_federated_get_tabular_data(tmp_path: Path):
+    api = NipoppyFederatedDataRetriever(
+        [tmp_path / "study1", tmp_path / "study2"], n_jobs=2
+    )
+    for i_study, retriever in enumerate(api._retrievers.values()):
+        retriever._study.manifest = Manifest().add_or_update_records(
+            [
+                {
+                    "participant_id": "01",
+                    "visit_id": "A",
+                    "session_id": "A",
+                    "datatype": None,
+                }
+            ]
+        )
+        fpath_harmonized = retriever._study.layout.fpath_harmonized
+        fpath_harmonized.parent.mkdir(parents=True)
+        pd.DataFrame(
+            {
+                "nb:ParticipantID": ["01", "02"],
+                "nb:SessionID": ["A", "A"],
+                "nb:Age": [20 + i_study, 30],
+            }
+        ).to_csv(fpath_harmonized, sep="\t", index=False)
+
+    df = api.get_tabular_data(phenotypes=["nb:Age"])
+
+    assert list(df.index.names) == ["study", "participant_id", "session_id"]
+    assert list(df.index) == [("study1", "01", "A"), ("study2", "01", "A")]
+    assert list(df["nb:Age"]) == [20, 21]
+
+
+@pytest.mark.parametrize(
+    "method_name,kwargs",
+    [
+        ("get_all_phenotypes", {"sessions": ["A"]}),
+        ("get_phenotypes", {"phenotypes": ["nb:Age"]}),
+        ("get_derivatives", {"derivatives": [("pipeline1", "v1.0", "pattern1")]}),
+        ("get_tabular_data", {"phenotypes": ["nb:Age"], "participants": ["01"]}),
+    ],
+)
+def test_federated_methods(
+    mocker: pytest_mock.MockFixture, tmp_path: Path, method_name, kwargs
+):
+    api = NipoppyFederatedDataRetriever([tmp_path / "study1", tmp_path / "study2"])
+    mocked = mocker.patch.object(
+        NipoppyDataRetriever,
+        method_name,
+        return_value=pd.DataFrame(
+            {"col1": [1]},
+            index=pd.MultiIndex.from_tuples(
+                [("01", "A")], names=NipoppyDataRetriever._index_cols_output
+            ),
+        ),
+    )
+
+    df = getattr(api, method_name)(**kwargs)
+
+    assert mocked.call_count == 2
+    mocked.assert_called_with(**kwargs)
+    assert list(df.index) == [("study1", "01", "A"), ("study2", "01", "A")]
+
+
+def test_federated_get_tabular_data_error(tmp_path: Path):
+    api = NipoppyFederatedDataRetriever([tmp_path / "study1"])
+    with pytest.raises(ValueError, match="Must request at least one measure"):
+        api.get_tabular_data()
@@ -0,0 +1,148 @@
+"""Tests for the local pipeline catalog."""
+
+from pathlib import Path
+
+import pytest
+
+from nipoppy.config.pipeline import ProcessingPipelineConfig
+from nipoppy.env import PipelineTypeEnum
+from nipoppy.pipeline_catalog import PipelineCatalog
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "no_fts"])
+def catalog(tmp_path: Path, request: pytest.FixtureRequest) -> PipelineCatalog:
+    catalog = PipelineCatalog(tmp_path / "cache" / "catalog.sqlite")
+    if not request.param:
+        # simulate SQLite without FTS5 support
+        catalog._has_fts = False
+    return catalog
+
+
+def _get_hit(zenodo_id: int, title: str, downloads: int, communities=()) -> dict:
+    return {
+        "id": zenodo_id,
+        "title": title,
+        "doi_url": f"https://doi.org/{zenodo_id}",
+        "stats": {"downloads": downloads},
+        "metadata": {
+            "description": f"Nipoppy configuration files for {title}",
+            "keywords": ["Nipoppy", f"pipeline_name:{title.split('-')[0]}"],
+            "communities": [{"id": community} for community in communities],
+        },
+    }
+
+
+@pytest.fixture
+def hits() -> list[dict]:
+    return [
+        _get_hit(1, "fmriprep-24.1.1", 10, communities=["nipoppy"]),
+        _get_hit(2, "fmriprep-23.1.3", 50),
+        _get_hit(3, "mriqc-23.1.0", 20, communities=["nipoppy"]),
+        _get_hit(4, "freesurfer-7.3.2", 5),
+    ]
+
+
+def test_no_file_created(tmp_path: Path):
+    catalog = PipelineCatalog(tmp_path / "catalog.sqlite")
+    assert catalog.last_sync is None
+    assert not catalog.fpath.exists()
+
+
+def test_add_zenodo_records(catalog: PipelineCatalog, hits: list[dict]):
+    catalog.add_zenodo_records(hits)
+    assert catalog.last_sync is None
+
+    results = catalog.search("")
+    assert results["total"] == len(hits)
+    # sorted by downloads
+    assert [hit["id"] for hit in results["hits"]] == [2, 3, 1, 4]
+    assert results["hits"][0] == hits[1]
+
+
+def test_add_zenodo_records_replace(catalog: PipelineCatalog, hits: list[dict]):
+    catalog.add_zenodo_records(hits)
+    catalog.add_zenodo_records(hits[:1], replace=True)
+
+    assert catalog.last_sync is not None
+    assert [hit["id"] for hit in catalog.search("")["hits"]] == [1]
+
+
+def test_add_zenodo_records_update(catalog: PipelineCatalog, hits: list[dict]):
+    catalog.add_zenodo_records(hits)
+    hits[3]["stats"]["downloads"] = 1000
+    catalog.add_zenodo_records(hits[3:])
+
+    results = catalog.search("")
+    assert results["total"] == len(hits)
+    assert results["hits"][0]["id"] == 4
+
+
+@pytest.mark.parametrize(
+    "query,community_id,expected_ids",
+    [
+        ("fmriprep", None, [2, 1]),
+        ("FMRI", None, [2, 1]),
+        ("fmriprep 24", None, [1]),
+        ("configuration mriqc", None, [3]),
+        ("pipeline_name:freesurfer", None, [4]),
+        ("fmriprep", "nipoppy", [1]),
+        ("", "nipoppy", [3, 1]),
+        ("ants", None, []),
+    ],
+)
+def test_search(
+    catalog: PipelineCatalog,
+    hits: list[dict],
+    query: str,
+    community_id: str,
+    expected_ids: list[int],
+):
+    catalog.add_zenodo_records(hits)
+    results = catalog.search(query, community_id=community_id)
+    assert [hit["id"] for hit in results["hits"]] == expected_ids
+    assert results["total"] == len(expected_ids)
+
+
+def test_search_size(catalog: PipelineCatalog, hits: list[dict]):
+    catalog.add_zenodo_records(hits)
+    results = catalog.search("", size=2)
+    assert len(results["hits"]) == 2
+    assert results["total"] == len(hits)
+
+
+def test_search_invalid_size(catalog: PipelineCatalog):
+    with pytest.raises(ValueError, match="size must be greater than 0"):
+        catalog.search("", size=0)
+
+
+def test_add_installed_pipelines(
+    catalog: PipelineCatalog, hits: list[dict], tmp_path: Path
+):
+    pipeline_config = ProcessingPipelineConfig(
+        NAME="my_pipeline",
+        VERSION="1.0.0",
+        PIPELINE_TYPE=PipelineTypeEnum.PROCESSING,
+    )
+    dpath_pipelines = tmp_path / "pipelines"
+    dpath_bundle = dpath_pipelines / "processing" / "my_pipeline-1.0.0"
+    catalog.add_zenodo_records(hits, replace=True)
+    catalog.add_installed_pipelines(dpath_pipelines, [(dpath_bundle, pipeline_config)])
+
+    results = catalog.search("my_pipeline")
+    assert results["total"] == 1
+    hit = results["hits"][0]
+    assert hit["title"] == "my_pipeline-1.0.0"
+    assert hit["path"] == str(dpath_bundle)
+    assert hit["id"] is None
+    # installed pipelines are listed after Zenodo records
+    assert catalog.search("", size=10)["hits"][-1] == hit
+
+    # installed pipelines are replaced, but not the Zenodo records
+    catalog.add_installed_pipelines(dpath_pipelines, [])
+    assert catalog.search("my_pipeline")["total"] == 0
+    assert catalog.search("")["total"] == len(hits)
+
+    # syncing Zenodo records does not remove installed pipelines
+    catalog.add_installed_pipelines(dpath_pipelines, [(dpath_bundle, pipeline_config)])
+    catalog.add_zenodo_records([], replace=True)
+    assert catalog.search("")["total"] == 1
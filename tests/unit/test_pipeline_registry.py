@@ -0,0 +1,135 @@
+"""Tests for the installed pipeline registry."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+import pytest_mock
+
+from nipoppy.config.pipeline import BasePipelineConfig
+from nipoppy.exceptions import ConfigError
+from nipoppy.layout import DatasetLayout
+from nipoppy.pipeline_registry import get_pipeline_bundles
+
+
+def _write_config(dpath_store: Path, name: str, version: str, dname=None) -> Path:
+    dpath_bundle = dpath_store / (dname or f"{name}-{version}")
+    dpath_bundle.mkdir(parents=True, exist_ok=True)
+    fpath_config = dpath_bundle / DatasetLayout.fname_pipeline_config
+    fpath_config.write_text(json.dumps({"NAME": name, "VERSION": version}))
+    return fpath_config
+
+
+@pytest.fixture
+def dpath_store(tmp_path: Path) -> Path:
+    dpath_store = tmp_path / "pipelines" / "processing"
+    _write_config(dpath_store, "pipeline1", "1.0.0")
+    _write_config(dpath_store, "pipeline1", "2.0.0")
+    _write_config(dpath_store, "pipeline2", "0.1.0")
+    (dpath_store / "not_a_bundle").mkdir()
+    return dpath_store
+
+
+@pytest.fixture
+def fpath_registry(tmp_path: Path) -> Path:
+    return tmp_path / "registry.json"
+
+
+@pytest.fixture
+def spy_config_init(mocker: pytest_mock.MockFixture):
+    return mocker.spy(BasePipelineConfig, "__init__")
+
+
+@pytest.mark.parametrize("use_registry", [True, False])
+def test_get_pipeline_bundles(dpath_store: Path, fpath_registry: Path, use_registry):
+    assert get_pipeline_bundles(
+        dpath_store, fpath_registry if use_registry else None
+    ) == {
+        "pipeline1": {
+            "1.0.0": dpath_store / "pipeline1-1.0.0",
+            "2.0.0": dpath_store / "pipeline1-2.0.0",
+        },
+        "pipeline2": {"0.1.0": dpath_store / "pipeline2-0.1.0"},
+    }
+    assert fpath_registry.exists() == use_registry
+
+
+def test_get_pipeline_bundles_missing_store(tmp_path: Path, fpath_registry: Path):
+    assert get_pipeline_bundles(tmp_path / "missing", fpath_registry) == {}
+
+
+def test_get_pipeline_bundles_reuses_registry(
+    dpath_store: Path, fpath_registry: Path, spy_config_init
+):
+    expected = get_pipeline_bundles(dpath_store, fpath_registry)
+    assert spy_config_init.call_count == 3
+
+    spy_config_init.reset_mock()
+    assert get_pipeline_bundles(dpath_store, fpath_registry) == expected
+    spy_config_init.assert_not_called()
+
+
+def test_get_pipeline_bundles_added_bundle(
+    dpath_store: Path, fpath_registry: Path, spy_config_init
+):
+    get_pipeline_bundles(dpath_store, fpath_registry)
+    spy_config_init.reset_mock()
+
+    _write_config(dpath_store, "pipeline3", "3.0.0")
+    # make sure the directory modification time changes
+    stat = dpath_store.stat()
+    os.utime(dpath_store, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert get_pipeline_bundles(dpath_store, fpath_registry)["pipeline3"] == {
+        "3.0.0": dpath_store / "pipeline3-3.0.0"
+    }
+    # only the new bundle is loaded
+    assert spy_config_init.call_count == 1
+
+
+def test_get_pipeline_bundles_modified_config(dpath_store: Path, fpath_registry: Path):
+    get_pipeline_bundles(dpath_store, fpath_registry)
+
+    # edit the config in place, without changing the store directory
+    fpath_config = _write_config(
+        dpath_store, "pipeline2", "0.2.0", dname="pipeline2-0.1.0"
+    )
+    stat = fpath_config.stat()
+    os.utime(fpath_config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert get_pipeline_bundles(dpath_store, fpath_registry)["pipeline2"] == {
+        "0.2.0": dpath_store / "pipeline2-0.1.0"
+    }
+
+
+def test_get_pipeline_bundles_new_config(dpath_store: Path, fpath_registry: Path):
+    get_pipeline_bundles(dpath_store, fpath_registry)
+
+    _write_config(dpath_store, "pipeline4", "1.0", dname="not_a_bundle")
+
+    assert get_pipeline_bundles(dpath_store, fpath_registry)["pipeline4"] == {
+        "1.0": dpath_store / "not_a_bundle"
+    }
+
+
+def test_get_pipeline_bundles_invalid_registry(dpath_store: Path, fpath_registry: Path):
+    fpath_registry.write_text("invalid json")
+    assert set(get_pipeline_bundles(dpath_store, fpath_registry)) == {
+        "pipeline1",
+        "pipeline2",
+    }
+
+
+def test_get_pipeline_bundles_no_registry_dir(dpath_store: Path, tmp_path: Path):
+    fpath_registry = tmp_path / "missing" / "registry.json"
+    get_pipeline_bundles(dpath_store, fpath_registry)
+    assert not fpath_registry.parent.exists()
+
+
+def test_get_pipeline_bundles_error(dpath_store: Path, fpath_registry: Path):
+    (dpath_store / "pipeline2-0.1.0" / DatasetLayout.fname_pipeline_config).write_text(
+        "invalid json"
+    )
+    with pytest.raises(ConfigError, match="Error when loading pipeline config"):
+        get_pipeline_bundles(dpath_store, fpath_registry)
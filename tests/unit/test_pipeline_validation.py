@@ -1,12 +1,14 @@
 """Tests for the nipoppy.pipeline_validation module."""
 
 import logging
+import shutil
 from contextlib import nullcontext
 from pathlib import Path
 
 import pytest
 import pytest_mock
 
+import nipoppy.pipeline_validation
 from nipoppy.config.pipeline import (
     BasePipelineConfig,
     BIDSificationPipelineConfig,
@@ -15,7 +17,12 @@ from nipoppy.config.pipeline import (
 )
 from nipoppy.config.schema import get_current_schema_version
 from nipoppy.env import ConfigType, PipelineTypeEnum
-from nipoppy.exceptions import ConfigError, FileOperationError, JSONError
+from nipoppy.exceptions import (
+    ConfigError,
+    FileOperationError,
+    JSON5Error,
+    JSONError,
+)
 from nipoppy.pipeline_validation import (
     _check_descriptor_file,
     _check_hpc_config_file,
@@ -27,6 +34,8 @@ from nipoppy.pipeline_validation import (
     _check_tracker_config_file,
     _load_pipeline_config_file,
     check_pipeline_bundle,
+    check_pipeline_bundle_cached,
+    logger,
 )
 from tests.conftest import DPATH_TEST_DATA
 
@@ -433,3 +442,96 @@ def test_check_pipeline_bundle(
     )
     mocked_check_self_contained.assert_called_once_with(dpath_bundle, fpaths)
     mocked_check_no_subdirectories.assert_called_once_with(dpath_bundle)
+
+
+@pytest.fixture()
+def dpath_bundle(tmp_path: Path) -> Path:
+    dpath_bundle = tmp_path / "bundle"
+    shutil.copytree(DPATH_TEST_DATA / "fmriprep-24.1.1", dpath_bundle)
+    return dpath_bundle
+
+
+def test_check_pipeline_bundle_cached(
+    dpath_bundle: Path, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    fpath_stamps = tmp_path / "stamps.json"
+    spy_check_pipeline_bundle = mocker.spy(
+        nipoppy.pipeline_validation, "check_pipeline_bundle"
+    )
+
+    assert check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+    assert fpath_stamps.exists()
+    assert not check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+    spy_check_pipeline_bundle.assert_called_once_with(
+        dpath_bundle.resolve(), strict=False
+    )
+
+    # different validation settings
+    assert check_pipeline_bundle_cached(dpath_bundle, fpath_stamps, strict=True)
+
+
+def test_check_pipeline_bundle_cached_file_changed(dpath_bundle: Path, tmp_path: Path):
+    fpath_stamps = tmp_path / "stamps.json"
+    check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+
+    with (dpath_bundle / "abc.txt").open("a") as file:
+        file.write("changed")
+    assert check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+
+
+def test_check_pipeline_bundle_cached_version_changed(
+    dpath_bundle: Path, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    fpath_stamps = tmp_path / "stamps.json"
+    check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+
+    mocker.patch("nipoppy.pipeline_validation.__version__", "new_version")
+    assert check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+
+
+def test_check_pipeline_bundle_cached_invalid(dpath_bundle: Path, tmp_path: Path):
+    fpath_stamps = tmp_path / "stamps.json"
+    (dpath_bundle / "hpc_config.json").write_text("invalid json")
+
+    for _ in range(2):
+        with pytest.raises(JSON5Error):
+            check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+    assert not fpath_stamps.exists()
+
+
+def test_check_pipeline_bundle_cached_warnings(
+    dpath_bundle: Path,
+    tmp_path: Path,
+    mocker: pytest_mock.MockFixture,
+    caplog: pytest.LogCaptureFixture,
+):
+    fpath_stamps = tmp_path / "stamps.json"
+    mocker.patch(
+        "nipoppy.pipeline_validation.check_pipeline_bundle",
+        side_effect=lambda *args, **kwargs: logger.warning("Deprecated bundle"),
+    )
+
+    check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+    caplog.clear()
+    assert not check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+
+    assert [(record.levelno, record.getMessage()) for record in caplog.records] == [
+        (logging.DEBUG, f"Pipeline bundle already validated: {dpath_bundle}"),
+        (logging.WARNING, "[yellow]Deprecated bundle[/]"),
+    ]
+
+
+@pytest.mark.parametrize("content", ["invalid json", "[]", '{"key": "value"}'])
+def test_check_pipeline_bundle_cached_invalid_stamps(
+    dpath_bundle: Path, tmp_path: Path, content: str
+):
+    fpath_stamps = tmp_path / "stamps.json"
+    fpath_stamps.write_text(content)
+    assert check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+    assert not check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+
+
+def test_check_pipeline_bundle_cached_no_stamps_dir(dpath_bundle: Path, tmp_path: Path):
+    fpath_stamps = tmp_path / "missing" / "stamps.json"
+    assert check_pipeline_bundle_cached(dpath_bundle, fpath_stamps)
+    assert not fpath_stamps.parent.exists()
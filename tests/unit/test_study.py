@@ -1,15 +1,21 @@
 """Tests for the Study class."""
 
+import json
+import shutil
 from enum import Enum
+from pathlib import Path
 
 import pytest
 import pytest_mock
 
+from nipoppy.config.main import Config
 from nipoppy.config.pipeline import BasePipelineConfig
 from nipoppy.config.schema import get_current_schema_version
 from nipoppy.env import ConfigType, PipelineTypeEnum
 from nipoppy.exceptions import ConfigError
-from nipoppy.study import Study
+from nipoppy.layout import DatasetLayout
+from nipoppy.pipeline_registry import FNAME_PIPELINE_REGISTRY
+from nipoppy.study import FNAME_CONFIG_CACHE, Study
 from tests.conftest import get_config
 
 
@@ -32,6 +38,90 @@ def test_config(study: Study, mocker: pytest_mock.MockFixture):
     assert str(processed_config.DICOM_DIR_MAP_FILE) == str(study.layout.dpath_root)
 
 
+def _write_config(study: Study, **kwargs):
+    study.layout.dpath_nipoppy.mkdir(parents=True, exist_ok=True)
+    study.layout.fpath_config.parent.mkdir(parents=True, exist_ok=True)
+    get_config(**kwargs).save(study.layout.fpath_config)
+
+
+def test_config_cached(study: Study, mocker: pytest_mock.MockFixture):
+    _write_config(study, dicom_dir_map_file="[[NIPOPPY_DPATH_ROOT]]/map.tsv")
+    config = study.config
+    assert (study.layout.dpath_nipoppy / FNAME_CONFIG_CACHE).exists()
+
+    # new Study object should use the cache
+    mocked_load = mocker.spy(Config, "load")
+    study_new = Study(study.layout)
+    assert study_new.config == config
+    assert str(study_new.config.DICOM_DIR_MAP_FILE) == str(
+        study.layout.dpath_root.resolve() / "map.tsv"
+    )
+    mocked_load.assert_not_called()
+
+
+def test_config_cache_invalidated_config_changed(study: Study):
+    _write_config(study, dicom_dir_map_file="map1.tsv")
+    assert str(study.config.DICOM_DIR_MAP_FILE) == "map1.tsv"
+
+    _write_config(study, dicom_dir_map_file="map2.tsv")
+    assert str(Study(study.layout).config.DICOM_DIR_MAP_FILE) == "map2.tsv"
+
+
+def test_config_cache_invalidated_layout_changed(study: Study, tmp_path: Path):
+    _write_config(study, dicom_dir_map_file="[[NIPOPPY_DPATH_ROOT]]/map.tsv")
+    study.config
+
+    # same config file but different dataset root
+    dpath_root_new = tmp_path / "moved_study"
+    study.layout.dpath_root.rename(dpath_root_new)
+    study_new = Study(DatasetLayout(dpath_root_new))
+    assert str(study_new.config.DICOM_DIR_MAP_FILE) == str(
+        dpath_root_new.resolve() / "map.tsv"
+    )
+
+
+@pytest.mark.parametrize("cache_content", ["{", '{"key": "abc"}', "[]"])
+def test_config_cache_invalid_file(study: Study, cache_content: str):
+    _write_config(study, dicom_dir_map_file="map.tsv")
+    (study.layout.dpath_nipoppy / FNAME_CONFIG_CACHE).write_text(cache_content)
+
+    assert str(study.config.DICOM_DIR_MAP_FILE) == "map.tsv"
+    # cache file is overwritten
+    assert (
+        Study(study.layout)._load_cached_config(
+            study._get_config_cache_key(study.layout.fpath_config.read_bytes())
+        )[0]
+        == study.config
+    )
+
+
+def test_config_cache_warnings(study: Study, mocker: pytest_mock.MockFixture):
+    _write_config(study)
+    config_dict = json.loads(study.layout.fpath_config.read_text())
+    config_dict["DATASET_NAME"] = "my_dataset"
+    config_dict["SUBSTITUTIONS"] = {"[[KEY]]": "value "}
+    study.layout.fpath_config.write_text(json.dumps(config_dict))
+
+    mocked_load = mocker.spy(Config, "load")
+    for _ in range(2):
+        with (
+            pytest.warns(DeprecationWarning, match="Field DATASET_NAME is deprecated"),
+            pytest.warns(UserWarning, match="leading/trailing whitespace"),
+        ):
+            Study(study.layout).config
+
+    # the second load used the cache
+    mocked_load.assert_called_once()
+
+
+def test_config_cache_no_nipoppy_dir(study: Study):
+    _write_config(study)
+    shutil.rmtree(study.layout.dpath_nipoppy)
+
+    study.config
+    assert not study.layout.dpath_nipoppy.exists()
+
+
 @pytest.mark.parametrize(
     "property_name,layout_attribute_name,tabular_class",
     [
@@ -126,6 +216,22 @@ def test_get_pipeline_map_info(
     assert pipeline_info == expected_pipeline_info
 
 
+def test_get_pipeline_bundles(study: Study):
+    dpath_bundle = study.layout.get_dpath_pipeline_bundle(
+        PipelineTypeEnum.PROCESSING, "pipeline1", "0.0.1"
+    )
+    dpath_bundle.mkdir(parents=True)
+    (dpath_bundle / study.layout.fname_pipeline_config).write_text(
+        BasePipelineConfig(NAME="pipeline1", VERSION="0.0.1").model_dump_json()
+    )
+    study.layout.dpath_nipoppy.mkdir(parents=True)
+
+    assert study.get_pipeline_bundles(PipelineTypeEnum.PROCESSING) == {
+        "pipeline1": {"0.0.1": dpath_bundle}
+    }
+    assert (study.layout.dpath_nipoppy / FNAME_PIPELINE_REGISTRY).exists()
+
+
 def test_get_pipeline_info_map_error(study: Study):
     fpath_config = (
         study.layout.get_dpath_pipeline_bundle(
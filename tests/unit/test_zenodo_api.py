@@ -2,14 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import http.server
+import json
 import logging
+import re
+import threading
+import time
 from pathlib import Path
 
+import httpx
 import pytest
 import pytest_httpx
 import pytest_mock
 
-from nipoppy.zenodo_api import ChecksumError, ZenodoAPI, ZenodoAPIError
+from nipoppy.zenodo_api import (
+    PARTIAL_DOWNLOAD_SUFFIX,
+    AsyncZenodoAPI,
+    ChecksumError,
+    ZenodoAPI,
+    ZenodoAPIError,
+)
 from tests.conftest import PASSWORD_FILE
 
 
@@ -137,6 +151,350 @@ def test_download_record_files_checksum_mismatch(
         zenodo_api.download_record_files(output_dir=tmp_path, record_id=record_id)
 
 
+class _ZenodoStandInHandler(http.server.BaseHTTPRequestHandler):
+    """Minimal stand-in for the Zenodo file download endpoints."""
+
+    # set in the fixture
+    files: dict[str, bytes]
+    checksums: dict[str, str]
+    # number of times the connection should be dropped halfway through a file
+    n_failures: dict[str, int]
+    support_range: bool
+    range_headers: list[str]
+    # for checking the number of concurrent requests
+    delay: float
+    n_in_flight: list[int]
+    lock: threading.Lock
+
+    def do_GET(self):  # noqa: N802
+        with self.lock:
+            self.n_in_flight[0] += 1
+            self.n_in_flight[1] = max(self.n_in_flight)
+        try:
+            time.sleep(self.delay)
+            self._do_GET()
+        finally:
+            with self.lock:
+                self.n_in_flight[0] -= 1
+
+    def _do_GET(self):  # noqa: N802
+        if match := re.fullmatch(r"/api/records/(\w+)", self.path):
+            self._send(
+                200, json.dumps({"metadata": {"title": match.group(1)}}).encode()
+            )
+        elif match := re.fullmatch(r"/api/records/\w+/files", self.path):
+            self._send(
+                200,
+                json.dumps(
+                    {
+                        "entries": [
+                            {"key": key, "checksum": f"md5:{self.checksums[key]}"}
+                            for key in self.files
+                        ]
+                    }
+                ).encode(),
+            )
+        elif match := re.fullmatch(r"/api/records/\w+/files/(.+)/content", self.path):
+            content = self.files[match.group(1)]
+            range_header = self.headers.get("Range")
+            self.range_headers.append(range_header)
+            status_code = 200
+            if range_header and self.support_range:
+                start = int(re.fullmatch(r"bytes=(\d+)-", range_header)[1])
+                if start >= len(content):
+                    self._send(416, b"")
+                    return
+                status_code = 206
+                content = content[start:]
+            if self.n_failures.get(match.group(1), 0) > 0:
+                self.n_failures[match.group(1)] -= 1
+                # announce the full content but only send half of it
+                self.send_response(status_code)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content[: len(content) // 2])
+                self.close_connection = True
+                return
+            self._send(status_code, content)
+        else:
+            self._send(404, json.dumps({"message": "Not found"}).encode())
+
+    def _send(self, status_code: int, content: bytes):
+        self.send_response(status_code)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def zenodo_server():
+    handler = type(
+        "Handler",
+        (_ZenodoStandInHandler,),
+        {
+            "files": {},
+            "checksums": {},
+            "n_failures": {},
+            "support_range": True,
+            "range_headers": [],
+            "delay": 0,
+            # current and maximum number of requests being handled
+            "n_in_flight": [0, 0],
+            "lock": threading.Lock(),
+        },
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_port}/api"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def zenodo_api_local(zenodo_server):
+    _, api_endpoint = zenodo_server
+    zenodo_api = ZenodoAPI()
+    zenodo_api.api_endpoint = api_endpoint
+    zenodo_api.client = httpx.Client(base_url=api_endpoint, trust_env=False)
+    yield zenodo_api
+    zenodo_api.close()
+
+
+def _add_files(handler, files: dict[str, bytes]):
+    handler.files.update(files)
+    handler.checksums.update(
+        {key: hashlib.md5(content).hexdigest() for key, content in files.items()}
+    )
+
+
+def test_download_record_files_streamed_concurrent(
+    tmp_path: Path, zenodo_server, zenodo_api_local: ZenodoAPI
+):
+    handler, _ = zenodo_server
+    files = {f"file{i}.txt": bytes([i]) * (1024 * 1024 * 2 + i) for i in range(5)}
+    _add_files(handler, files)
+
+    zenodo_api_local.download_record_files("123456", tmp_path, n_jobs=3)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(files)
+    for key, content in files.items():
+        assert (tmp_path / key).read_bytes() == content
+
+
+def test_download_record_files_resume_after_error(
+    tmp_path: Path, zenodo_server, zenodo_api_local: ZenodoAPI
+):
+    handler, _ = zenodo_server
+    content = b"0123456789" * 1000
+    _add_files(handler, {"file.txt": content})
+    handler.n_failures["file.txt"] = 1
+
+    zenodo_api_local.download_record_files("123456", tmp_path)
+
+    assert (tmp_path / "file.txt").read_bytes() == content
+    assert handler.range_headers == [None, f"bytes={len(content) // 2}-"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["file.txt"]
+
+
+@pytest.mark.parametrize("support_range", [True, False])
+def test_download_record_files_resume_partial_file(
+    tmp_path: Path, zenodo_server, zenodo_api_local: ZenodoAPI, support_range
+):
+    handler, _ = zenodo_server
+    handler.support_range = support_range
+    content = b"0123456789" * 1000
+    _add_files(handler, {"file.txt": content})
+    (tmp_path / f".file.txt{PARTIAL_DOWNLOAD_SUFFIX}").write_bytes(content[:1234])
+
+    zenodo_api_local.download_record_files("123456", tmp_path)
+
+    assert (tmp_path / "file.txt").read_bytes() == content
+    assert handler.range_headers == ["bytes=1234-"]
+    assert not (tmp_path / f".file.txt{PARTIAL_DOWNLOAD_SUFFIX}").exists()
+
+
+def test_download_record_files_resume_invalid_range(
+    tmp_path: Path, zenodo_server, zenodo_api_local: ZenodoAPI
+):
+    handler, _ = zenodo_server
+    content = b"0123456789" * 1000
+    _add_files(handler, {"file.txt": content})
+    # partial file longer than the file on the server
+    (tmp_path / f".file.txt{PARTIAL_DOWNLOAD_SUFFIX}").write_bytes(b"x" * 20000)
+
+    zenodo_api_local.download_record_files("123456", tmp_path)
+
+    assert (tmp_path / "file.txt").read_bytes() == content
+    assert handler.range_headers == ["bytes=20000-", None]
+
+
+def test_download_record_files_resume_checksum_mismatch(
+    tmp_path: Path, zenodo_server, zenodo_api_local: ZenodoAPI
+):
+    handler, _ = zenodo_server
+    content = b"0123456789" * 1000
+    _add_files(handler, {"file.txt": content})
+    # corrupted partial file
+    fpath_partial = tmp_path / f".file.txt{PARTIAL_DOWNLOAD_SUFFIX}"
+    fpath_partial.write_bytes(b"x" * 1234)
+
+    with pytest.raises(ChecksumError, match="Checksum mismatch"):
+        zenodo_api_local.download_record_files("123456", tmp_path)
+    assert not fpath_partial.exists()
+    assert not (tmp_path / "file.txt").exists()
+
+
+def test_download_record_files_too_many_errors(
+    tmp_path: Path, zenodo_server, zenodo_api_local: ZenodoAPI
+):
+    handler, _ = zenodo_server
+    _add_files(handler, {"file.txt": b"0123456789" * 1000})
+    handler.n_failures["file.txt"] = 3
+
+    with pytest.raises(ZenodoAPIError, match="Failed to download file"):
+        zenodo_api_local.download_record_files("123456", tmp_path)
+    assert not (tmp_path / "file.txt").exists()
+
+
+def test_download_records(tmp_path: Path, mocker: pytest_mock.MockFixture):
+    mocked_async_zenodo_api = mocker.patch("nipoppy.zenodo_api.AsyncZenodoAPI")
+    mocked_download_records = mocker.AsyncMock()
+    mocked_async_zenodo_api.return_value.__aenter__.return_value.download_records = (
+        mocked_download_records
+    )
+    output_dirs = {"123": tmp_path / "123", "456": tmp_path / "456"}
+
+    zenodo_api = ZenodoAPI(sandbox=True, password_file=PASSWORD_FILE)
+    zenodo_api.download_records(output_dirs, max_concurrency=3)
+
+    mocked_async_zenodo_api.assert_called_once_with(
+        sandbox=True,
+        password_file=PASSWORD_FILE,
+        logger=zenodo_api.logger,
+        timeout=zenodo_api.timeout,
+        max_concurrency=3,
+    )
+    mocked_download_records.assert_awaited_once_with(output_dirs)
+
+
+def _run_async_zenodo_api(api_endpoint: str, method_name: str, *args, **kwargs):
+    """Call a method of an AsyncZenodoAPI using the local stand-in server."""
+
+    async def _run():
+        async with AsyncZenodoAPI(
+            max_concurrency=kwargs.pop("max_concurrency", 8)
+        ) as async_zenodo_api:
+            await async_zenodo_api.client.aclose()
+            async_zenodo_api.client = httpx.AsyncClient(
+                base_url=api_endpoint, trust_env=False
+            )
+            return await getattr(async_zenodo_api, method_name)(*args, **kwargs)
+
+    return asyncio.run(_run())
+
+
+def test_async_init_invalid_max_concurrency():
+    with pytest.raises(ValueError, match="max_concurrency must be at least 1"):
+        AsyncZenodoAPI(max_concurrency=0)
+
+
+def test_async_init_password_file():
+    async_zenodo_api = AsyncZenodoAPI(password_file=PASSWORD_FILE)
+    assert async_zenodo_api.client.headers["Authorization"].startswith("Bearer ")
+
+
+def test_async_get_records_metadata(zenodo_server):
+    _, api_endpoint = zenodo_server
+    record_ids = ["zenodo.3", "1", "2"]
+
+    assert _run_async_zenodo_api(api_endpoint, "get_records_metadata", record_ids) == [
+        {"title": "3"},
+        {"title": "1"},
+        {"title": "2"},
+    ]
+
+
+def test_async_get_record_metadata_fails(zenodo_server):
+    _, api_endpoint = zenodo_server
+    with pytest.raises(ZenodoAPIError, match="Failed to get metadata for zenodo.bad"):
+        _run_async_zenodo_api(api_endpoint, "get_record_metadata", "bad-id")
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_async_max_concurrency(zenodo_server, max_concurrency: int):
+    handler, api_endpoint = zenodo_server
+    handler.delay = 0.05
+
+    _run_async_zenodo_api(
+        api_endpoint,
+        "get_records_metadata",
+        [str(i) for i in range(6)],
+        max_concurrency=max_concurrency,
+    )
+    assert handler.n_in_flight[1] == max_concurrency
+
+
+def test_async_download_records(tmp_path: Path, zenodo_server):
+    handler, api_endpoint = zenodo_server
+    files = {f"file{i}.txt": bytes([i]) * (1024 * 256 + i) for i in range(3)}
+    _add_files(handler, files)
+    handler.n_failures["file1.txt"] = 1
+    output_dirs = {record_id: tmp_path / record_id for record_id in ["1", "2"]}
+
+    _run_async_zenodo_api(api_endpoint, "download_records", output_dirs)
+
+    for output_dir in output_dirs.values():
+        assert sorted(path.name for path in output_dir.iterdir()) == sorted(files)
+        for key, content in files.items():
+            assert (output_dir / key).read_bytes() == content
+
+
+def test_async_download_record_files_checksum_mismatch(tmp_path: Path, zenodo_server):
+    handler, api_endpoint = zenodo_server
+    _add_files(handler, {"file.txt": b"abc"})
+    handler.checksums["file.txt"] = "0" * 32
+
+    with pytest.raises(ChecksumError, match="Checksum mismatch"):
+        _run_async_zenodo_api(api_endpoint, "download_record_files", "123456", tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "partial_content,expected_range_headers",
+    [(b"0123", ["bytes=4-"]), (b"x" * 20000, ["bytes=20000-", None])],
+)
+def test_async_download_record_files_resume_partial_file(
+    tmp_path: Path,
+    zenodo_server,
+    partial_content: bytes,
+    expected_range_headers: list,
+):
+    handler, api_endpoint = zenodo_server
+    content = b"0123456789" * 1000
+    _add_files(handler, {"file.txt": content})
+    (tmp_path / f".file.txt{PARTIAL_DOWNLOAD_SUFFIX}").write_bytes(partial_content)
+
+    _run_async_zenodo_api(api_endpoint, "download_record_files", "123456", tmp_path)
+
+    assert (tmp_path / "file.txt").read_bytes() == content
+    assert handler.range_headers == expected_range_headers
+    assert not (tmp_path / f".file.txt{PARTIAL_DOWNLOAD_SUFFIX}").exists()
+
+
+def test_async_download_record_files_too_many_errors(tmp_path: Path, zenodo_server):
+    handler, api_endpoint = zenodo_server
+    _add_files(handler, {"file.txt": b"0123456789" * 1000})
+    handler.n_failures["file.txt"] = 3
+
+    with pytest.raises(ZenodoAPIError, match="Failed to download file"):
+        _run_async_zenodo_api(api_endpoint, "download_record_files", "123456", tmp_path)
+    assert not (tmp_path / "file.txt").exists()
+
+
 def test_update_metadata(zenodo_api: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock):
     record_id = "123456"
     headers = {
@@ -777,6 +1135,20 @@ def test_search_records_status_raised(
         zenodo_api.search_records(query=query, size=size)
 
 
+def test_search_records_page(zenodo_api: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock):
+    httpx_mock.add_response(
+        url=f"{zenodo_api.api_endpoint}/records?q=&size=25&sort=mostdownloaded&page=3",
+        method="GET",
+        json={"hits": {}},
+    )
+    zenodo_api.search_records("", size=25, page=3)
+
+
+def test_search_records_wrong_page(zenodo_api: ZenodoAPI):
+    with pytest.raises(ValueError, match="page must be greater than 0"):
+        zenodo_api.search_records("", page=0)
+
+
 def test_search_records_wrong_size(zenodo_api: ZenodoAPI):
     with pytest.raises(
         ValueError,
@@ -831,6 +1203,190 @@ def test_get_record_metadata_fails(
         zenodo_api.get_record_metadata(record_id=record_id)
 
 
+@pytest.fixture(scope="function")
+def zenodo_api_cached(tmp_path: Path):
+    """Fixture for Zenodo API with an on-disk response cache."""
+    return ZenodoAPI(
+        sandbox=True, password_file=PASSWORD_FILE, cache_dir=tmp_path / "cache"
+    )
+
+
+def test_cache_disabled_by_default(
+    zenodo_api: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock
+):
+    record_id = "123456"
+    httpx_mock.add_response(
+        url=f"{zenodo_api.api_endpoint}/records/{record_id}",
+        method="GET",
+        json={"metadata": {"title": "Test Title"}},
+        is_reusable=True,
+    )
+
+    assert zenodo_api.cache_dir is None
+    zenodo_api.get_record_metadata(record_id=record_id)
+    zenodo_api.get_record_metadata(record_id=record_id)
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_cache_fresh(zenodo_api_cached: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock):
+    record_id = "123456"
+    metadata = {"title": "Test Title"}
+    httpx_mock.add_response(
+        url=f"{zenodo_api_cached.api_endpoint}/records/{record_id}",
+        method="GET",
+        json={"metadata": metadata},
+    )
+
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == metadata
+    # second call should not send a request
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == metadata
+    assert len(httpx_mock.get_requests()) == 1
+    assert len(list(zenodo_api_cached.cache_dir.glob("*.json"))) == 1
+
+
+def test_cache_revalidate(
+    zenodo_api_cached: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock
+):
+    zenodo_api_cached.cache_ttl = 0
+    record_id = "123456"
+    metadata = {"title": "Test Title"}
+    url = f"{zenodo_api_cached.api_endpoint}/records/{record_id}"
+    httpx_mock.add_response(
+        url=url,
+        method="GET",
+        json={"metadata": metadata},
+        headers={"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT"},
+    )
+    httpx_mock.add_response(
+        url=url,
+        method="GET",
+        status_code=304,
+        match_headers={
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 19 Oct 2026 00:00:00 GMT",
+        },
+    )
+
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == metadata
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == metadata
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_cache_revalidate_changed(
+    zenodo_api_cached: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock
+):
+    zenodo_api_cached.cache_ttl = 0
+    record_id = "123456"
+    url = f"{zenodo_api_cached.api_endpoint}/records/{record_id}"
+    httpx_mock.add_response(
+        url=url,
+        method="GET",
+        json={"metadata": {"title": "Old Title"}},
+        headers={"ETag": '"v1"'},
+    )
+    httpx_mock.add_response(
+        url=url,
+        method="GET",
+        json={"metadata": {"title": "New Title"}},
+        headers={"ETag": '"v2"'},
+        match_headers={"If-None-Match": '"v1"'},
+    )
+
+    zenodo_api_cached.get_record_metadata(record_id=record_id)
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == {
+        "title": "New Title"
+    }
+
+
+def test_cache_offline(
+    zenodo_api_cached: ZenodoAPI,
+    httpx_mock: pytest_httpx.HTTPXMock,
+    caplog: pytest.LogCaptureFixture,
+):
+    zenodo_api_cached.cache_ttl = 0
+    httpx_mock.add_response(
+        url=re.compile(rf"{zenodo_api_cached.api_endpoint}/records\?.*"),
+        method="GET",
+        json={"hits": {"hits": [], "total": 0}},
+    )
+    httpx_mock.add_exception(httpx.ConnectError("No network"))
+
+    results = zenodo_api_cached.search_records("mriqc")
+    assert zenodo_api_cached.search_records("mriqc") == results
+    assert "Could not connect to Zenodo" in caplog.text
+
+
+def test_cache_offline_no_entry(
+    zenodo_api_cached: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock
+):
+    httpx_mock.add_exception(httpx.ConnectError("No network"))
+
+    with pytest.raises(httpx.ConnectError):
+        zenodo_api_cached.get_record_metadata(record_id="123456")
+
+
+def test_cache_error_not_stored(
+    zenodo_api_cached: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock
+):
+    record_id = "123456"
+    httpx_mock.add_response(
+        url=f"{zenodo_api_cached.api_endpoint}/records/{record_id}",
+        method="GET",
+        status_code=500,
+        json={},
+    )
+
+    with pytest.raises(ZenodoAPIError):
+        zenodo_api_cached.get_record_metadata(record_id=record_id)
+    assert not zenodo_api_cached.cache_dir.exists()
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [{}, [], {"timestamp": "x", "content": 1}, {"timestamp": 0, "etag": 1}],
+)
+def test_cache_invalid_entry(
+    zenodo_api_cached: ZenodoAPI, httpx_mock: pytest_httpx.HTTPXMock, entry
+):
+    record_id = "123456"
+    metadata = {"title": "Test Title"}
+    httpx_mock.add_response(
+        url=f"{zenodo_api_cached.api_endpoint}/records/{record_id}",
+        method="GET",
+        json={"metadata": metadata},
+        is_reusable=True,
+    )
+    zenodo_api_cached.get_record_metadata(record_id=record_id)
+    fpaths_entry = list(zenodo_api_cached.cache_dir.rglob("*.json"))
+    assert len(fpaths_entry) == 1
+    fpaths_entry[0].write_text(json.dumps(entry))
+
+    # malformed entry is treated as a cache miss and overwritten
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == metadata
+    assert len(httpx_mock.get_requests()) == 2
+    assert json.loads(fpaths_entry[0].read_text())["content"]
+
+
+def test_cache_write_error_removes_temp_file(
+    zenodo_api_cached: ZenodoAPI,
+    httpx_mock: pytest_httpx.HTTPXMock,
+    mocker: pytest_mock.MockerFixture,
+):
+    record_id = "123456"
+    metadata = {"title": "Test Title"}
+    httpx_mock.add_response(
+        url=f"{zenodo_api_cached.api_endpoint}/records/{record_id}",
+        method="GET",
+        json={"metadata": metadata},
+    )
+    mocker.patch("nipoppy.zenodo_api.os.replace", side_effect=OSError("Disk full"))
+
+    assert zenodo_api_cached.get_record_metadata(record_id=record_id) == metadata
+    assert list(zenodo_api_cached.cache_dir.rglob("*")) == [
+        path for path in zenodo_api_cached.cache_dir.rglob("*") if path.is_dir()
+    ]
+
+
 def test_close(zenodo_api: ZenodoAPI):
     """Test that close() shuts down the underlying HTTP client."""
     zenodo_api.close()
@@ -0,0 +1,242 @@
+"""Tests for the tar archive utilities."""
+
+import logging
+import os
+import tarfile
+import threading
+from pathlib import Path
+
+import pytest
+import pytest_mock
+
+from nipoppy.utils.archive import (
+    ZSTANDARD_INSTALLED,
+    IndexedTar,
+    find_tar,
+    get_fpath_tar,
+    get_fpath_tar_index,
+    get_tar_compression,
+    open_tar,
+    write_tar,
+)
+
+EXPECTED_NAMES = [
+    "my_data",
+    "my_data/dir1",
+    "my_data/dir1/file1.txt",
+    "my_data/file2.txt",
+    "my_data/link.txt",
+]
+
+
+@pytest.fixture
+def dpath_to_tar(tmp_path: Path) -> Path:
+    dpath = tmp_path / "my_data"
+    (dpath / "dir1").mkdir(parents=True)
+    (dpath / "dir1" / "file1.txt").write_text("file1")
+    (dpath / "file2.txt").write_text("file2")
+    (dpath / "link.txt").symlink_to("file2.txt")
+    return dpath
+
+
+COMPRESSIONS = [
+    None,
+    "gzip",
+    pytest.param(
+        "zstd",
+        marks=pytest.mark.skipif(
+            not ZSTANDARD_INSTALLED, reason="zstandard not installed"
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "compression,suffix",
+    [
+        (None, ".tar"),
+        ("gzip", ".tar.gz"),
+        pytest.param(
+            "zstd",
+            ".tar.zst",
+            marks=pytest.mark.skipif(
+                not ZSTANDARD_INSTALLED, reason="zstandard not installed"
+            ),
+        ),
+    ],
+)
+def test_write_tar(dpath_to_tar: Path, compression, suffix):
+    fpath_tar = write_tar(dpath_to_tar, compression=compression)
+
+    assert fpath_tar == dpath_to_tar.with_name(f"my_data{suffix}")
+    assert get_fpath_tar(dpath_to_tar, compression) == fpath_tar
+    assert find_tar(dpath_to_tar) == fpath_tar
+
+    members = {}
+    with open_tar(fpath_tar) as tar:
+        # zstd archives can only be read sequentially
+        for member in tar:
+            members[member.name] = member
+            if member.isfile():
+                assert tar.extractfile(member).read().decode() in ("file1", "file2")
+    assert list(members) == EXPECTED_NAMES
+    assert members["my_data/link.txt"].issym()
+    assert members["my_data/dir1"].isdir()
+
+    assert get_tar_compression(fpath_tar) == compression
+    assert IndexedTar(fpath_tar).getnames() == EXPECTED_NAMES
+
+    # only the archive and its index were added
+    assert sorted(os.listdir(dpath_to_tar.parent)) == sorted(
+        ["my_data", fpath_tar.name, f"{fpath_tar.name}.index.json"]
+    )
+
+
+def test_write_tar_same_as_tarfile(dpath_to_tar: Path, tmp_path: Path):
+    fpath_tar = write_tar(dpath_to_tar, tmp_path / "custom.tar", write_index=False)
+
+    fpath_expected = tmp_path / "expected.tar"
+    with tarfile.open(fpath_expected, "w") as tar:
+        tar.add(dpath_to_tar, arcname="my_data")
+    with tarfile.open(fpath_tar) as tar, tarfile.open(fpath_expected) as expected:
+        assert tar.getnames() == expected.getnames()
+
+    assert not get_fpath_tar_index(fpath_tar).exists()
+
+
+def test_write_tar_invalid_compression(dpath_to_tar: Path):
+    with pytest.raises(ValueError, match="Invalid compression"):
+        write_tar(dpath_to_tar, compression="bzip2")
+
+
+def test_write_tar_error(dpath_to_tar: Path, mocker: pytest_mock.MockFixture):
+    mocker.patch("tarfile.TarFile.addfile", side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError, match="disk full"):
+        write_tar(dpath_to_tar)
+
+    # temporary file was cleaned up
+    assert find_tar(dpath_to_tar) is None
+    assert sorted(os.listdir(dpath_to_tar.parent)) == ["my_data"]
+
+
+@pytest.mark.no_xdist
+def test_write_tar_progress(
+    dpath_to_tar: Path,
+    mocker: pytest_mock.MockFixture,
+    caplog: pytest.LogCaptureFixture,
+):
+    mocker.patch("nipoppy.utils.archive.TAR_PROGRESS_INTERVAL", 2)
+    caplog.set_level(logging.INFO)
+
+    write_tar(dpath_to_tar)
+
+    assert "Archived 2 paths" in caplog.text
+    assert "Archived 4 paths" in caplog.text
+    assert f"Archived 5 paths from {dpath_to_tar} into" in caplog.text
+
+
+def test_write_tar_parallel(tmp_path: Path):
+    dpaths = []
+    for i in range(4):
+        dpath = tmp_path / f"ses-{i}"
+        dpath.mkdir()
+        for j in range(50):
+            (dpath / f"file{j}.txt").write_text(str(j))
+        dpaths.append(dpath)
+
+    threads = [
+        threading.Thread(
+            target=write_tar, args=(dpath,), kwargs={"compression": "gzip"}
+        )
+        for dpath in dpaths
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for dpath in dpaths:
+        with open_tar(find_tar(dpath)) as tar:
+            assert len(tar.getnames()) == 51
+
+
+def test_find_tar_missing(tmp_path: Path):
+    assert find_tar(tmp_path / "missing") is None
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_indexed_tar(dpath_to_tar: Path, compression):
+    archive = IndexedTar(write_tar(dpath_to_tar, compression=compression))
+
+    assert archive.compression == compression
+    assert archive.getnames() == EXPECTED_NAMES
+    assert "my_data/file2.txt" in archive
+    assert archive.read_bytes("my_data/dir1/file1.txt") == b"file1"
+    with archive.open("my_data/file2.txt") as file:
+        assert file.read(2) == b"fi"
+        assert file.read() == b"le2"
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_indexed_tar_frames(
+    tmp_path: Path, compression, mocker: pytest_mock.MockFixture
+):
+    # small frames so that the archive has many of them
+    mocker.patch("nipoppy.utils.archive.TAR_FRAME_SIZE", 4096)
+    dpath = tmp_path / "my_data"
+    dpath.mkdir()
+    contents = {f"my_data/file{i:02}.txt": os.urandom(i * 300) for i in range(30)}
+    for name, content in contents.items():
+        (tmp_path / name).write_bytes(content)
+
+    fpath_tar = write_tar(dpath, compression=compression)
+    archive = IndexedTar(fpath_tar)
+    for name, content in reversed(contents.items()):
+        assert archive.read_bytes(name) == content
+
+    # archive can still be read sequentially
+    with open_tar(fpath_tar) as tar:
+        assert {
+            member.name: tar.extractfile(member).read()
+            for member in tar
+            if member.isfile()
+        } == contents
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_indexed_tar_no_index(dpath_to_tar: Path, tmp_path: Path, compression):
+    # archive created by another tool
+    fpath_tar = get_fpath_tar(dpath_to_tar, compression)
+    write_tar(dpath_to_tar, fpath_tar, compression=compression, write_index=False)
+
+    archive = IndexedTar(fpath_tar)
+    assert archive.getnames() == EXPECTED_NAMES
+    assert archive.read_bytes("my_data/file2.txt") == b"file2"
+
+
+def test_indexed_tar_stale_index(dpath_to_tar: Path):
+    fpath_tar = write_tar(dpath_to_tar)
+    # large enough to change the archive size
+    (dpath_to_tar / "file3.txt").write_text("file3" * 5000)
+    write_tar(dpath_to_tar, write_index=False)
+
+    archive = IndexedTar(fpath_tar)
+    assert "my_data/file3.txt" in archive
+    assert archive.read_bytes("my_data/file3.txt") == b"file3" * 5000
+
+
+def test_indexed_tar_invalid_index(dpath_to_tar: Path):
+    fpath_tar = write_tar(dpath_to_tar)
+    get_fpath_tar_index(fpath_tar).write_text("{")
+
+    assert IndexedTar(fpath_tar).getnames() == EXPECTED_NAMES
+
+
+def test_indexed_tar_open_error(dpath_to_tar: Path):
+    archive = IndexedTar(write_tar(dpath_to_tar))
+
+    with pytest.raises(KeyError, match="not found in"):
+        archive.open("my_data/missing.txt")
+    with pytest.raises(ValueError, match="is not a regular file"):
+        archive.open("my_data/dir1")
@@ -1,4 +1,5 @@
 import errno
+import os
 from contextlib import nullcontext
 from pathlib import Path
 
@@ -202,6 +203,187 @@ class TestCopy:
             check_dummy_directory_structure(dest_dir)
 
 
+class TestCopyFile:
+    @pytest.mark.parametrize("hardlink", [True, False])
+    def test_copy_file(self, tmp_path: Path, hardlink):
+        """Test copying a file with and without hard links."""
+        source = tmp_path / "source.txt"
+        source.write_text("content")
+        os.utime(source, (0, 0))
+        target = tmp_path / "target.txt"
+
+        fileops.copy_file(source, target, hardlink=hardlink)
+
+        assert target.read_text() == "content"
+        assert target.stat().st_mtime == 0
+        assert target.samefile(source) == hardlink
+
+    def test_copy_file_hardlink_fallback(
+        self, tmp_path: Path, mocker: pytest_mock.MockerFixture
+    ):
+        """Test that hard links fall back to a copy across filesystems."""
+        source = tmp_path / "source.txt"
+        source.write_text("content")
+        target = tmp_path / "target.txt"
+        mocker.patch(
+            "nipoppy.utils.fileops.os.link",
+            side_effect=OSError(errno.EXDEV, "Invalid cross-device link"),
+        )
+
+        fileops.copy_file(source, target, hardlink=True)
+
+        assert target.read_text() == "content"
+        assert not target.samefile(source)
+
+    @pytest.mark.parametrize("hardlink", [True, False])
+    def test_copy_file_existing_target(self, tmp_path: Path, hardlink):
+        """Test that an existing (e.g. partially copied) target is replaced."""
+        source = tmp_path / "source.txt"
+        source.write_text("content")
+        target = tmp_path / "target.txt"
+        target.write_text("partial")
+
+        fileops.copy_file(source, target, hardlink=hardlink)
+
+        assert target.read_text() == "content"
+        assert target.samefile(source) == hardlink
+
+    @pytest.mark.parametrize("hardlink", [True, False])
+    def test_copy_file_existing_hardlink(self, tmp_path: Path, hardlink):
+        """Test copying onto a target that is already a hard link to the source."""
+        source = tmp_path / "source.txt"
+        source.write_text("content")
+        target = tmp_path / "target.txt"
+        os.link(source, target)
+
+        fileops.copy_file(source, target, hardlink=hardlink)
+
+        # the source file was not truncated
+        assert source.read_text() == "content"
+        assert target.read_text() == "content"
+        assert target.samefile(source) == hardlink
+
+    @pytest.mark.parametrize(
+        "reflink_error,copy_file_range_error",
+        [(False, False), (True, False), (True, True)],
+    )
+    def test_copy_file_fallbacks(
+        self,
+        tmp_path: Path,
+        mocker: pytest_mock.MockerFixture,
+        reflink_error,
+        copy_file_range_error,
+    ):
+        """Test the fallbacks when reflinks/copy_file_range are not supported."""
+        source = tmp_path / "source.txt"
+        source.write_text("content" * 1000)
+        target = tmp_path / "target.txt"
+        target.write_text("old content that is longer" * 1000)
+
+        if reflink_error:
+            mocker.patch(
+                "nipoppy.utils.fileops.fcntl.ioctl",
+                side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported"),
+            )
+        if copy_file_range_error:
+            mocker.patch(
+                "nipoppy.utils.fileops.os.copy_file_range",
+                side_effect=OSError(errno.EXDEV, "Invalid cross-device link"),
+                create=True,
+            )
+
+        fileops.copy_file(source, target)
+
+        assert target.read_text() == "content" * 1000
+
+
+class TestCopyFiles:
+    def _make_sources_and_targets(self, tmp_path: Path, n_files: int):
+        """Create source files and return (source, target) pairs."""
+        (tmp_path / "source").mkdir()
+        (tmp_path / "target").mkdir()
+        sources_and_targets = []
+        for i_file in range(n_files):
+            source = tmp_path / "source" / f"{i_file}.txt"
+            source.write_text(str(i_file))
+            sources_and_targets.append((source, tmp_path / "target" / f"{i_file}.txt"))
+        return sources_and_targets
+
+    @pytest.mark.parametrize("n_jobs", [1, 4])
+    def test_copy_files(self, tmp_path: Path, n_jobs):
+        """Test copying files with one or more workers."""
+        sources_and_targets = self._make_sources_and_targets(tmp_path, 10)
+
+        assert fileops.copy_files(sources_and_targets, n_jobs=n_jobs) == 10
+        for source, target in sources_and_targets:
+            assert target.read_text() == source.read_text()
+
+    @pytest.mark.parametrize("n_jobs", [0, -1])
+    def test_copy_files_invalid_n_jobs(self, tmp_path: Path, n_jobs):
+        """Test that the number of workers is checked before copying."""
+        sources_and_targets = self._make_sources_and_targets(tmp_path, 1)
+
+        with pytest.raises(ValueError, match="n_jobs must be at least 1"):
+            fileops.copy_files(sources_and_targets, n_jobs=n_jobs)
+        assert not sources_and_targets[0][1].exists()
+
+    def test_copy_files_manifest(self, tmp_path: Path):
+        """Test that files listed in the manifest are skipped and new ones added."""
+        sources_and_targets = self._make_sources_and_targets(tmp_path, 5)
+        fpath_manifest = tmp_path / "manifest" / "copied.txt"
+
+        # simulate a previous run that copied the first 2 files
+        fpath_manifest.parent.mkdir()
+        fpath_manifest.write_text(
+            "".join(f"{target}\n" for _, target in sources_and_targets[:2])
+        )
+
+        n_copied = fileops.copy_files(
+            sources_and_targets, fpath_manifest=fpath_manifest
+        )
+        assert n_copied == 3
+        for _, target in sources_and_targets[:2]:
+            assert not target.exists()
+        for source, target in sources_and_targets[2:]:
+            assert target.read_text() == source.read_text()
+        assert fileops.read_copy_manifest(fpath_manifest) == {
+            str(target) for _, target in sources_and_targets
+        }
+
+    def test_copy_files_retries(
+        self, tmp_path: Path, mocker: pytest_mock.MockerFixture
+    ):
+        """Test that failed copies are retried."""
+        sources_and_targets = self._make_sources_and_targets(tmp_path, 1)
+        mocked_copy_file = mocker.patch(
+            "nipoppy.utils.fileops.copy_file",
+            side_effect=[OSError(errno.EIO, "I/O error"), None],
+        )
+
+        assert fileops.copy_files(sources_and_targets, n_retries=1) == 1
+        assert mocked_copy_file.call_count == 2
+
+    def test_copy_files_error(self, tmp_path: Path):
+        """Test that failed files are not added to the manifest."""
+        sources_and_targets = self._make_sources_and_targets(tmp_path, 3)
+        sources_and_targets[1][0].unlink()
+        fpath_manifest = tmp_path / "copied.txt"
+
+        with pytest.raises(FileOperationError, match="Failed to copy"):
+            fileops.copy_files(sources_and_targets, fpath_manifest=fpath_manifest)
+        assert str(sources_and_targets[1][1]) not in fileops.read_copy_manifest(
+            fpath_manifest
+        )
+
+    def test_copy_files_dry_run(self, tmp_path: Path):
+        """Test that nothing is copied in dry-run mode."""
+        sources_and_targets = self._make_sources_and_targets(tmp_path, 3)
+
+        assert fileops.copy_files(sources_and_targets, dry_run=True) == 0
+        for _, target in sources_and_targets:
+            assert not target.exists()
+
+
 class TestMoveTree:
     # Should we add an exist_ok test here too?
     def test_mv_directory(self, tmp_path: Path):
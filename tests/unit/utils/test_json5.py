@@ -4,6 +4,7 @@ from pathlib import Path
 
 import json5
 import pytest
+import pytest_mock
 
 from nipoppy.utils.json5 import (
     _find_member_by_key_path,
@@ -13,6 +14,7 @@ from nipoppy.utils.json5 import (
     _read_member_key,
     _resolve_child_span,
     _Scanner,
+    parse_json5,
     update_json5_file,
     update_json5_text,
 )
@@ -170,6 +172,41 @@ def test_update_json5_text_inserts_into_multiline_empty_object():
 """.strip()
 
 
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"A": 1, "B": [1.5, null, true], "C": {"D": "text"}}',
+        "[1, 2, 3, ]",
+        '// comment\n{"A": 1, /* block\ncomment */ "B": 2,}',
+        '{"URL": "https://example.com", "GLOB": "/*.nii.gz", // comment\n}',
+        '{"A": "escaped \\" // not a comment", "B": [1,\n]}',
+        '{"A": "trailing, ]", "B": ",}"}',
+        "{A: 'single quotes', B: 0x10, C: +1, D: .5,}",
+        "['// not a comment', 1]",
+        '{"A": NaN, "B": Infinity}',
+    ],
+)
+def test_parse_json5(text: str):
+    expected = json5.loads(text)
+    result = parse_json5(text)
+    if text.startswith('{"A": NaN'):
+        assert result["B"] == expected["B"]
+    else:
+        assert result == expected
+
+
+def test_parse_json5_plain_json_does_not_use_json5(mocker: pytest_mock.MockFixture):
+    mocked_json5_loads = mocker.patch("nipoppy.utils.json5.json5.loads")
+    assert parse_json5('{"A": [1, 2,], // comment\n}') == {"A": [1, 2]}
+    mocked_json5_loads.assert_not_called()
+
+
+@pytest.mark.parametrize("text", ['{"A": [1, }', "{A: }", "", '"unterminated'])
+def test_parse_json5_invalid(text: str):
+    with pytest.raises(ValueError):
+        parse_json5(text)
+
+
 def test_update_json5_text_raises_on_empty_key_path():
     with pytest.raises(ValueError, match="Key path cannot be empty"):
         update_json5_text('{"A": 1}', [([], "x")])
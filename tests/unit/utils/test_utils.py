@@ -7,7 +7,7 @@ from typing import Optional
 import pandas as pd
 import pytest
 
-from nipoppy.exceptions import ConfigError, JSONError, NipoppyError
+from nipoppy.exceptions import ConfigError, JSON5Error, JSONError, NipoppyError
 from nipoppy.layout import DatasetLayout
 from nipoppy.utils.utils import (
     add_path_suffix,
@@ -60,6 +60,27 @@ def test_load_json_invalid(tmp_path: Path):
         load_json(fpath_invalid)
 
 
+@pytest.mark.parametrize(
+    "text,kwargs,expected",
+    [
+        ('{"a": 1, // comment\n}', {}, {"a": 1}),
+        ("{a: 1.5}", {}, {"a": 1.5}),
+        ("{a: 1.5}", {"parse_float": str}, {"a": "1.5"}),
+    ],
+)
+def test_load_json_json5(tmp_path: Path, text: str, kwargs: dict, expected: dict):
+    fpath = tmp_path / "config.json"
+    fpath.write_text(text)
+    assert load_json(fpath, allow_json5=True, **kwargs) == expected
+
+
+def test_load_json_json5_invalid(tmp_path: Path):
+    fpath_invalid = tmp_path / "invalid.json"
+    fpath_invalid.write_text('{"a": }')
+    with pytest.raises(JSON5Error, match="invalid.json"):
+        load_json(fpath_invalid, allow_json5=True)
+
+
 def test_save_json(tmp_path: Path):
     json_object = {"a": 1, "b": 2}
     fpath = tmp_path / "test.json"
@@ -1,5 +1,6 @@
 """Tests for PipelineInstallWorkflow class."""
 
+import json
 import logging
 import shutil
 import subprocess
@@ -14,6 +15,7 @@ from nipoppy.config.main import Config
 from nipoppy.config.pipeline import ProcessingPipelineConfig
 from nipoppy.config.schema import get_current_schema_version
 from nipoppy.container import ApptainerHandler
+from nipoppy.container_store import DNAME_IMAGE_STORE, ImageStore
 from nipoppy.env import (
     ConfigType,
     ContainerCommandEnum,
@@ -262,7 +264,10 @@ def test_download_container(
         return_value=ApptainerHandler(),
     )
     mocked_run_command = mocker.patch(
-        "nipoppy.workflows.pipeline_store.install._run_command"
+        "nipoppy.workflows.pipeline_store.install._run_command",
+        side_effect=lambda command, **kwargs: Path(command.split()[2]).write_text(
+            "image"
+        ),
     )
 
     workflow._download_container(pipeline_config)
@@ -272,16 +277,121 @@ def test_download_container(
         workflow.study.config.CONTAINER_CONFIG
     )
 
-    # check that the container file was downloaded
+    # check that the container file was downloaded (to the image store)
+    image_store = ImageStore(workflow.study.layout.dpath_containers / DNAME_IMAGE_STORE)
     mocked_run_command.assert_called_once_with(
-        "apptainer pull "
-        f"{workflow.study.layout.dpath_containers / pipeline_config.CONTAINER_INFO.FILE.name}"  # noqa: E501
-        " fake_uri",
+        f"apptainer pull {image_store.get_fpath_temp('fake_uri')} fake_uri",
         dry_run=workflow.dry_run,
     )
     # first call, positional arg list, first element
     assert not isinstance(mocked_run_command.call_args[0][0][0], ContainerCommandEnum)
 
+    # check that the container file is a link to the stored image
+    fpath_container = (
+        workflow.study.layout.dpath_containers
+        / pipeline_config.CONTAINER_INFO.FILE.name
+    )
+    assert image_store.has_image("fake_uri")
+    assert fpath_container.samefile(image_store.get_fpath_image("fake_uri"))
+
+
+@pytest.mark.parametrize("verify_images", [True, False])
+def test_download_container_verify_images(
+    workflow: PipelineInstallWorkflow,
+    pipeline_config: ProcessingPipelineConfig,
+    verify_images: bool,
+    mocker: pytest_mock.MockFixture,
+):
+    workflow.verify_images = verify_images
+    mocker.patch(
+        "nipoppy.workflows.pipeline_store.install.get_container_handler",
+        return_value=ApptainerHandler(),
+    )
+    mocker.patch(
+        "nipoppy.workflows.pipeline_store.install._run_command",
+        side_effect=lambda command, **kwargs: Path(command.split()[2]).write_text(
+            "image"
+        ),
+    )
+
+    workflow._download_container(pipeline_config)
+
+    image_store = ImageStore(workflow.study.layout.dpath_containers / DNAME_IMAGE_STORE)
+    metadata = json.loads(image_store.get_fpath_metadata("fake_uri").read_text())
+    assert (metadata["sha256"] is not None) == verify_images
+
+
+@pytest.mark.parametrize("refresh_images", [True, False])
+def test_download_container_refresh_images(
+    workflow: PipelineInstallWorkflow,
+    pipeline_config: ProcessingPipelineConfig,
+    refresh_images: bool,
+    mocker: pytest_mock.MockFixture,
+):
+    workflow.refresh_images = refresh_images
+    workflow.assume_yes = True
+    mocker.patch(
+        "nipoppy.workflows.pipeline_store.install.get_container_handler",
+        return_value=ApptainerHandler(),
+    )
+    mocked_run_command = mocker.patch(
+        "nipoppy.workflows.pipeline_store.install._run_command",
+        side_effect=lambda command, **kwargs: Path(command.split()[2]).write_text(
+            "image"
+        ),
+    )
+    fpath_container = (
+        workflow.study.layout.dpath_containers
+        / pipeline_config.CONTAINER_INFO.FILE.name
+    )
+    fpath_container.parent.mkdir(parents=True, exist_ok=True)
+    fpath_container.write_text("old")
+
+    workflow._download_container(pipeline_config)
+
+    assert mocked_run_command.called == refresh_images
+    assert fpath_container.read_text() == ("image" if refresh_images else "old")
+
+
+def test_download_containers(
+    workflow: PipelineInstallWorkflow,
+    pipeline_config: ProcessingPipelineConfig,
+    mocker: pytest_mock.MockFixture,
+):
+    mocker.patch(
+        "nipoppy.workflows.pipeline_store.install.get_container_handler",
+        return_value=ApptainerHandler(),
+    )
+    mocked_status = mocker.patch(
+        "nipoppy.workflows.pipeline_store.install.CONSOLE_STDERR.status",
+    )
+    mocked_run_command = mocker.patch(
+        "nipoppy.workflows.pipeline_store.install._run_command"
+    )
+
+    pipeline_config2 = pipeline_config.model_copy(deep=True)
+    pipeline_config2.VERSION = "2.0.0"
+    pipeline_config2.CONTAINER_INFO.FILE = Path(
+        "[[NIPOPPY_DPATH_CONTAINERS]]/container2.sif"
+    )
+    pipeline_config2.CONTAINER_INFO.URI = "fake_uri2"
+
+    # same container as the first pipeline
+    pipeline_config3 = pipeline_config.model_copy(deep=True)
+    pipeline_config3.VERSION = "3.0.0"
+
+    workflow._download_containers([pipeline_config, pipeline_config2, pipeline_config3])
+
+    mocked_status.assert_called_once_with(
+        "Downloading 2 containers, this can take a while..."
+    )
+    assert sorted(
+        call[0][0].split()[-1] for call in mocked_run_command.call_args_list
+    ) == [
+        "fake_uri",
+        "fake_uri2",
+    ]
+
 
 @pytest.mark.parametrize("confirm_download", [True, False])
 def test_download_container_confirm_true(
@@ -542,3 +652,115 @@ def test_download_install_dir_exist(
         else nullcontext()
     ):
         workflow_zenodo.run_main()
+
+
+@pytest.fixture(scope="function")
+def workflow_zenodo_many(
+    tmp_path: Path, workflow: PipelineInstallWorkflow, mocker: pytest_mock.MockFixture
+):
+    workflow = PipelineInstallWorkflow(
+        dpath_root=workflow.dpath_root,
+        source=["zenodo.111", "222"],
+        zenodo_api=mocker.MagicMock(),
+        assume_yes=True,
+    )
+
+    # each record contains a different version of the test pipeline
+    def _mocked_download_records(output_dirs: dict[str, Path]):
+        for record_id, output_dir in output_dirs.items():
+            shutil.copytree(TEST_PIPELINE, output_dir, dirs_exist_ok=True)
+            fpath_config = output_dir / "config.json"
+            fpath_config.write_text(
+                fpath_config.read_text().replace(
+                    '"VERSION": "', f'"VERSION": "{record_id}-', 1
+                )
+            )
+
+    workflow.zenodo_api.download_records.side_effect = _mocked_download_records
+    return workflow
+
+
+@pytest.mark.parametrize(
+    "source,expected_zenodo_ids",
+    [(["zenodo.123"], []), (("zenodo.123", "456"), ["zenodo.123", "456"])],
+)
+def test_init_many_sources(tmp_path: Path, source, expected_zenodo_ids):
+    workflow = PipelineInstallWorkflow(
+        dpath_root=(tmp_path / "my_dataset"), source=source
+    )
+    assert workflow.zenodo_ids == expected_zenodo_ids
+    if len(expected_zenodo_ids) == 0:
+        assert workflow.zenodo_id == source[0]
+
+
+def test_run_main_many(
+    workflow_zenodo_many: PipelineInstallWorkflow, mocker: pytest_mock.MockFixture
+):
+    mocked_download_containers = mocker.patch.object(
+        workflow_zenodo_many, "_download_containers"
+    )
+
+    workflow_zenodo_many.run_main()
+
+    dpath_pipelines = workflow_zenodo_many.study.layout.dpath_pipelines
+    workflow_zenodo_many.zenodo_api.download_records.assert_called_once_with(
+        {
+            "zenodo.111": dpath_pipelines / "zenodo.111",
+            "222": dpath_pipelines / "222",
+        }
+    )
+    # containers are downloaded together after all pipelines are installed
+    mocked_download_containers.assert_called_once()
+    assert len(mocked_download_containers.call_args[0][0]) == 2
+    for record_id in ["zenodo.111", "222"]:
+        assert not (dpath_pipelines / record_id).exists()
+    assert len(list((dpath_pipelines / "processing").iterdir())) == 2
+
+
+def test_run_main_many_invalid_source(workflow_zenodo_many: PipelineInstallWorkflow):
+    workflow_zenodo_many.zenodo_ids.append("not_a_zenodo_id")
+    with pytest.raises(WorkflowError, match="Only Zenodo IDs can be used"):
+        workflow_zenodo_many.run_main()
+    workflow_zenodo_many.zenodo_api.download_records.assert_not_called()
+
+
+def test_run_main_many_invalid_record(
+    workflow_zenodo_many: PipelineInstallWorkflow, mocker: pytest_mock.MockFixture
+):
+    # second record is not a valid pipeline bundle
+    def _mocked_download_records(output_dirs: dict[str, Path]):
+        for i_record, output_dir in enumerate(output_dirs.values()):
+            if i_record == 0:
+                shutil.copytree(TEST_PIPELINE, output_dir, dirs_exist_ok=True)
+            else:
+                output_dir.mkdir(parents=True)
+
+    workflow_zenodo_many.zenodo_api.download_records.side_effect = (
+        _mocked_download_records
+    )
+    workflow_zenodo_many.zenodo_api.api_endpoint = "https://zenodo.org/api"
+
+    with pytest.raises(
+        ConfigError, match="Make sure the record at https://zenodo.org/records/222"
+    ):
+        workflow_zenodo_many.run_main()
+
+    # nothing should have been installed
+    assert not (
+        workflow_zenodo_many.study.layout.dpath_pipelines / "processing"
+    ).exists()
+
+
+def test_run_main_many_same_pipeline(
+    workflow_zenodo_many: PipelineInstallWorkflow,
+):
+    def _mocked_download_records(output_dirs: dict[str, Path]):
+        for output_dir in output_dirs.values():
+            shutil.copytree(TEST_PIPELINE, output_dir, dirs_exist_ok=True)
+
+    workflow_zenodo_many.zenodo_api.download_records.side_effect = (
+        _mocked_download_records
+    )
+
+    with pytest.raises(WorkflowError, match="Several records contain pipeline"):
+        workflow_zenodo_many.run_main()
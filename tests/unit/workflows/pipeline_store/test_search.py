@@ -1,6 +1,8 @@
 """Tests for PipelineSearchWorkflow class."""
 
 import logging
+import sqlite3
+from pathlib import Path
 
 import pandas as pd
 import pytest
@@ -8,6 +10,7 @@ import pytest_mock
 from rich.table import Table
 
 from nipoppy.env import ZENODO_COMMUNITY_ID
+from nipoppy.pipeline_catalog import PipelineCatalog
 from nipoppy.workflows.pipeline_store.search import PipelineSearchWorkflow
 
 
@@ -179,3 +182,98 @@ def test_run_main_all_results(
     workflow.run()
 
     assert "(use --size to show more)" not in caplog.text
+
+
+def test_hits_to_df_installed(workflow: PipelineSearchWorkflow):
+    hits = [{"id": None, "title": "my_pipeline-1.0.0", "metadata": {}}]
+    df = workflow._hits_to_df(hits)
+    assert df.iloc[0]["Zenodo ID"] == "-"
+
+
+@pytest.mark.no_xdist
+@pytest.mark.parametrize("community", [True, False])
+def test_run_main_catalog(
+    workflow: PipelineSearchWorkflow,
+    community: bool,
+    hits: list[dict],
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+):
+    hits[0]["metadata"]["communities"] = [{"id": ZENODO_COMMUNITY_ID}]
+    workflow.catalog = PipelineCatalog(tmp_path / "catalog.sqlite")
+    workflow.catalog.add_zenodo_records(hits, replace=True)
+    workflow.query = "pipeline"
+    workflow.community = community
+
+    workflow.run()
+
+    workflow.zenodo_api.search_records.assert_not_called()
+    assert "Showing results from the local pipeline catalog" in caplog.text
+    if community:
+        assert "Showing 1 of 1 results" in caplog.text
+    else:
+        assert "Showing 1 of 2 results" in caplog.text
+
+
+@pytest.mark.no_xdist
+@pytest.mark.parametrize("live,synced", [(True, True), (False, False)])
+def test_run_main_catalog_live(
+    workflow: PipelineSearchWorkflow,
+    live: bool,
+    synced: bool,
+    hits: list[dict],
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+):
+    workflow.catalog = PipelineCatalog(tmp_path / "catalog.sqlite")
+    if synced:
+        workflow.catalog.add_zenodo_records([], replace=True)
+    workflow.live = live
+    workflow.zenodo_api.search_records.return_value = {"hits": hits, "total": 2}
+
+    workflow.run()
+
+    workflow.zenodo_api.search_records.assert_called_once()
+    if not synced:
+        assert "The local pipeline catalog is empty" in caplog.text
+    # live results are only added to a synced catalog
+    assert workflow.catalog.search("")["total"] == (len(hits) if synced else 0)
+
+
+def test_run_main_catalog_no_update(
+    workflow: PipelineSearchWorkflow, hits: list[dict], tmp_path: Path
+):
+    workflow.catalog = PipelineCatalog(tmp_path / "catalog.sqlite")
+    workflow.catalog.add_zenodo_records([], replace=True)
+    workflow.live = True
+    workflow.update_catalog = False
+    workflow.zenodo_api.search_records.return_value = {"hits": hits, "total": 2}
+
+    workflow.run()
+
+    assert workflow.catalog.search("")["total"] == 0
+
+
+@pytest.mark.no_xdist
+def test_run_main_catalog_update_error(
+    workflow: PipelineSearchWorkflow,
+    hits: list[dict],
+    tmp_path: Path,
+    mocker: pytest_mock.MockerFixture,
+    caplog: pytest.LogCaptureFixture,
+):
+    caplog.set_level(logging.DEBUG)
+    workflow.catalog = PipelineCatalog(tmp_path / "catalog.sqlite")
+    workflow.catalog.add_zenodo_records([], replace=True)
+    mocker.patch.object(
+        workflow.catalog,
+        "add_zenodo_records",
+        side_effect=sqlite3.OperationalError("database is locked"),
+    )
+    workflow.live = True
+    workflow.zenodo_api.search_records.return_value = {"hits": hits, "total": 2}
+
+    workflow.run()
+
+    assert "Could not update the local pipeline catalog" in caplog.text
+    assert "Showing 1 of 2 results" in caplog.text
@@ -0,0 +1,92 @@
+"""Tests for PipelineSyncWorkflow class."""
+
+from pathlib import Path
+
+import pytest
+import pytest_mock
+
+from nipoppy.env import PipelineTypeEnum
+from nipoppy.exceptions import ConfigError
+from nipoppy.layout import DatasetLayout
+from nipoppy.pipeline_catalog import PipelineCatalog
+from nipoppy.workflows.pipeline_store.sync import PipelineSyncWorkflow
+from tests.conftest import create_pipeline_config_files
+
+
+@pytest.fixture(scope="function")
+def workflow(tmp_path: Path, mocker: pytest_mock.MockerFixture):
+    return PipelineSyncWorkflow(
+        catalog=PipelineCatalog(tmp_path / "catalog.sqlite"),
+        zenodo_api=mocker.MagicMock(),
+    )
+
+
+def _mock_search_records(workflow: PipelineSyncWorkflow, n_hits: int, size: int):
+    hits = [
+        {"id": i, "title": f"pipeline-{i}", "stats": {"downloads": i}}
+        for i in range(n_hits)
+    ]
+
+    def _search_records(query, keywords, size, page):
+        return {"hits": hits[(page - 1) * size : page * size], "total": len(hits)}
+
+    workflow.zenodo_api.search_records.side_effect = _search_records
+
+
+@pytest.mark.parametrize("n_hits", [0, 3, 25, 60])
+def test_run_main(workflow: PipelineSyncWorkflow, n_hits: int):
+    _mock_search_records(workflow, n_hits, size=25)
+
+    workflow.run_main()
+
+    assert workflow.catalog.last_sync is not None
+    assert workflow.catalog.search("")["total"] == n_hits
+    assert workflow.zenodo_api.search_records.call_count == max(1, -(-n_hits // 25))
+
+
+def test_run_main_dry_run(workflow: PipelineSyncWorkflow):
+    _mock_search_records(workflow, 3, size=25)
+    workflow.dry_run = True
+
+    workflow.run_main()
+
+    assert not workflow.catalog.fpath.exists()
+
+
+def test_run_main_installed(workflow: PipelineSyncWorkflow, tmp_path: Path):
+    _mock_search_records(workflow, 3, size=25)
+    workflow.dpath_root = tmp_path / "my_dataset"
+    layout = DatasetLayout(workflow.dpath_root)
+    create_pipeline_config_files(
+        layout.dpath_pipelines,
+        processing_pipelines=[{"NAME": "proc_pipeline", "VERSION": "1.0.0"}],
+        bidsification_pipelines=[{"NAME": "bids_pipeline", "VERSION": "2.0.0"}],
+    )
+
+    workflow.run_main()
+
+    assert workflow.catalog.search("")["total"] == 5
+    hit = workflow.catalog.search("proc_pipeline")["hits"][0]
+    assert hit["path"] == str(
+        layout.get_dpath_pipeline_bundle(
+            PipelineTypeEnum.PROCESSING, "proc_pipeline", "1.0.0"
+        )
+    )
+    assert "pipeline_type:processing" in hit["metadata"]["keywords"]
+
+
+def test_run_main_installed_invalid(workflow: PipelineSyncWorkflow, tmp_path: Path):
+    _mock_search_records(workflow, 0, size=25)
+    workflow.dpath_root = tmp_path / "my_dataset"
+    layout = DatasetLayout(workflow.dpath_root)
+    fpath_config = layout.dpath_pipelines / "processing" / "bad-1.0.0" / "config.json"
+    fpath_config.parent.mkdir(parents=True)
+    fpath_config.write_text("{}")
+
+    with pytest.raises(ConfigError, match="Error when loading pipeline config"):
+        workflow.run_main()
+
+
+def test_run_cleanup(workflow: PipelineSyncWorkflow):
+    workflow.run_cleanup()
+    workflow.zenodo_api.close.assert_called_once()
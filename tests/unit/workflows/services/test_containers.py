@@ -0,0 +1,372 @@
+"""Tests for the container services."""
+
+import fcntl
+import os
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+import pytest_mock
+
+from nipoppy.container import ApptainerHandler
+from nipoppy.container_store import ImageStore
+from nipoppy.exceptions import ContainerError
+from nipoppy.workflows.base import _run_command
+from nipoppy.workflows.services.containers import (
+    ContainerInstancePool,
+    ContainerPullManager,
+)
+
+
+@pytest.fixture
+def fpath_calls(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Put a fake apptainer executable in PATH that records its arguments."""
+    dpath_bin = tmp_path / "bin"
+    dpath_bin.mkdir()
+    fpath_calls = tmp_path / "calls.txt"
+    fpath_executable = dpath_bin / "apptainer"
+    fpath_executable.write_text(f'#!/bin/sh\necho "$@" >> {fpath_calls}\n')
+    fpath_executable.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{dpath_bin}{os.pathsep}{os.environ['PATH']}")
+    return fpath_calls
+
+
+@pytest.fixture
+def pool() -> ContainerInstancePool:
+    return ContainerInstancePool(
+        name_prefix="nipoppy-my pipeline", run_command=_run_command
+    )
+
+
+def _get_handler(
+    tmp_path: Path, dname_bind: str = "data", var1: str = "1"
+) -> ApptainerHandler:
+    handler = ApptainerHandler()
+    handler.add_bind_arg(tmp_path / dname_bind)
+    handler.add_env_arg("VAR1", var1)
+    return handler
+
+
+def test_name_prefix(pool: ContainerInstancePool):
+    assert pool.name_prefix == f"nipoppy-my_pipeline-{os.getpid()}"
+
+
+def test_get_exec_args(pool: ContainerInstancePool, fpath_calls: Path, tmp_path: Path):
+    name = f"{pool.name_prefix}-0"
+
+    for _ in range(3):
+        assert pool.get_exec_args(_get_handler(tmp_path), "image.sif") == [
+            "apptainer",
+            "exec",
+            "--env",
+            "VAR1=1",
+            f"instance://{name}",
+        ]
+    pool.stop_all()
+
+    assert fpath_calls.read_text().splitlines() == [
+        f"instance start --bind {tmp_path / 'data'}:{tmp_path / 'data'}:rw "
+        f"image.sif {name}",
+        f"instance stop {name}",
+    ]
+
+
+def test_get_exec_args_restart(
+    pool: ContainerInstancePool, fpath_calls: Path, tmp_path: Path
+):
+    pool.get_exec_args(_get_handler(tmp_path), "image.sif")
+    exec_args = pool.get_exec_args(_get_handler(tmp_path, "other"), "image.sif")
+    assert exec_args[-1] == f"instance://{pool.name_prefix}-1"
+    pool.stop_all()
+
+    calls = fpath_calls.read_text().splitlines()
+    assert [call.split()[:2] for call in calls] == [
+        ["instance", "start"],
+        ["instance", "stop"],
+        ["instance", "start"],
+        ["instance", "stop"],
+    ]
+    assert calls[1] == f"instance stop {pool.name_prefix}-0"
+    assert calls[3] == f"instance stop {pool.name_prefix}-1"
+
+
+def test_get_exec_args_env_changed(
+    pool: ContainerInstancePool, fpath_calls: Path, tmp_path: Path
+):
+    name = f"{pool.name_prefix}-0"
+
+    for var1 in ["1", "2"]:
+        assert pool.get_exec_args(_get_handler(tmp_path, var1=var1), "image.sif") == [
+            "apptainer",
+            "exec",
+            "--env",
+            f"VAR1={var1}",
+            f"instance://{name}",
+        ]
+    pool.stop_all()
+
+    # the instance is not restarted
+    calls = fpath_calls.read_text().splitlines()
+    assert [call.split()[:2] for call in calls] == [
+        ["instance", "start"],
+        ["instance", "stop"],
+    ]
+
+
+def test_get_exec_args_one_instance_per_thread(
+    pool: ContainerInstancePool, fpath_calls: Path, tmp_path: Path
+):
+    instances = []
+
+    def get_instance():
+        instances.append(pool.get_exec_args(_get_handler(tmp_path), "image.sif")[-1])
+
+    threads = [threading.Thread(target=get_instance) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    get_instance()
+
+    assert len(set(instances)) == 3
+    pool.stop_all()
+    assert len(fpath_calls.read_text().splitlines()) == 6
+
+
+def test_get_exec_args_dry_run(fpath_calls: Path, tmp_path: Path):
+    pool = ContainerInstancePool("nipoppy", run_command=_run_command, dry_run=True)
+    pool.get_exec_args(_get_handler(tmp_path), "image.sif")
+    pool.stop_all()
+    assert not fpath_calls.exists()
+
+
+def test_get_exec_args_start_error(
+    pool: ContainerInstancePool, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    mocker.patch.object(
+        pool, "run_command", side_effect=subprocess.CalledProcessError(1, "")
+    )
+    mocker.patch("nipoppy.container.shutil.which", return_value=True)
+    with pytest.raises(ContainerError, match="Failed to start container instance"):
+        pool.get_exec_args(_get_handler(tmp_path), "image.sif")
+
+
+def test_stop_all_error(
+    pool: ContainerInstancePool,
+    fpath_calls: Path,
+    tmp_path: Path,
+    mocker: pytest_mock.MockFixture,
+    caplog: pytest.LogCaptureFixture,
+):
+    pool.get_exec_args(_get_handler(tmp_path), "image.sif")
+    mocker.patch.object(
+        pool, "run_command", side_effect=subprocess.CalledProcessError(1, "")
+    )
+    pool.stop_all()
+    assert "Failed to stop container instance" in caplog.text
+
+
+@pytest.fixture
+def fpath_pull_calls(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Put a fake apptainer executable in PATH that creates pulled files."""
+    dpath_bin = tmp_path / "bin"
+    dpath_bin.mkdir()
+    fpath_calls = tmp_path / "pull_calls.txt"
+    fpath_executable = dpath_bin / "apptainer"
+    fpath_executable.write_text(
+        f'#!/bin/sh\necho "$@" >> {fpath_calls}\n'
+        'if [ "$1" = pull ]; then echo image > "$2"; fi\n'
+    )
+    fpath_executable.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{dpath_bin}{os.pathsep}{os.environ['PATH']}")
+    return fpath_calls
+
+
+@pytest.fixture
+def pull_manager() -> ContainerPullManager:
+    return ContainerPullManager(run_command=_run_command)
+
+
+def test_pull(
+    pull_manager: ContainerPullManager, fpath_pull_calls: Path, tmp_path: Path
+):
+    fpath_container = tmp_path / "containers" / "image.sif"
+
+    assert pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container)
+    assert fpath_container.read_text() == "image\n"
+    assert fpath_pull_calls.read_text().splitlines() == [
+        f"pull {fpath_container.parent / f'.image.sif.{os.getpid()}'} docker://image"
+    ]
+
+    # already downloaded
+    assert not pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container)
+    assert len(fpath_pull_calls.read_text().splitlines()) == 1
+
+    # only the image and lock files are left
+    assert sorted(path.name for path in fpath_container.parent.iterdir()) == [
+        ".image.sif.lock",
+        "image.sif",
+    ]
+
+
+def test_pull_dry_run(fpath_pull_calls: Path, tmp_path: Path):
+    pull_manager = ContainerPullManager(run_command=_run_command, dry_run=True)
+    fpath_container = tmp_path / "containers" / "image.sif"
+    assert pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container)
+    assert not fpath_container.parent.exists()
+    assert not fpath_pull_calls.exists()
+
+
+def test_pull_error(
+    pull_manager: ContainerPullManager, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    mocker.patch.object(
+        pull_manager, "run_command", side_effect=subprocess.CalledProcessError(1, "")
+    )
+    fpath_container = tmp_path / "image.sif"
+    with pytest.raises(ContainerError, match="Failed to download container"):
+        pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container)
+    assert not fpath_container.exists()
+
+
+def test_pull_waits_for_lock(
+    pull_manager: ContainerPullManager, fpath_pull_calls: Path, tmp_path: Path
+):
+    fpath_container = tmp_path / "image.sif"
+    results = []
+
+    # simulate another process pulling the same image
+    with open(tmp_path / ".image.sif.lock", "a") as file_lock:
+        fcntl.flock(file_lock, fcntl.LOCK_EX)
+        thread = threading.Thread(
+            target=lambda: results.append(
+                pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container)
+            )
+        )
+        thread.start()
+        thread.join(timeout=0.5)
+        assert thread.is_alive()
+        fpath_container.touch()
+    thread.join()
+
+    assert results == [False]
+    assert not fpath_pull_calls.exists()
+
+
+def test_pull_all(
+    pull_manager: ContainerPullManager, fpath_pull_calls: Path, tmp_path: Path
+):
+    images = [
+        ("docker://image1", tmp_path / "image1.sif"),
+        ("docker://image2", tmp_path / "image2.sif"),
+        ("docker://image1", tmp_path / "image1.sif"),
+    ]
+    assert sorted(pull_manager.pull_all(ApptainerHandler(), images)) == [
+        False,
+        True,
+        True,
+    ]
+    assert len(fpath_pull_calls.read_text().splitlines()) == 2
+    assert pull_manager.pull_all(ApptainerHandler(), []) == []
+
+
+def test_pull_image_store(fpath_pull_calls: Path, tmp_path: Path):
+    image_store = ImageStore(tmp_path / "store")
+    pull_manager = ContainerPullManager(
+        run_command=_run_command, image_store=image_store
+    )
+    fpath_container1 = tmp_path / "dataset1" / "image.sif"
+    fpath_container2 = tmp_path / "dataset2" / "image_other_name.sif"
+
+    assert pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container1)
+    assert not pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container2)
+
+    # image is only pulled once, into the store
+    assert fpath_pull_calls.read_text().splitlines() == [
+        f"pull {image_store.get_fpath_temp('docker://image')} docker://image"
+    ]
+    fpath_image = image_store.get_fpath_image("docker://image")
+    assert fpath_container1.samefile(fpath_image)
+    assert fpath_container2.samefile(fpath_image)
+
+
+def test_pull_image_store_corrupted(fpath_pull_calls: Path, tmp_path: Path):
+    image_store = ImageStore(tmp_path / "store")
+    pull_manager = ContainerPullManager(
+        run_command=_run_command, image_store=image_store
+    )
+    pull_manager.pull(ApptainerHandler(), "docker://image", tmp_path / "image1.sif")
+
+    # simulate a truncated image
+    fpath_image = image_store.get_fpath_image("docker://image")
+    fpath_image.write_text("")
+
+    assert pull_manager.pull(
+        ApptainerHandler(), "docker://image", tmp_path / "image2.sif"
+    )
+    assert len(fpath_pull_calls.read_text().splitlines()) == 2
+    assert (tmp_path / "image2.sif").read_text() == "image\n"
+
+
+@pytest.mark.parametrize("verify_images,expected_n_pulls", [(False, 1), (True, 2)])
+def test_pull_image_store_verify_images(
+    fpath_pull_calls: Path, tmp_path: Path, verify_images: bool, expected_n_pulls
+):
+    image_store = ImageStore(tmp_path / "store")
+    pull_manager = ContainerPullManager(
+        run_command=_run_command, image_store=image_store, verify_images=verify_images
+    )
+    pull_manager.pull(ApptainerHandler(), "docker://image", tmp_path / "image1.sif")
+
+    # simulate a corrupted image with the expected size
+    fpath_image = image_store.get_fpath_image("docker://image")
+    fpath_image.write_text("IMAGE\n")
+
+    pull_manager.pull(ApptainerHandler(), "docker://image", tmp_path / "image2.sif")
+    assert len(fpath_pull_calls.read_text().splitlines()) == expected_n_pulls
+    assert (tmp_path / "image2.sif").read_text() == (
+        "image\n" if verify_images else "IMAGE\n"
+    )
+
+
+def test_pull_image_store_refresh_images(
+    fpath_pull_calls: Path, tmp_path: Path, caplog: pytest.LogCaptureFixture
+):
+    image_store = ImageStore(tmp_path / "store")
+    ContainerPullManager(run_command=_run_command, image_store=image_store).pull(
+        ApptainerHandler(), "docker://image", tmp_path / "image1.sif"
+    )
+    # simulate an outdated image (with the same size)
+    image_store.get_fpath_image("docker://image").write_text("IMAGE\n")
+
+    # stored image is reused by default
+    assert not ContainerPullManager(
+        run_command=_run_command, image_store=image_store
+    ).pull(ApptainerHandler(), "docker://image", tmp_path / "image2.sif")
+    assert "Using stored container image for docker://image (age: " in caplog.text
+    assert (tmp_path / "image2.sif").read_text() == "IMAGE\n"
+
+    # with refresh_images, the image is pulled again (only once per manager)
+    pull_manager = ContainerPullManager(
+        run_command=_run_command, image_store=image_store, refresh_images=True
+    )
+    assert pull_manager.pull(
+        ApptainerHandler(), "docker://image", tmp_path / "image2.sif"
+    )
+    assert not pull_manager.pull(
+        ApptainerHandler(), "docker://image", tmp_path / "image3.sif"
+    )
+    assert len(fpath_pull_calls.read_text().splitlines()) == 2
+    for fname in ["image2.sif", "image3.sif"]:
+        assert (tmp_path / fname).read_text() == "image\n"
+    assert image_store.get_fpath_image("docker://image").read_text() == "image\n"
+
+
+def test_pull_refresh_images_no_store(fpath_pull_calls: Path, tmp_path: Path):
+    fpath_container = tmp_path / "image.sif"
+    fpath_container.write_text("old\n")
+
+    pull_manager = ContainerPullManager(run_command=_run_command, refresh_images=True)
+    assert pull_manager.pull(ApptainerHandler(), "docker://image", fpath_container)
+    assert fpath_container.read_text() == "image\n"
@@ -2,6 +2,8 @@
 
 import logging
 import shutil
+import tarfile
+import zipfile
 from pathlib import Path
 
 import pytest
@@ -15,7 +17,14 @@ from nipoppy.utils.bids import (
     participant_id_to_bids_participant_id,
     session_id_to_bids_session_id,
 )
-from nipoppy.workflows.dicom_reorg import DicomReorgWorkflow, is_derived_dicom
+from nipoppy.workflows.dicom_reorg import (
+    DicomReorgWorkflow,
+    is_archive,
+    is_derived_dicom,
+    iter_archive_members,
+    load_dicom_index,
+    read_dicom_tags,
+)
 from tests.conftest import (
     DPATH_TEST_DATA,
     create_empty_dataset,
@@ -51,6 +60,116 @@ def test_is_derived_dicom(fpath, expected_result):
     assert is_derived_dicom(fpath) == expected_result
 
 
+def test_is_derived_dicom_header_only(mocker: pytest_mock.MockerFixture):
+    mocked_dcmread = mocker.patch(
+        "nipoppy.workflows.dicom_reorg.pydicom.dcmread",
+        return_value=mocker.Mock(ImageType=["ORIGINAL", "PRIMARY"]),
+    )
+    assert not is_derived_dicom("fake.dcm")
+    mocked_dcmread.assert_called_once_with(
+        "fake.dcm", stop_before_pixels=True, specific_tags=["ImageType"]
+    )
+
+
+def test_read_dicom_tags():
+    assert read_dicom_tags(
+        DPATH_TEST_DATA / "dicom-not_derived.dcm",
+        ["SeriesDescription", "ImageType", "AcquisitionTime"],
+    ) == {
+        "SeriesDescription": "localizer",
+        "ImageType": "ORIGINAL\\PRIMARY\\M\\NONE",
+        "AcquisitionTime": None,
+    }
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize(
+    "check_dicoms_per_series,expected_n_reads,expected",
+    [
+        (False, 5, {"series1/3.dcm": 1, "series2/1.dcm": 1, "series2/2.dcm": 1}),
+        (True, 2, {"series2/1.dcm": 2}),
+    ],
+)
+def test_get_derived_dicoms(
+    workflow: DicomReorgWorkflow,
+    check_dicoms_per_series,
+    expected_n_reads,
+    expected,
+    n_jobs,
+    mocker: pytest_mock.MockerFixture,
+):
+    workflow.check_dicoms_per_series = check_dicoms_per_series
+    workflow.n_jobs = n_jobs
+    fpaths = [
+        Path(fpath)
+        for fpath in [
+            "series1/1.dcm",
+            "series1/2.dcm",
+            "series1/3.dcm",
+            "series2/1.dcm",
+            "series2/2.dcm",
+        ]
+    ]
+    mocked_is_derived_dicom = mocker.patch(
+        "nipoppy.workflows.dicom_reorg.is_derived_dicom",
+        side_effect=lambda fpath: fpath
+        in (Path("series1/3.dcm"), Path("series2/1.dcm"), Path("series2/2.dcm")),
+    )
+
+    assert workflow.get_derived_dicoms(fpaths) == {
+        Path(fpath): n_files for fpath, n_files in expected.items()
+    }
+    assert mocked_is_derived_dicom.call_count == expected_n_reads
+
+
+def _create_archive(fpath_archive: Path, members: dict[str, str]):
+    """Create a ZIP or TAR archive with the given member paths and contents."""
+    dpath_content = fpath_archive.parent / f"{fpath_archive.name}_content"
+    for member_name, content in members.items():
+        (dpath_content / member_name).parent.mkdir(parents=True, exist_ok=True)
+        (dpath_content / member_name).write_text(content)
+
+    if fpath_archive.suffix == ".zip":
+        with zipfile.ZipFile(fpath_archive, "w") as zip_file:
+            for member_name in members:
+                zip_file.write(dpath_content / member_name, member_name)
+    else:
+        compression = (
+            fpath_archive.suffix.lstrip(".") if fpath_archive.suffix != ".tar" else ""
+        )
+        with tarfile.open(fpath_archive, f"w:{compression}") as tar_file:
+            for member_name in members:
+                tar_file.add(dpath_content / member_name, member_name)
+    shutil.rmtree(dpath_content)
+
+
+@pytest.mark.parametrize(
+    "fpath,expected",
+    [
+        ("dicoms.zip", True),
+        ("dicoms.TAR.GZ", True),
+        ("dir/dicoms.tgz", True),
+        ("dicoms.tar.xz", True),
+        ("dicoms.dcm", False),
+        ("dicoms.gz", False),
+    ],
+)
+def test_is_archive(fpath, expected):
+    assert is_archive(fpath) == expected
+
+
+@pytest.mark.parametrize("fname_archive", ["archive.zip", "archive.tar.gz"])
+def test_iter_archive_members(tmp_path: Path, fname_archive):
+    members = {"series1/1.dcm": "a", "series1/2.dcm": "b", "series2/1.dcm": "c"}
+    fpath_archive = tmp_path / fname_archive
+    _create_archive(fpath_archive, members)
+
+    assert {
+        member_name: file.read().decode()
+        for member_name, file in iter_archive_members(fpath_archive)
+    } == members
+
+
 @pytest.mark.parametrize(
     "participant_id,session_id,fpaths,participant_first",
     [
@@ -86,6 +205,27 @@ def test_get_fpaths_to_reorg(
     ) == len(fpaths)
 
 
+@pytest.mark.parametrize("extract_archives", [True, False])
+def test_get_fpaths_to_reorg_archive_file(
+    workflow: DicomReorgWorkflow, extract_archives: bool
+):
+    workflow.extract_archives = extract_archives
+    workflow.dicom_dir_map = DicomDirMap(
+        data={
+            DicomDirMap.col_participant_id: ["01"],
+            DicomDirMap.col_session_id: ["1"],
+            DicomDirMap.col_participant_dicom_dir: ["01/1.zip"],
+        }
+    )
+    fpath_archive = workflow.study.layout.dpath_pre_reorg / "01" / "1.zip"
+    fpath_archive.parent.mkdir(parents=True)
+    fpath_archive.touch()
+
+    assert workflow.get_fpaths_to_reorg(participant_id="01", session_id="1") == (
+        [fpath_archive] if extract_archives else []
+    )
+
+
 def test_get_fpaths_to_reorg_error_not_found(workflow: DicomReorgWorkflow):
     participant_id = "XXX"
     session_id = "X"
@@ -171,6 +311,361 @@ def test_run_single_error_file_exists(workflow: DicomReorgWorkflow):
         workflow.run_single(participant_id, session_id)
 
 
+def test_run_single_error_collision_within_run(workflow: DicomReorgWorkflow):
+    participant_id = "01"
+    session_id = "1"
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+
+    # same file name in two directories, with a mapping that ignores the directory
+    for dname in ("dirA", "dirB"):
+        fpath = (
+            workflow.study.layout.dpath_pre_reorg
+            / participant_id
+            / session_id
+            / dname
+            / "test.dcm"
+        )
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.touch()
+    workflow.apply_fname_mapping = (
+        lambda fpath_source, participant_id, session_id: Path(fpath_source).name
+    )
+
+    with pytest.raises(FileOperationError, match="Cannot move file"):
+        workflow.run_single(participant_id, session_id)
+
+
+def test_run_single_symlinks(workflow: DicomReorgWorkflow):
+    participant_id = "01"
+    session_id = "1"
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+
+    fpaths_source = []
+    for relative_path in ("dirA/1.dcm", "dirA/2.dcm", "dirB/dirC/1.dcm"):
+        fpath = (
+            workflow.study.layout.dpath_pre_reorg
+            / participant_id
+            / session_id
+            / relative_path
+        )
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(relative_path)
+        fpaths_source.append(fpath)
+
+    workflow.run_single(participant_id, session_id)
+
+    dpath_reorganized = (
+        workflow.study.layout.dpath_post_reorg
+        / participant_id_to_bids_participant_id(participant_id)
+        / session_id_to_bids_session_id(session_id)
+    )
+    for fpath_source in fpaths_source:
+        fpath_dest = dpath_reorganized / workflow.apply_fname_mapping(
+            fpath_source, participant_id=participant_id, session_id=session_id
+        )
+        assert fpath_dest.is_symlink()
+        assert not Path(fpath_dest.readlink()).is_absolute()
+        assert fpath_dest.resolve() == fpath_source.resolve()
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_run_single_dicom_index(workflow: DicomReorgWorkflow, n_jobs):
+    workflow.dicom_index = True
+    workflow.n_jobs = n_jobs
+    participant_id = "01"
+    session_id = "1"
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+
+    dpath_source = workflow.study.layout.dpath_pre_reorg / participant_id / session_id
+    dpath_source.mkdir(parents=True)
+    shutil.copy2(DPATH_TEST_DATA / "dicom-derived.dcm", dpath_source / "1.dcm")
+    shutil.copy2(DPATH_TEST_DATA / "dicom-not_derived.dcm", dpath_source / "2.dcm")
+    (dpath_source / "3.txt").write_text("not a DICOM file")
+
+    workflow.run_single(participant_id, session_id)
+
+    fpath_index = workflow.dpath_dicom_index / (
+        f"{participant_id_to_bids_participant_id(participant_id)}_"
+        f"{session_id_to_bids_session_id(session_id)}.parquet"
+    )
+    assert fpath_index.exists()
+
+    df_index = load_dicom_index(workflow.dpath_dicom_index)
+    assert len(df_index) == 3
+    assert set(df_index["participant_id"]) == {participant_id}
+    assert set(df_index["session_id"]) == {session_id}
+    for path in df_index["path"]:
+        assert (workflow.study.layout.dpath_post_reorg / path).exists()
+    assert set(df_index["SeriesDescription"].dropna()) == {
+        "Postprocessing",
+        "localizer",
+    }
+    assert set(df_index["ImageType"].dropna()) == {
+        "DERIVED\\SECONDARY",
+        "ORIGINAL\\PRIMARY\\M\\NONE",
+    }
+    # unreadable file is kept in the index with missing values
+    assert df_index["SeriesInstanceUID"].isna().sum() == 1
+
+
+def test_run_single_dicom_index_dry_run(workflow: DicomReorgWorkflow):
+    workflow.dicom_index = True
+    workflow.dry_run = True
+    participant_id = "01"
+    session_id = "1"
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+    dpath_source = workflow.study.layout.dpath_pre_reorg / participant_id / session_id
+    dpath_source.mkdir(parents=True)
+    shutil.copy2(DPATH_TEST_DATA / "dicom-derived.dcm", dpath_source / "1.dcm")
+
+    workflow.run_single(participant_id, session_id)
+
+    assert not workflow.dpath_dicom_index.exists()
+
+
+def test_init_dicom_index_missing_dependency(
+    tmp_path: Path, mocker: pytest_mock.MockerFixture
+):
+    mocker.patch("nipoppy.workflows.dicom_reorg.PYARROW_INSTALLED", False)
+    with pytest.raises(SystemExit) as exception:
+        DicomReorgWorkflow(dpath_root=tmp_path / "my_dataset", dicom_index=True)
+    assert exception.value.code == ReturnCode.MISSING_DEPENDENCY
+
+
+def test_run_single_copy_resume(workflow: DicomReorgWorkflow):
+    participant_id = "01"
+    session_id = "1"
+    workflow.copy_files = True
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+
+    fpaths_source = []
+    for fname in ("1.dcm", "2.dcm"):
+        fpath = workflow.study.layout.dpath_pre_reorg / participant_id / session_id
+        fpath = fpath / fname
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(fname)
+        fpaths_source.append(fpath)
+
+    # simulate an interrupted run that copied the first file
+    dpath_reorganized = (
+        workflow.study.layout.dpath_post_reorg
+        / participant_id_to_bids_participant_id(participant_id)
+        / session_id_to_bids_session_id(session_id)
+    )
+    fpath_copied = dpath_reorganized / workflow.apply_fname_mapping(
+        fpaths_source[0], participant_id, session_id
+    )
+    fpath_copied.parent.mkdir(parents=True)
+    fpath_copied.write_text("copied in a previous run")
+    fpath_copy_manifest = workflow.get_fpath_copy_manifest(participant_id, session_id)
+    fpath_copy_manifest.parent.mkdir(parents=True)
+    fpath_copy_manifest.write_text(f"{fpath_copied.resolve()}\n")
+
+    workflow.run_single(participant_id, session_id)
+
+    assert fpath_copied.read_text() == "copied in a previous run"
+    fpath_dest = dpath_reorganized / workflow.apply_fname_mapping(
+        fpaths_source[1], participant_id, session_id
+    )
+    assert fpath_dest.read_text() == "2.dcm"
+    assert not fpath_dest.is_symlink()
+    assert not fpath_copy_manifest.exists()
+
+
+def test_run_single_copy_resume_partial_file(workflow: DicomReorgWorkflow):
+    participant_id = "01"
+    session_id = "1"
+    workflow.copy_files = True
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+
+    fpath_source = workflow.study.layout.dpath_pre_reorg / participant_id
+    fpath_source = fpath_source / session_id / "1.dcm"
+    fpath_source.parent.mkdir(parents=True)
+    fpath_source.write_text("1.dcm")
+
+    # simulate a run that was killed while copying the file
+    # (not recorded in the copy manifest)
+    fpath_dest = (
+        workflow.study.layout.dpath_post_reorg
+        / participant_id_to_bids_participant_id(participant_id)
+        / session_id_to_bids_session_id(session_id)
+        / workflow.apply_fname_mapping(fpath_source, participant_id, session_id)
+    )
+    fpath_dest.parent.mkdir(parents=True)
+    fpath_dest.write_text("1.d")
+    fpath_copy_manifest = workflow.get_fpath_copy_manifest(participant_id, session_id)
+    fpath_copy_manifest.parent.mkdir(parents=True)
+    fpath_copy_manifest.touch()
+
+    workflow.run_single(participant_id, session_id)
+
+    assert fpath_dest.read_text() == "1.dcm"
+    assert not fpath_copy_manifest.exists()
+
+
+@pytest.mark.parametrize("fname_archive", ["1.zip", "1.tar", "1.tar.bz2"])
+@pytest.mark.parametrize("archive_is_dicom_dir", [True, False])
+def test_run_single_extract_archives(
+    workflow: DicomReorgWorkflow, fname_archive, archive_is_dicom_dir
+):
+    participant_id = "01"
+    session_id = "1"
+    workflow.extract_archives = True
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+
+    dpath_dicom_dir = workflow.study.layout.dpath_pre_reorg / participant_id
+    if archive_is_dicom_dir:
+        fpath_archive = dpath_dicom_dir / fname_archive
+        dicom_dir = f"{participant_id}/{fname_archive}"
+    else:
+        fpath_archive = dpath_dicom_dir / session_id / fname_archive
+        dicom_dir = f"{participant_id}/{session_id}"
+        # regular files can be mixed with archives
+        (fpath_archive.parent / "other.dcm").parent.mkdir(parents=True)
+        (fpath_archive.parent / "other.dcm").write_text("other")
+    workflow.dicom_dir_map = DicomDirMap(
+        data={
+            DicomDirMap.col_participant_id: [participant_id],
+            DicomDirMap.col_session_id: [session_id],
+            DicomDirMap.col_participant_dicom_dir: [dicom_dir],
+        }
+    )
+    fpath_archive.parent.mkdir(parents=True, exist_ok=True)
+    members = {"series1/1.dcm": "a", "series1/2.dcm": "b", "series2/1.dcm": "c"}
+    _create_archive(fpath_archive, members)
+
+    workflow.run_single(participant_id, session_id)
+
+    dpath_reorganized = (
+        workflow.study.layout.dpath_post_reorg
+        / participant_id_to_bids_participant_id(participant_id)
+        / session_id_to_bids_session_id(session_id)
+    )
+    for member_name, content in members.items():
+        fpath_dest = dpath_reorganized / workflow.apply_fname_mapping(
+            fpath_archive / member_name, participant_id, session_id
+        )
+        assert not fpath_dest.is_symlink()
+        assert fpath_dest.read_text() == content
+    assert not any(path.name == fname_archive for path in dpath_reorganized.iterdir())
+    assert workflow.curation_status_table.get_status(
+        participant_id=participant_id,
+        session_id=session_id,
+        col=workflow.curation_status_table.col_in_post_reorg,
+    )
+
+
+def test_run_single_extract_archives_collision(workflow: DicomReorgWorkflow):
+    participant_id = "01"
+    session_id = "1"
+    workflow.extract_archives = True
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    fpath_archive = (
+        workflow.study.layout.dpath_pre_reorg / participant_id / session_id / "1.zip"
+    )
+    fpath_archive.parent.mkdir(parents=True)
+    _create_archive(fpath_archive, {"1.dcm": "a", "2.dcm": "b"})
+    workflow.apply_fname_mapping = lambda fpath_source, participant_id, session_id: (
+        "same_name.dcm"
+    )
+
+    with pytest.raises(FileOperationError, match="Cannot extract file"):
+        workflow.run_single(participant_id, session_id)
+
+
+@pytest.mark.no_xdist
+def test_run_single_extract_archives_check_dicoms(
+    workflow: DicomReorgWorkflow, caplog: pytest.LogCaptureFixture
+):
+    participant_id = "01"
+    session_id = "1"
+    workflow.extract_archives = True
+    workflow.check_dicoms = True
+    workflow.check_dicoms_per_series = True
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+    workflow.curation_status_table = CurationStatusTable.load(
+        DPATH_TEST_DATA / "curation_status1.tsv"
+    )
+    fpath_archive = (
+        workflow.study.layout.dpath_pre_reorg / participant_id / session_id / "1.zip"
+    )
+    fpath_archive.parent.mkdir(parents=True)
+    with zipfile.ZipFile(fpath_archive, "w") as zip_file:
+        for member_name in ("derived/1.dcm", "derived/2.dcm"):
+            zip_file.write(DPATH_TEST_DATA / "dicom-derived.dcm", member_name)
+        zip_file.write(DPATH_TEST_DATA / "dicom-not_derived.dcm", "original/1.dcm")
+
+    workflow.run_single(participant_id, session_id)
+
+    derived_records = [
+        record
+        for record in caplog.records
+        if "Derived DICOM file detected" in record.message
+    ]
+    assert len(derived_records) == 1
+    assert (
+        f"assuming the same for all 2 files in {fpath_archive / 'derived'}"
+        in derived_records[0].message
+    )
+
+
 @pytest.mark.no_xdist
 def test_run_single_invalid_dicom(
     workflow: DicomReorgWorkflow, caplog: pytest.LogCaptureFixture
@@ -207,6 +702,43 @@ def test_run_single_invalid_dicom(
     )
 
 
+@pytest.mark.no_xdist
+def test_run_single_derived_dicom_per_series(
+    workflow: DicomReorgWorkflow, caplog: pytest.LogCaptureFixture
+):
+    participant_id = "01"
+    session_id = "1"
+    workflow.check_dicoms = True
+    workflow.check_dicoms_per_series = True
+
+    manifest = prepare_dataset(
+        participants_and_sessions_manifest={participant_id: [session_id]}
+    )
+    workflow.dicom_dir_map = DicomDirMap.load_or_generate(
+        manifest=manifest, fpath_dicom_dir_map=None, participant_first=True
+    )
+
+    dpath_series = (
+        workflow.study.layout.dpath_pre_reorg / participant_id / session_id / "series"
+    )
+    dpath_series.mkdir(parents=True)
+    for fname in ("1.dcm", "2.dcm", "3.dcm"):
+        shutil.copyfile(DPATH_TEST_DATA / "dicom-derived.dcm", dpath_series / fname)
+
+    try:
+        workflow.run_single(participant_id, session_id)
+    except Exception:
+        pass
+
+    derived_records = [
+        record
+        for record in caplog.records
+        if "Derived DICOM file detected" in record.message
+    ]
+    assert len(derived_records) == 1
+    assert "assuming the same for all 3 files" in derived_records[0].message
+
+
 def test_run_single_error_dicom_read(workflow: DicomReorgWorkflow):
     participant_id = "01"
     session_id = "1"
@@ -329,6 +861,30 @@ def test_run_setup(workflow: DicomReorgWorkflow):
     assert len(workflow.curation_status_table) == len(manifest2)
 
 
+@pytest.mark.parametrize("extract_archives", [True, False])
+def test_run_setup_archive_files(workflow: DicomReorgWorkflow, extract_archives):
+    create_empty_dataset(workflow.study.layout.dpath_root)
+    manifest = prepare_dataset(participants_and_sessions_manifest={"01": ["1", "2"]})
+    manifest.save_with_backup(workflow.study.layout.fpath_manifest)
+    workflow.study.manifest = manifest
+    workflow.dicom_dir_map = DicomDirMap(
+        data={
+            DicomDirMap.col_participant_id: ["01", "01"],
+            DicomDirMap.col_session_id: ["1", "2"],
+            DicomDirMap.col_participant_dicom_dir: ["01/1.zip", "01/2.zip"],
+        }
+    )
+    fpath_archive = workflow.study.layout.dpath_pre_reorg / "01" / "1.zip"
+    fpath_archive.parent.mkdir(parents=True)
+    fpath_archive.touch()
+    workflow.extract_archives = extract_archives
+
+    workflow.run_setup()
+
+    expected = [("01", "1")] if extract_archives else []
+    assert [tuple(x) for x in workflow.get_participants_sessions_to_run()] == expected
+
+
 @pytest.mark.parametrize(
     "participants_and_sessions_manifest,participants_and_sessions_downloaded",
     [
@@ -464,6 +464,49 @@ def test_handle_bids_source_copy(workflow: InitWorkflow, fake_bids_root: Path):
         assert f in files.target_files
 
 
+def test_handle_bids_source_hardlink(workflow: InitWorkflow, fake_bids_root: Path):
+    """Check that the new files are hard links to the source files."""
+    dpath_root = workflow.study.layout.dpath_root
+    files = _setup_handle_bids_source(workflow, fake_bids_root, mode="hardlink")
+
+    for f in files.source_files_after_init:
+        assert f in files.target_files
+        if (fake_bids_root / f).is_file():
+            assert (dpath_root / "bids" / f).samefile(fake_bids_root / f)
+
+    # the copy manifest is removed when done
+    assert not (
+        workflow.study.layout.dpath_nipoppy / workflow.fname_copy_manifest
+    ).exists()
+
+
+def test_handle_bids_source_copy_resume(
+    workflow: InitWorkflow, fake_bids_root: Path, mocker: pytest_mock.MockerFixture
+):
+    """Check that an interrupted copy is resumed with --force instead of restarted."""
+    fpath_already_copied = next(
+        fpath for fpath in sorted(fake_bids_root.rglob("*")) if fpath.is_file()
+    )
+    fpath_target = workflow.study.layout.dpath_bids / fpath_already_copied.relative_to(
+        fake_bids_root
+    )
+    fpath_target.parent.mkdir(parents=True)
+    fpath_target.write_text("copied in a previous run")
+    fpath_manifest = workflow.study.layout.dpath_nipoppy / workflow.fname_copy_manifest
+    fpath_manifest.parent.mkdir(parents=True, exist_ok=True)
+    fpath_manifest.write_text(f"{fpath_target}\n")
+
+    mocked_rm = mocker.patch("nipoppy.workflows.dataset_init.fileops.rm")
+    workflow.force = True
+    files = _setup_handle_bids_source(workflow, fake_bids_root, mode="copy")
+
+    mocked_rm.assert_not_called()
+    for f in files.source_files_after_init:
+        assert f in files.target_files
+    assert fpath_target.read_text() == "copied in a previous run"
+    assert not fpath_manifest.exists()
+
+
 def test_handle_bids_source_move(workflow: InitWorkflow, fake_bids_root: Path):
     """Check that all the files are moved and the source is empty."""
     files = _setup_handle_bids_source(workflow, fake_bids_root, mode="move")
@@ -13,11 +13,13 @@ from nipoppy.env import BIDS_PATH_INJECTION_PREFIX
 from nipoppy.exceptions import (
     ConfigError,
     FileOperationError,
+    ReturnCode,
     WorkflowError,
 )
 from nipoppy.tabular.curation_status import CurationStatusTable
 from nipoppy.tabular.manifest import Manifest
 from nipoppy.tabular.processing_status import ProcessingStatusTable
+from nipoppy.utils.archive import IndexedTar
 from nipoppy.workflows.processing_runner import (
     ProcessingRunner,
     _get_bids_paths_to_inject,
@@ -292,16 +294,91 @@ def test_tar_directory_failure(
     fpath_to_tar.parent.mkdir(parents=True)
     fpath_to_tar.touch()
 
-    mocked_is_tarfile = mocker.patch(
-        "nipoppy.workflows.processing_runner.is_tarfile", return_value=False
+    mocked_write_tar = mocker.patch(
+        "nipoppy.workflows.processing_runner.write_tar",
+        side_effect=OSError("No space left on device"),
     )
 
     fpath_tarred = runner.tar_directory(dpath_to_tar)
 
-    assert fpath_tarred.exists()
-    mocked_is_tarfile.assert_called_once()
-
+    mocked_write_tar.assert_called_once()
+    assert not fpath_tarred.exists()
+    assert dpath_to_tar.exists()
     assert f"Failed to tar {dpath_to_tar}" in caplog.text
+    assert "No space left on device" in caplog.text
+
+
+@pytest.mark.parametrize("compression,suffix", [(None, ".tar"), ("gzip", ".tar.gz")])
+def test_tar_directory_compression(
+    runner: ProcessingRunner, tmp_path: Path, compression, suffix
+):
+    dpath_to_tar = tmp_path / "ses-1.0"
+    (dpath_to_tar / "file.txt").parent.mkdir(parents=True)
+    (dpath_to_tar / "file.txt").write_text("data")
+    runner.tar_compression = compression
+
+    fpath_tarred = runner.tar_directory(dpath_to_tar)
+
+    assert fpath_tarred == tmp_path / f"ses-1.0{suffix}"
+    with tarfile.open(fpath_tarred) as tar:
+        assert tar.getnames() == ["ses-1.0", "ses-1.0/file.txt"]
+    assert IndexedTar(fpath_tarred).read_bytes("ses-1.0/file.txt") == b"data"
+    assert (tmp_path / f"ses-1.0{suffix}.index.json").exists()
+    assert not dpath_to_tar.exists()
+
+
+def test_tar_directory_dry_run(runner: ProcessingRunner, tmp_path: Path):
+    dpath_to_tar = tmp_path / "my_data"
+    dpath_to_tar.mkdir()
+    runner.dry_run = True
+
+    fpath_tarred = runner.tar_directory(dpath_to_tar)
+
+    assert not fpath_tarred.exists()
+    assert dpath_to_tar.exists()
+
+
+def test_tar_compression_missing_dependency(
+    tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    mocker.patch("nipoppy.workflows.processing_runner.ZSTANDARD_INSTALLED", False)
+    with pytest.raises(SystemExit) as exc_info:
+        ProcessingRunner(
+            dpath_root=tmp_path / "my_dataset",
+            pipeline_name="dummy_pipeline",
+            tar=True,
+            tar_compression="zstd",
+        )
+    assert exc_info.value.code == ReturnCode.MISSING_DEPENDENCY
+
+
+@pytest.mark.parametrize(
+    "tar,tar_compression,expected_flags",
+    [
+        (False, None, None),
+        (True, None, ["--tar"]),
+        (True, "gzip", ["--tar", "--tar-compression", "gzip"]),
+    ],
+)
+def test_generate_cli_command_for_hpc(
+    runner: ProcessingRunner,
+    tar,
+    tar_compression,
+    expected_flags,
+    mocker: pytest_mock.MockFixture,
+):
+    runner.tar = tar
+    runner.tar_compression = tar_compression
+    mocked_generate_cli_command = mocker.patch.object(
+        runner.hpc_runner,
+        "generate_cli_command",
+    )
+    runner._generate_cli_command_for_hpc("p01", "s01")
+    mocked_generate_cli_command.assert_called_once_with(
+        participant_id="p01",
+        session_id="s01",
+        extra_flags=expected_flags,
+    )
 
 
 def test_tar_directory_warning_not_found(runner: ProcessingRunner):
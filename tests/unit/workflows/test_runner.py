@@ -13,9 +13,10 @@ from nipoppy.container import (
     ContainerHandler,
     DockerHandler,
     SingularityHandler,
+    get_container_handler,
 )
 from nipoppy.env import ContainerCommandEnum
-from nipoppy.exceptions import ConfigError
+from nipoppy.exceptions import ConfigError, ContainerError
 from nipoppy.pipeline_validation import check_pipeline_bundle
 from nipoppy.utils.utils import get_pipeline_tag
 from nipoppy.workflows.processing_runner import ProcessingRunner
@@ -131,7 +132,7 @@ def test_run_setup_validates_pipeline_bundle(
 ):
     runner.pipeline_version = None
     mocked_check_pipeline_bundle = mocker.patch(
-        "nipoppy.workflows.runner.check_pipeline_bundle",
+        "nipoppy.pipeline_validation.check_pipeline_bundle",
         wraps=check_pipeline_bundle,
     )
 
@@ -139,16 +140,29 @@ def test_run_setup_validates_pipeline_bundle(
 
     assert runner.pipeline_version == "1.0.0"
     mocked_check_pipeline_bundle.assert_called_once_with(
-        runner.dpath_pipeline_bundle, strict=False
+        runner.dpath_pipeline_bundle.resolve(), strict=False
     )
 
 
+def test_run_setup_skips_validated_pipeline_bundle(
+    runner: Runner, mocker: pytest_mock.MockFixture
+):
+    runner.study.layout.dpath_nipoppy.mkdir(parents=True, exist_ok=True)
+    runner.run_setup()
+
+    mocked_check_pipeline_bundle = mocker.patch(
+        "nipoppy.pipeline_validation.check_pipeline_bundle"
+    )
+    runner.run_setup()
+    mocked_check_pipeline_bundle.assert_not_called()
+
+
 def test_run_validation_error_prevents_execution(
     runner: Runner, mocker: pytest_mock.MockFixture
 ):
     error = ConfigError("Invalid pipeline bundle")
     mocker.patch(
-        "nipoppy.workflows.runner.check_pipeline_bundle",
+        "nipoppy.pipeline_validation.check_pipeline_bundle",
         side_effect=error,
     )
     mocked_run_main = mocker.patch.object(runner, "run_main")
@@ -475,6 +489,92 @@ def test_launch_boutiques_run_no_container_image(
     mocked_inject_container_image.assert_not_called()
 
 
+@pytest.mark.parametrize(
+    "command_line,expected_command_line_start,expected_bosh_opt",
+    [
+        (
+            "echo [ARG1] [ARG2]",
+            "apptainer exec --env VAR1=1 instance://{name} echo",
+            "--no-container",
+        ),
+        (
+            "[[NIPOPPY_CONTAINER_COMMAND]] [[NIPOPPY_FPATH_CONTAINER]] echo [ARG1] [ARG2]",
+            "apptainer exec --env VAR1=1 instance://{name} echo",
+            None,
+        ),
+    ],
+)
+def test_launch_boutiques_run_persistent_container(
+    command_line: str,
+    expected_command_line_start: str,
+    expected_bosh_opt: str,
+    runner: Runner,
+    mocker: pytest_mock.MockFixture,
+):
+    runner.persistent_container = True
+    runner.descriptor["command-line"] = command_line
+    mocked_run_command = mocker.patch("nipoppy.workflows.runner._run_command")
+
+    for session_id in ["1", "2"]:
+        container_command, container_handler = runner.process_container_config(
+            participant_id="01", session_id=session_id
+        )
+        container_handler.add_env_arg("VAR1", "1")
+        descriptor_str, _ = runner.launch_boutiques_run(
+            participant_id="01",
+            session_id=session_id,
+            container_handler=container_handler,
+            container_command=container_command,
+        )
+        name = f"{runner.container_instances.name_prefix}-0"
+        assert json.loads(descriptor_str)["command-line"].startswith(
+            expected_command_line_start.format(name=name)
+        )
+        if expected_bosh_opt is not None:
+            assert "container-image" not in json.loads(descriptor_str)
+
+    commands = [call.args[0] for call in mocked_run_command.call_args_list]
+    # instance started once, then one bosh call per session
+    assert commands[0].startswith("apptainer instance start ")
+    assert commands[0].endswith(f"{runner.fpath_container} {name}")
+    assert all(command[:2] == ["bosh", "exec"] for command in commands[1:])
+    if expected_bosh_opt is not None:
+        assert expected_bosh_opt in commands[-1]
+
+    runner.run_cleanup()
+    assert mocked_run_command.call_args.args[0] == f"apptainer instance stop {name}"
+
+
+def test_launch_boutiques_run_persistent_container_simulate(
+    runner: Runner, mocker: pytest_mock.MockFixture
+):
+    runner.persistent_container = True
+    runner.simulate = True
+    runner.descriptor["command-line"] = "echo [ARG1] [ARG2]"
+    mocked_run_command = mocker.patch("nipoppy.workflows.runner._run_command")
+
+    runner.launch_boutiques_run(
+        participant_id="01", session_id="1", container_handler=ApptainerHandler()
+    )
+
+    assert mocked_run_command.call_count == 1
+    assert "container_instances" not in runner.__dict__
+
+
+def test_get_container_image_docker(runner: Runner):
+    assert (
+        runner._get_container_image(DockerHandler(), runner.descriptor) == "dummy/image"
+    )
+    assert (
+        runner._get_container_image(DockerHandler(), {})
+        == runner.pipeline_config.CONTAINER_INFO.URI
+    )
+
+    runner.pipeline_config.CONTAINER_INFO.URI = None
+    with pytest.raises(ContainerError, match="Container image URI must be specified"):
+        runner._get_container_image(DockerHandler(), {})
+
+
 def test_process_container_config(runner: Runner, tmp_path: Path):
     bind_path = tmp_path / "to_bind"
     container_command, container_handler = runner.process_container_config(
@@ -525,3 +625,58 @@ def test_process_container_config_no_bind_cwd(
 def test_process_container_config_no_bindpaths(runner: Runner):
     # smoke test for no bind paths
     runner.process_container_config(participant_id="01", session_id="BL")
+
+
+def test_process_container_config_reuse(
+    runner: Runner, tmp_path: Path, mocker: pytest_mock.MockFixture
+):
+    mocked_get_container_handler = mocker.patch(
+        "nipoppy.workflows.runner.get_container_handler",
+        wraps=get_container_handler,
+    )
+    bind_path = tmp_path / "to_bind"
+
+    container_command1, container_handler1 = runner.process_container_config(
+        participant_id="01", session_id="BL", bind_paths=[bind_path]
+    )
+    container_command2, container_handler2 = runner.process_container_config(
+        participant_id="02", session_id="M12", bind_paths=[bind_path]
+    )
+
+    # container spec is only compiled once
+    mocked_get_container_handler.assert_called_once()
+    assert container_command1 == container_command2
+    assert container_handler1.args == container_handler2.args
+
+    # handlers can be modified independently
+    assert container_handler1 is not container_handler2
+    container_handler1.add_env_arg("VAR1", "1")
+    assert "VAR1=1" not in container_handler2.args
+
+    # different bind paths
+    runner.process_container_config(participant_id="01", session_id="BL")
+    assert mocked_get_container_handler.call_count == 2
+
+
+def test_process_container_config_templated(
+    runner: Runner, mocker: pytest_mock.MockFixture
+):
+    runner.pipeline_step_config.CONTAINER_CONFIG.ARGS.append(
+        "--label=[[NIPOPPY_PARTICIPANT_ID]]"
+    )
+    mocked_get_container_handler = mocker.patch(
+        "nipoppy.workflows.runner.get_container_handler",
+        wraps=get_container_handler,
+    )
+
+    container_command1, _ = runner.process_container_config(
+        participant_id="01", session_id="BL"
+    )
+    container_command2, _ = runner.process_container_config(
+        participant_id="02", session_id="BL"
+    )
+    runner.process_container_config(participant_id="02", session_id="M12")
+
+    assert "--label=01" in container_command1
+    assert "--label=02" in container_command2
+    assert mocked_get_container_handler.call_count == 2
@@ -213,6 +213,41 @@ def test_check_status_with_tarball(
     )
 
 
+def test_check_status_with_compressed_tarball(tracker: PipelineTracker):
+    fpath = tracker.dpath_pipeline_output / "dirA" / "file.txt"
+    fpath.parent.mkdir(parents=True, exist_ok=True)
+    fpath.touch()
+
+    runner = ProcessingRunner(
+        tracker.dpath_root, tracker.pipeline_name, tracker.pipeline_version
+    )
+    runner.tar_compression = "gzip"
+    assert runner.tar_directory(fpath.parent).name == "dirA.tar.gz"
+
+    assert (
+        tracker.check_status(["dirA/file.txt"], "dirA")
+        == ProcessingStatusTable.status_success
+    )
+
+
+def test_check_status_with_tarball_uses_index(
+    tracker: PipelineTracker, mocker: pytest_mock.MockFixture
+):
+    fpath = tracker.dpath_pipeline_output / "dirA" / "file.txt"
+    fpath.parent.mkdir(parents=True, exist_ok=True)
+    fpath.touch()
+    ProcessingRunner(
+        tracker.dpath_root, tracker.pipeline_name, tracker.pipeline_version
+    ).tar_directory(fpath.parent)
+
+    mocked_open_tar = mocker.patch("nipoppy.utils.archive.open_tar")
+    assert (
+        tracker.check_status(["dirA/file.txt"], "dirA")
+        == ProcessingStatusTable.status_success
+    )
+    mocked_open_tar.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "curation_status_data,participant_id,session_id,expected",
     [